@@ -3,13 +3,107 @@ Customer Verification Agent for the Benefit Orchestrator System.
 Handles customer identity verification with fuzzy matching capabilities.
 """
 
-from typing import Dict, Any, List, Tuple
+import difflib
+import json
+import os
+import sqlite3
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from autogen_agentchat.agents import AssistantAgent
 from autogen_core.model_context import HeadAndTailChatCompletionContext
 from autogen_core.tools import FunctionTool
 
 
-# Customer search tool function embedded directly
+# Mock customers data (loaded from JSON files during team creation)
+MOCK_CUSTOMERS_DATA = [{'customerId': 'CUST-001', 'fullName': 'Ashlee Thompson', 'dateOfBirth': '1983-01-21', 'ssnLast4': '7583', 'email': 'kayla59@matthews.biz', 'phone': '824.057.7423x6297', 'address': {'street': '5896 Daniel Fort', 'city': 'Joshuahaven', 'state': 'AZ', 'zip': '94396'}, 'militaryStatus': 'Veteran', 'branch': 'Coast Guard', 'serviceStartDate': '2020-01-01', 'serviceEndDate': None}, {'customerId': 'CUST-002', 'fullName': 'Rachel Glover', 'dateOfBirth': '1994-09-19', 'ssnLast4': '8365', 'email': 'mendozanicholas@yahoo.com', 'phone': '824.447.7428x7274', 'address': {'street': '3595 Elizabeth Passage', 'city': 'South Mariaton', 'state': 'OH', 'zip': '59096'}, 'militaryStatus': 'Reserve', 'branch': 'Army', 'serviceStartDate': '2018-10-09', 'serviceEndDate': None}, {'customerId': 'CUST-003', 'fullName': 'Heather Mason', 'dateOfBirth': '1998-05-15', 'ssnLast4': '4674', 'email': 'stephen16@gmail.com', 'phone': '079-991-8795', 'address': {'street': '38232 Joseph Fords', 'city': 'Lake Todd', 'state': 'AZ', 'zip': '58315'}, 'militaryStatus': 'Active Duty', 'branch': 'Army', 'serviceStartDate': '2020-05-17', 'serviceEndDate': None}, {'customerId': 'CUST-004', 'fullName': 'Corey Lucas', 'dateOfBirth': '1993-01-11', 'ssnLast4': '5829', 'email': 'wilsonlisa@williams.info', 'phone': '+1-589-467-8480x428', 'address': {'street': '5266 Shaw Locks', 'city': 'East Melissamouth', 'state': 'MO', 'zip': '35641'}, 'militaryStatus': 'Reserve', 'branch': 'Army', 'serviceStartDate': '2015-03-03', 'serviceEndDate': None}, {'customerId': 'CUST-005', 'fullName': 'Kristopher Phillips', 'dateOfBirth': '1988-03-04', 'ssnLast4': '7025', 'email': 'kellywagner@travis.com', 'phone': '001-161-483-3768x76063', 'address': {'street': '8009 Snyder Radial', 'city': 'East Christyville', 'state': 'KY', 'zip': '48228'}, 'militaryStatus': 'Active Duty', 'branch': 'Marines', 'serviceStartDate': '2014-07-31', 'serviceEndDate': None}]
+
+
+def _match_summary(confidence_factors):
+    """Generate a human-readable summary of what matched"""
+    if not confidence_factors:
+        return "No specific matches found"
+    
+    summaries = [factor[0] for factor in confidence_factors]
+    return "; ".join(summaries)
+
+
+def _score_customer(customer_ssn, customer_name, customer_name_parts, customer_address, ssn_clean, search_name,
+                    name_parts, search_address, address_components, matcher, has_ssn, has_name, has_address):
+    """Confidence percentage and factors of one customer, shared by ``customer_search`` and the bulk search."""
+    confidence_factors = []
+    total_confidence = 0
+    max_possible_score = 0
+
+    # SSN Matching (highest weight - 40%)
+    if has_ssn:
+        max_possible_score += 40
+        if ssn_clean and customer_ssn:
+            if ssn_clean == customer_ssn:
+                confidence_factors.append(("SSN exact match", 40))
+                total_confidence += 40
+            elif ssn_clean in customer_ssn or customer_ssn in ssn_clean:
+                confidence_factors.append(("SSN partial match", 25))
+                total_confidence += 25
+
+    # Name Matching (30% weight)
+    if has_name:
+        max_possible_score += 30
+        if customer_name and search_name:
+            # Exact match
+            if customer_name == search_name:
+                confidence_factors.append(("Name exact match", 30))
+                total_confidence += 30
+            else:
+                # Fuzzy matching using difflib; the search name is the matcher's cached second
+                # sequence, and the quick upper bounds skip the full ratio when it cannot reach 0.5
+                matcher.set_seq1(customer_name)
+                if matcher.real_quick_ratio() >= 0.5 and matcher.quick_ratio() >= 0.5:
+                    similarity = matcher.ratio()
+                    if similarity >= 0.9:
+                        score = int(30 * similarity)
+                        confidence_factors.append((f"Name high similarity ({similarity:.2f})", score))
+                        total_confidence += score
+                    elif similarity >= 0.7:
+                        score = int(25 * similarity)
+                        confidence_factors.append((f"Name good similarity ({similarity:.2f})", score))
+                        total_confidence += score
+                    elif similarity >= 0.5:
+                        score = int(15 * similarity)
+                        confidence_factors.append((f"Name moderate similarity ({similarity:.2f})", score))
+                        total_confidence += score
+
+                # Also check if names contain each other (for partial matches)
+                common_parts = len(name_parts & customer_name_parts)
+                if common_parts > 0:
+                    part_score = min(15, common_parts * 5)
+                    confidence_factors.append((f"Name parts match ({common_parts} parts)", part_score))
+                    total_confidence += part_score
+
+    # Address Matching (30% weight)
+    if has_address:
+        max_possible_score += 30
+        if customer_address:
+            if search_address in customer_address or customer_address in search_address:
+                # Calculate partial match score based on how much of the address matches
+                if len(search_address) > 0:
+                    match_ratio = min(len(search_address), len(customer_address)) / max(len(search_address), len(customer_address))
+                    score = int(30 * match_ratio)
+                    confidence_factors.append((f"Address partial match ({match_ratio:.2f})", score))
+                    total_confidence += score
+
+            # Check individual components
+            matched_components = sum(1 for comp in address_components if comp in customer_address)
+            if matched_components > 0:
+                component_score = min(20, matched_components * 5)
+                confidence_factors.append((f"Address components match ({matched_components})", component_score))
+                total_confidence += component_score
+
+    # Calculate final confidence percentage
+    if max_possible_score > 0:
+        return min(100, int((total_confidence / max_possible_score) * 100)), confidence_factors
+    return 0, confidence_factors
+
+
+# Customer search tool function; the export inlines the module-level helpers it uses
 def customer_search(ssn: str = "", name: str = "", address: str = "") -> str:
     """
     Intelligently searches for customers using various criteria with fuzzy matching and confidence scoring.
@@ -24,106 +118,46 @@ def customer_search(ssn: str = "", name: str = "", address: str = "") -> str:
     """
     import json
     import difflib
-    
-    def _generate_match_summary(confidence_factors):
-        """Generate a human-readable summary of what matched"""
-        if not confidence_factors:
-            return "No specific matches found"
-        
-        summaries = [factor[0] for factor in confidence_factors]
-        return "; ".join(summaries)
-    
-    # Mock customers data (loaded from JSON files during team creation)
-    MOCK_CUSTOMERS_DATA = [{'customerId': 'CUST-001', 'fullName': 'Ashlee Thompson', 'dateOfBirth': '1983-01-21', 'ssnLast4': '7583', 'email': 'kayla59@matthews.biz', 'phone': '824.057.7423x6297', 'address': {'street': '5896 Daniel Fort', 'city': 'Joshuahaven', 'state': 'AZ', 'zip': '94396'}, 'militaryStatus': 'Veteran', 'branch': 'Coast Guard', 'serviceStartDate': '2020-01-01', 'serviceEndDate': None}, {'customerId': 'CUST-002', 'fullName': 'Rachel Glover', 'dateOfBirth': '1994-09-19', 'ssnLast4': '8365', 'email': 'mendozanicholas@yahoo.com', 'phone': '824.447.7428x7274', 'address': {'street': '3595 Elizabeth Passage', 'city': 'South Mariaton', 'state': 'OH', 'zip': '59096'}, 'militaryStatus': 'Reserve', 'branch': 'Army', 'serviceStartDate': '2018-10-09', 'serviceEndDate': None}, {'customerId': 'CUST-003', 'fullName': 'Heather Mason', 'dateOfBirth': '1998-05-15', 'ssnLast4': '4674', 'email': 'stephen16@gmail.com', 'phone': '079-991-8795', 'address': {'street': '38232 Joseph Fords', 'city': 'Lake Todd', 'state': 'AZ', 'zip': '58315'}, 'militaryStatus': 'Active Duty', 'branch': 'Army', 'serviceStartDate': '2020-05-17', 'serviceEndDate': None}, {'customerId': 'CUST-004', 'fullName': 'Corey Lucas', 'dateOfBirth': '1993-01-11', 'ssnLast4': '5829', 'email': 'wilsonlisa@williams.info', 'phone': '+1-589-467-8480x428', 'address': {'street': '5266 Shaw Locks', 'city': 'East Melissamouth', 'state': 'MO', 'zip': '35641'}, 'militaryStatus': 'Reserve', 'branch': 'Army', 'serviceStartDate': '2015-03-03', 'serviceEndDate': None}, {'customerId': 'CUST-005', 'fullName': 'Kristopher Phillips', 'dateOfBirth': '1988-03-04', 'ssnLast4': '7025', 'email': 'kellywagner@travis.com', 'phone': '001-161-483-3768x76063', 'address': {'street': '8009 Snyder Radial', 'city': 'East Christyville', 'state': 'KY', 'zip': '48228'}, 'militaryStatus': 'Active Duty', 'branch': 'Marines', 'serviceStartDate': '2014-07-31', 'serviceEndDate': None}]
+    import os
+    import sqlite3
     
     customers = MOCK_CUSTOMERS_DATA
+    
+    # Synthetic population database (simulation/synthetic_population.py --format sqlite), if configured.
+    # Candidates are narrowed by the indexed SSN last 4, or by the indexed last name when no SSN is given.
+    population_db = os.environ.get("SCRA_POPULATION_DB")
+    if population_db:
+        ssn_digits = ssn.replace("-", "").replace(" ", "")
+        connection = sqlite3.connect(population_db)
+        try:
+            if ssn_digits:
+                rows = connection.execute("SELECT record FROM customers WHERE ssn_last4 = ?",
+                                          (ssn_digits[-4:],)).fetchall()
+            elif name.strip():
+                rows = connection.execute("SELECT record FROM customers WHERE last_name = ?",
+                                          (name.split()[-1].lower(),)).fetchall()
+            else:
+                rows = []
+        finally:
+            connection.close()
+        customers = customers + [json.loads(row[0]) for row in rows]
+    ssn_clean = ssn.replace("-", "").replace(" ", "")
+    search_name = name.lower()
+    search_address = address.lower()
+    matcher = difflib.SequenceMatcher(None)
+    matcher.set_seq2(search_name)
+    name_parts = set(search_name.split())
+    address_components = search_address.split()
     search_results = []
     
     for customer in customers:
-        confidence_factors = []
-        total_confidence = 0
-        max_possible_score = 0
-        
-        # SSN Matching (highest weight - 40%)
-        if ssn:
-            max_possible_score += 40
-            ssn_clean = ssn.replace("-", "").replace(" ", "")
-            customer_ssn = customer.get("ssnLast4", "")
-            
-            if ssn_clean and customer_ssn:
-                if ssn_clean == customer_ssn:
-                    confidence_factors.append(("SSN exact match", 40))
-                    total_confidence += 40
-                elif ssn_clean in customer_ssn or customer_ssn in ssn_clean:
-                    confidence_factors.append(("SSN partial match", 25))
-                    total_confidence += 25
-        
-        # Name Matching (30% weight)
-        if name:
-            max_possible_score += 30
-            customer_name = customer.get("fullName", "").lower()
-            search_name = name.lower()
-            
-            if customer_name and search_name:
-                # Exact match
-                if customer_name == search_name:
-                    confidence_factors.append(("Name exact match", 30))
-                    total_confidence += 30
-                else:
-                    # Fuzzy matching using difflib
-                    similarity = difflib.SequenceMatcher(None, customer_name, search_name).ratio()
-                    
-                    if similarity >= 0.9:
-                        score = int(30 * similarity)
-                        confidence_factors.append((f"Name high similarity ({similarity:.2f})", score))
-                        total_confidence += score
-                    elif similarity >= 0.7:
-                        score = int(25 * similarity)
-                        confidence_factors.append((f"Name good similarity ({similarity:.2f})", score))
-                        total_confidence += score
-                    elif similarity >= 0.5:
-                        score = int(15 * similarity)
-                        confidence_factors.append((f"Name moderate similarity ({similarity:.2f})", score))
-                        total_confidence += score
-                    
-                    # Also check if names contain each other (for partial matches)
-                    name_parts = search_name.split()
-                    customer_parts = customer_name.split()
-                    common_parts = len(set(name_parts) & set(customer_parts))
-                    if common_parts > 0:
-                        part_score = min(15, common_parts * 5)
-                        confidence_factors.append((f"Name parts match ({common_parts} parts)", part_score))
-                        total_confidence += part_score
-        
-        # Address Matching (30% weight)
-        if address:
-            max_possible_score += 30
-            customer_address = customer.get("address", {})
-            if customer_address:
-                full_customer_address = f"{customer_address.get('street', '')} {customer_address.get('city', '')} {customer_address.get('state', '')} {customer_address.get('zip', '')}".lower()
-                search_address = address.lower()
-                
-                if search_address in full_customer_address or full_customer_address in search_address:
-                    # Calculate partial match score based on how much of the address matches
-                    if len(search_address) > 0:
-                        match_ratio = min(len(search_address), len(full_customer_address)) / max(len(search_address), len(full_customer_address))
-                        score = int(30 * match_ratio)
-                        confidence_factors.append((f"Address partial match ({match_ratio:.2f})", score))
-                        total_confidence += score
-                
-                # Check individual components
-                address_components = search_address.split()
-                matched_components = sum(1 for comp in address_components if comp in full_customer_address)
-                if matched_components > 0:
-                    component_score = min(20, matched_components * 5)
-                    confidence_factors.append((f"Address components match ({matched_components})", component_score))
-                    total_confidence += component_score
-        
-        # Calculate final confidence percentage
-        if max_possible_score > 0:
-            confidence_percentage = min(100, int((total_confidence / max_possible_score) * 100))
-        else:
-            confidence_percentage = 0
+        customer_name = customer.get("fullName", "").lower()
+        customer_address = customer.get("address", {})
+        full_customer_address = f"{customer_address.get('street', '')} {customer_address.get('city', '')} {customer_address.get('state', '')} {customer_address.get('zip', '')}".lower() if customer_address else None
+        confidence_percentage, confidence_factors = _score_customer(
+            customer.get("ssnLast4", ""), customer_name, set(customer_name.split()), full_customer_address,
+            ssn_clean, search_name, name_parts, search_address, address_components, matcher,
+            bool(ssn), bool(name), bool(address))
         
         # Only include results with some confidence
         if confidence_percentage > 0:
@@ -131,12 +165,32 @@ def customer_search(ssn: str = "", name: str = "", address: str = "") -> str:
                 "customer": customer,
                 "confidence_percentage": confidence_percentage,
                 "confidence_factors": confidence_factors,
-                "match_summary": _generate_match_summary(confidence_factors)
+                "match_summary": _match_summary(confidence_factors)
             })
     
     # Sort by confidence (highest first)
     search_results.sort(key=lambda x: x["confidence_percentage"], reverse=True)
     
+    # Compact output (SCRA_TOOL_OUTPUT=compact): minified JSON with only the fields the
+    # verification agent reads, and low-confidence matches dropped when a strong match exists
+    if os.environ.get("SCRA_TOOL_OUTPUT", "").lower() == "compact":
+        top_confidence = search_results[0]["confidence_percentage"] if search_results else 0
+        cutoff = max(40, top_confidence - 30)
+        matches = [result for result in search_results[:3] if result["confidence_percentage"] >= cutoff]
+        compact_response = {
+            "search_criteria": {key: value for key, value in (("ssn", ssn), ("name", name), ("address", address)) if value},
+            "total_results": len(search_results),
+            "results": [{
+                "customer_id": result["customer"].get("customerId"),
+                "name": result["customer"].get("fullName"),
+                "ssn_last4": result["customer"].get("ssnLast4"),
+                "address": " ".join(str(part) for part in result["customer"].get("address", {}).values()),
+                "confidence": result["confidence_percentage"],
+                "match": result["match_summary"]
+            } for result in (matches or search_results[:1])]
+        }
+        return json.dumps(compact_response, separators=(",", ":"))
+    
     # Prepare response
     response = {
         "search_criteria": {
@@ -151,6 +205,119 @@ def customer_search(ssn: str = "", name: str = "", address: str = "") -> str:
     return json.dumps(response, indent=2) 
 
 
+class _PreparedCustomer:
+    """Per-customer values ``customer_search`` would otherwise rebuild for every query."""
+    __slots__ = ("customer", "ssn", "name", "name_parts", "address")
+
+    def __init__(self, customer: Dict[str, Any]):
+        self.customer = customer
+        self.ssn = customer.get("ssnLast4", "")
+        self.name = customer.get("fullName", "").lower()
+        self.name_parts = set(self.name.split())
+        customer_address = customer.get("address", {})
+        self.address = (f"{customer_address.get('street', '')} {customer_address.get('city', '')} "
+                        f"{customer_address.get('state', '')} {customer_address.get('zip', '')}".lower()
+                        if customer_address else None)
+
+
+def _population_candidates(population_db: str, queries: List[Tuple[str, str, str]]) -> Tuple[Dict[str, list], Dict[str, list]]:
+    """Fetch population customers for every query at once, narrowed the way ``customer_search`` narrows them.
+
+    Returns:
+        Tuple[Dict[str, list], Dict[str, list]]: Customers by SSN last 4, and by lower-cased last name
+        for queries without an SSN
+    """
+    ssn_keys = sorted({ssn.replace("-", "").replace(" ", "")[-4:] for ssn, _, _ in queries
+                       if ssn.replace("-", "").replace(" ", "")})
+    last_names = sorted({name.split()[-1].lower() for ssn, name, _ in queries
+                         if not ssn.replace("-", "").replace(" ", "") and name.strip()})
+    by_ssn: Dict[str, list] = {key: [] for key in ssn_keys}
+    by_last_name: Dict[str, list] = {key: [] for key in last_names}
+    connection = sqlite3.connect(population_db)
+    try:
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ssn_keys), 500):
+            chunk = ssn_keys[start:start + 500]
+            rows = connection.execute(
+                f"SELECT ssn_last4, record FROM customers WHERE ssn_last4 IN ({','.join('?' * len(chunk))})", chunk)
+            for ssn_last4, record in rows:
+                by_ssn[ssn_last4].append(_PreparedCustomer(json.loads(record)))
+        for start in range(0, len(last_names), 500):
+            chunk = last_names[start:start + 500]
+            rows = connection.execute(
+                f"SELECT last_name, record FROM customers WHERE last_name IN ({','.join('?' * len(chunk))})", chunk)
+            for last_name, record in rows:
+                by_last_name[last_name].append(_PreparedCustomer(json.loads(record)))
+    finally:
+        connection.close()
+    return by_ssn, by_last_name
+
+
+def bulk_customer_search(queries: Iterable[Tuple[str, str, str]],
+                         customers: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Verify many requestors in one pass, with the same scoring and result shape as ``customer_search``.
+
+    Customers are scored with ``_score_customer``, as ``customer_search`` scores them.
+
+    Customer name and address normalization is done once for the whole batch
+    rather than once per query, each query's name matcher is reused across
+    customers, and population candidates (``SCRA_POPULATION_DB``) are fetched
+    with one query per 500 distinct SSNs.
+
+    Args:
+        queries (Iterable[Tuple[str, str, str]]): ``(ssn, name, address)`` per requestor
+        customers (Optional[List[Dict[str, Any]]]): Customer records to search instead of
+            the embedded mock customers
+
+    Returns:
+        List[Dict[str, Any]]: One parsed ``customer_search`` response (standard shape) per query
+    """
+    queries = list(queries)
+    base_customers = [_PreparedCustomer(customer) for customer in
+                      (customers if customers is not None else MOCK_CUSTOMERS_DATA)]
+    by_ssn, by_last_name = {}, {}
+    population_db = os.environ.get("SCRA_POPULATION_DB")
+    if population_db and customers is None:
+        by_ssn, by_last_name = _population_candidates(population_db, queries)
+
+    responses = []
+    matcher = difflib.SequenceMatcher(None)
+    for ssn, name, address in queries:
+        ssn_clean = ssn.replace("-", "").replace(" ", "")
+        search_name = name.lower()
+        search_address = address.lower()
+        matcher.set_seq2(search_name)
+        name_parts = set(search_name.split())
+        address_components = search_address.split()
+
+        candidates = base_customers
+        if ssn_clean:
+            candidates = base_customers + by_ssn.get(ssn_clean[-4:], [])
+        elif name.strip():
+            candidates = base_customers + by_last_name.get(name.split()[-1].lower(), [])
+
+        search_results = []
+        for prepared in candidates:
+            confidence_percentage, confidence_factors = _score_customer(
+                prepared.ssn, prepared.name, prepared.name_parts, prepared.address, ssn_clean, search_name,
+                name_parts, search_address, address_components, matcher, bool(ssn), bool(name), bool(address))
+            if confidence_percentage > 0:
+                search_results.append({
+                    "customer": prepared.customer,
+                    "confidence_percentage": confidence_percentage,
+                    "confidence_factors": confidence_factors,
+                    "match_summary": _match_summary(confidence_factors),
+                })
+        search_results.sort(key=lambda x: x["confidence_percentage"], reverse=True)
+        responses.append({
+            "search_criteria": {"ssn": ssn if ssn else None, "name": name if name else None,
+                                "address": address if address else None},
+            "total_results": len(search_results),
+            "results": search_results[:5],
+        })
+    return responses
+
+
 def create_customer_verification_agent(model_client):
     """Create the Customer Verification Agent with tools and structured output."""
     
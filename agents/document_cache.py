@@ -0,0 +1,165 @@
+"""
+Document Cache for the Benefit Orchestrator System.
+Content-addressed on-disk cache of processed documents, shared by worker processes and across runs.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, Optional
+
+from agents.document_ingestion import EXTRACTOR_VERSION
+
+
+# Eviction trims the cache to this fraction of max_bytes so it does not run on every write
+EVICTION_LOW_WATERMARK = 0.9
+
+# Temporary files older than this are left over from crashed writers
+STALE_TEMP_SECONDS = 3600
+
+
+class DocumentCache:
+    """Processed document content keyed by file content hash, document type and extractor version.
+
+    Entries are written to a temporary file and renamed into place, so readers in
+    other processes see either the whole entry or none. Reads refresh the entry's
+    mtime, and eviction removes entries of other extractor versions first, then
+    the least recently used, until the cache fits ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, version: str = EXTRACTOR_VERSION,
+                 evict_every: int = 200):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.evict_every = evict_every
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+        os.makedirs(self._version_directory, exist_ok=True)
+
+    @property
+    def _version_directory(self) -> str:
+        return os.path.join(self.directory, f"v{self.version}")
+
+    def _path(self, content_hash: str, document_type: str) -> str:
+        key = hashlib.sha256(f"{self.version}\0{document_type}\0{content_hash}".encode("utf-8")).hexdigest()
+        return os.path.join(self._version_directory, key[:2], key + ".json")
+
+    def get(self, content_hash: str, document_type: str) -> Optional[Dict[str, Any]]:
+        """Cached content for a document, or None on a miss."""
+        path = self._path(content_hash, document_type)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.stats["misses"] += 1
+            return None
+        if entry.get("version") != self.version or entry.get("content_sha256") != content_hash:
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return entry["content"]
+
+    def put(self, content_hash: str, document_type: str, content: Dict[str, Any]):
+        """Store processed content atomically."""
+        path = self._path(content_hash, document_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"version": self.version, "content_sha256": content_hash, "document_type": document_type,
+                 "content": content}
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self.stats["writes"] += 1
+        if self.stats["writes"] % self.evict_every == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Trim the cache below ``max_bytes``; returns the number of entries removed."""
+        now = time.time()
+        current_version = os.path.abspath(self._version_directory) + os.sep
+        entries, total = [], 0
+        for directory, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.startswith(".tmp-"):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        self._remove(path)
+                    continue
+                stale = not os.path.abspath(path).startswith(current_version)
+                entries.append((not stale, stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        target = self.max_bytes * EVICTION_LOW_WATERMARK if total > self.max_bytes else None
+        # Other versions sort first (False < True), then least recently used
+        for current, _, size, path in sorted(entries):
+            if current and (target is None or total <= target):
+                break
+            if self._remove(path):
+                removed += 1
+                total -= size
+        self.stats["evicted"] += removed
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(os.path.join(directory, name))
+                   for directory, _, files in os.walk(self.directory) for name in files)
+
+
+_CACHES: Dict[str, DocumentCache] = {}
+
+
+def shared_document_cache() -> Optional[DocumentCache]:
+    """The cache configured by ``SCRA_DOCUMENT_CACHE`` (and ``SCRA_DOCUMENT_CACHE_MB``), if any."""
+    directory = os.environ.get("SCRA_DOCUMENT_CACHE")
+    if not directory:
+        return None
+    if directory not in _CACHES:
+        max_bytes = int(float(os.environ.get("SCRA_DOCUMENT_CACHE_MB", "512")) * 1024 * 1024)
+        _CACHES[directory] = DocumentCache(directory, max_bytes=max_bytes)
+    return _CACHES[directory]
+
+
+def main():
+    """Report on or trim a document cache directory."""
+    parser = argparse.ArgumentParser(description="Inspect and trim the on-disk document cache.")
+    parser.add_argument("directory", help="Cache directory (SCRA_DOCUMENT_CACHE)")
+    parser.add_argument("--max-mb", type=float, default=512, help="Size bound in megabytes")
+    parser.add_argument("--evict", action="store_true", help="Remove stale-version and least recently used entries")
+    args = parser.parse_args()
+
+    cache = DocumentCache(args.directory, max_bytes=int(args.max_mb * 1024 * 1024))
+    print(f"📦 {args.directory}: {cache.size_bytes() / 1024 / 1024:.1f} MB (extractor version {cache.version})")
+    if args.evict:
+        removed = cache.evict()
+        print(f"🧹 Removed {removed} entries; now {cache.size_bytes() / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
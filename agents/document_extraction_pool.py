@@ -0,0 +1,196 @@
+"""
+Document Extraction Pool for the Benefit Orchestrator System.
+Runs CPU-bound document parsing and field extraction in worker processes, off the agents' event loop.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set
+
+from agents.document_ingestion import DOCUMENT_FIELDS, ingest_document
+
+
+class ExtractionJob(NamedTuple):
+    """A document to extract; the type is inferred from the file name when not given."""
+    request_id: str
+    document_id: str
+    path: str
+    document_type: Optional[str] = None
+
+
+# File-name prefixes used by the request data, e.g. bank_statements_DOC-001.pdf
+_TYPE_BY_SLUG = {re.sub(r"[^a-z0-9]+", "_", document_type.lower()): document_type
+                 for document_type in DOCUMENT_FIELDS}
+
+
+def infer_document_type(path: str) -> Optional[str]:
+    """Document type from a ``<type_slug>_<document id>.<ext>`` file name."""
+    name = os.path.basename(path).lower()
+    for slug in sorted(_TYPE_BY_SLUG, key=len, reverse=True):
+        if name.startswith(slug + "_"):
+            return _TYPE_BY_SLUG[slug]
+    return None
+
+
+def extract_job(job: ExtractionJob) -> Dict[str, Any]:
+    """Extract one document in a worker process.
+
+    Returns:
+        Dict[str, Any]: ``{"result": ..., "worker": pid, "seconds": ...}`` where the
+        result has the same shape as a ``get_document`` response (or its error shape)
+    """
+    started = time.perf_counter()
+    document_type = job.document_type or infer_document_type(job.path) or "Unknown"
+    content = ingest_document(job.path, document_type, job.document_id)
+    if content is None:
+        result = {"error": f"Document file '{job.path}' not found for document '{job.document_id}'"}
+    else:
+        result = {
+            "request_id": job.request_id,
+            "document_id": job.document_id,
+            "document_type": document_type,
+            "file_name": os.path.basename(job.path),
+            "content": content,
+        }
+    return {"result": result, "worker": os.getpid(), "seconds": time.perf_counter() - started}
+
+
+class DocumentExtractionService:
+    """Process-pool extraction service with a bounded queue and per-job timeouts.
+
+    At most ``max_pending`` jobs are submitted to the pool at once; further
+    jobs wait in the caller. A job that exceeds ``job_timeout`` gets an error
+    result, but its worker finishes the job before taking another, since a
+    process pool cannot interrupt a single task; the job keeps its slot until
+    then, so stuck jobs cannot pile up beyond ``max_pending``.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 job_timeout: float = 30.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.job_timeout = job_timeout
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._abandoned: Set[asyncio.Future] = set()
+        self._started: Optional[float] = None
+        self._counts = defaultdict(int)
+        self._per_worker: Dict[int, Dict[str, float]] = defaultdict(lambda: {"documents": 0, "busy_seconds": 0.0})
+
+    async def extract(self, job: ExtractionJob) -> Dict[str, Any]:
+        """Extract one document, waiting for a queue slot first."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        if self._started is None:
+            self._started = time.perf_counter()
+        await self._slots.acquire()
+        try:
+            future = self._executor.submit(extract_job, job)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is freed when the worker is done with the job, not when the caller stops waiting for it
+        waiter = asyncio.wrap_future(future)
+        waiter.add_done_callback(self._job_done)
+        try:
+            outcome = await asyncio.wait_for(asyncio.shield(waiter), self.job_timeout)
+        except asyncio.TimeoutError:
+            self._counts["timed_out"] += 1
+            if not future.cancel():
+                self._abandoned.add(waiter)
+            return {"error": f"Extraction of document '{job.document_id}' timed out after {self.job_timeout}s"}
+        except Exception as error:
+            self._counts["failed"] += 1
+            return {"error": f"Extraction of document '{job.document_id}' failed: {error}"}
+
+        worker = self._per_worker[outcome["worker"]]
+        worker["documents"] += 1
+        worker["busy_seconds"] += outcome["seconds"]
+        self._counts["failed" if "error" in outcome["result"] else "documents"] += 1
+        return outcome["result"]
+
+    def _job_done(self, waiter: asyncio.Future):
+        self._slots.release()
+        self._abandoned.discard(waiter)
+        if not waiter.cancelled():
+            # Nobody awaits a timed-out job's outcome; retrieve it so its error is not logged as unhandled
+            waiter.exception()
+
+    async def extract_batch(self, jobs: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Extract a batch of ``(request_id, document_id, path[, document_type])`` jobs, in input order."""
+        return await asyncio.gather(*(self.extract(ExtractionJob(*job)) for job in jobs))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Throughput overall and in documents per second of busy time per worker, and timed-out jobs still running."""
+        wall = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "workers": self.workers,
+            "documents": self._counts["documents"],
+            "failed": self._counts["failed"],
+            "timed_out": self._counts["timed_out"],
+            "timed_out_still_running": len(self._abandoned),
+            "wall_seconds": round(wall, 3),
+            "documents_per_second": round(self._counts["documents"] / wall, 1) if wall else None,
+            "per_worker": {
+                pid: {
+                    "documents": stats["documents"],
+                    "documents_per_second": round(stats["documents"] / stats["busy_seconds"], 1)
+                    if stats["busy_seconds"] else None,
+                }
+                for pid, stats in self._per_worker.items()
+            },
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def jobs_from_directory(root: str) -> List[ExtractionJob]:
+    """One job per document file under ``root``, using the document ID in each file name."""
+    jobs = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            match = re.search(r"(DOC-\d+)", name)
+            if match:
+                jobs.append(ExtractionJob("", match.group(1), os.path.join(directory, name)))
+    return jobs
+
+
+def main():
+    """Benchmark in-process extraction against the process pool on a directory of documents."""
+    parser = argparse.ArgumentParser(description="Extract document files with a process pool.")
+    parser.add_argument("root", help="Directory of document files (e.g. from simulation.sample_documents)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to CPU count)")
+    parser.add_argument("--job-timeout", type=float, default=30.0, help="Seconds before a job is abandoned")
+    args = parser.parse_args()
+
+    jobs = jobs_from_directory(args.root)
+    print(f"📄 {len(jobs)} documents under {args.root}")
+
+    # The pool runs first so forked workers do not inherit extraction caches warmed in-process
+    service = DocumentExtractionService(workers=args.workers, job_timeout=args.job_timeout)
+    try:
+        asyncio.run(service.extract_batch(jobs))
+        metrics = service.metrics()
+    finally:
+        service.close()
+
+    started = time.perf_counter()
+    for job in jobs:
+        extract_job(job)
+    sequential = time.perf_counter() - started
+
+    print(f"   In-process: {len(jobs) / sequential:.1f} documents/s")
+    print(f"   Pool ({metrics['workers']} workers): {metrics['documents_per_second']} documents/s, "
+          f"{metrics['failed']} failed, {metrics['timed_out']} timed out")
+    for pid, stats in metrics["per_worker"].items():
+        print(f"      worker {pid}: {stats['documents']} documents, {stats['documents_per_second']} documents/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Document Ingestion for the Benefit Orchestrator System.
+Reads document files through memory-mapped I/O and extracts text and fields per document type with pure-Python parsers.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Bump whenever extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = "1"
+
+# Fields extracted per document type; the names match _create_mock_document_content in
+# document_processing_agent.py so agents see the same content shape for real and mock documents
+DOCUMENT_FIELDS = {
+    "Orders Document": ["orders_type", "effective_date", "from_location", "to_location", "report_date",
+                        "service_member_name", "rank", "branch", "orders_number", "deployment_type",
+                        "duration_days", "authorized_by"],
+    "Proof of Military Service": ["service_verification", "active_duty_status", "branch", "rank",
+                                  "verification_date", "service_start_date", "service_end_date",
+                                  "service_duration_months", "discharge_type", "military_occupation",
+                                  "combat_service", "service_connected_disabilities"],
+    "Leave and Earnings Statement": ["pay_period", "base_pay", "allowances", "deductions", "net_pay",
+                                     "service_member_name", "rank", "branch", "deployment_allowance",
+                                     "hazard_pay", "combat_pay", "total_compensation"],
+    "Proof of Residence": ["address_verified", "lease_start_date", "monthly_rent", "landlord_contact",
+                           "current_address", "residency_duration_months", "utility_bills_included",
+                           "military_housing", "pcs_affected"],
+    "Loan Statement": ["loan_type", "account_number", "original_balance", "current_balance", "monthly_payment",
+                       "interest_rate", "loan_origination_date", "lender_name", "payment_history",
+                       "deferment_eligible", "pre_service_account"],
+    "Financial Hardship Documentation": ["hardship_type", "monthly_income", "monthly_expenses", "deficit_amount",
+                                         "hardship_duration_months", "service_connection",
+                                         "documentation_provided", "verification_status"],
+    "Mortgage Documents": ["mortgage_type", "account_number", "original_loan_amount", "current_balance",
+                           "monthly_payment", "interest_rate", "loan_origination_date", "lender_name",
+                           "property_address", "pre_service_mortgage", "scra_eligible"],
+    "Bank Statements": ["bank_name", "account_type", "account_number", "statement_period", "opening_balance",
+                        "closing_balance", "overdraft_fees", "fee_dates", "deployment_related_fees",
+                        "fee_occurrence_days"],
+    "Credit Statements": ["credit_card_type", "account_number", "current_balance", "credit_limit", "current_apr",
+                          "account_opening_date", "issuer_name", "pre_service_account", "scra_eligible",
+                          "payment_history"],
+    "Account History": ["account_type", "account_number", "opening_date", "pre_service_balance",
+                        "pre_service_apr", "current_balance", "current_apr", "payment_history",
+                        "scra_application_date"],
+}
+
+# Printed labels that differ from the field names they fill
+FIELD_ALIASES = {
+    "orders_no": "orders_number",
+    "order_number": "orders_number",
+    "name": "service_member_name",
+    "service_member": "service_member_name",
+    "status": "active_duty_status",
+    "duty_status": "active_duty_status",
+    "apr": "current_apr",
+    "address": "current_address",
+    "lender": "lender_name",
+    "issuer": "issuer_name",
+    "bank": "bank_name",
+}
+
+LIST_FIELDS = {"fee_dates", "documentation_provided", "service_connected_disabilities"}
+
+# Characters of extracted text returned alongside the fields
+TEXT_EXCERPT_CHARACTERS = 1000
+
+_LABEL_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z0-9 ()./&'-]{1,60}?)\s*:\s*(.*?)\s*$", re.M)
+_TRANSACTION_LINE = re.compile(r"^\s*(\d{4}-\d{2}-\d{2})\s+(.+?)\s+(-?\$?-?[\d,]+\.\d{2})\s*$", re.M)
+_NUMBER = re.compile(r"^-?\$?-?[\d,]*\.?\d+%?$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_PDF_STREAM = re.compile(rb"(?<!end)stream\r?\n")
+_PDF_TEXT_OPERATORS = re.compile(
+    rb"\((?P<string>(?:\\.|[^\\)])*)\)\s*(?:Tj|'|\")"
+    rb"|\[(?P<array>(?:\\.|[^\]])*)\]\s*TJ"
+    rb"|(?<![A-Za-z])(?P<newline>T\*|Td|TD|ET)(?![A-Za-z])",
+    re.S,
+)
+_PDF_ARRAY_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+_PDF_ESCAPE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+# Extracted fields by (content hash, document type); metadata-keyed index avoids rehashing unchanged files
+_EXTRACTION_CACHE: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_FILE_HASHES: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+# Tools run in executor threads; guards both caches (extraction itself runs unlocked)
+_CACHE_LOCK = threading.Lock()
+EXTRACTION_CACHE_SIZE = 512
+# Bounded too: a long-running worker sees every document file only once or twice
+FILE_HASH_CACHE_SIZE = 8192
+
+
+def resolve_document_path(file_path: str) -> Optional[str]:
+    """Locate a document's file, re-rooting ``/documents/...`` paths under ``SCRA_DOCUMENT_ROOT`` if set."""
+    root = os.environ.get("SCRA_DOCUMENT_ROOT")
+    candidates = [os.path.join(root, file_path.lstrip("/")), os.path.join(root, os.path.basename(file_path))] \
+        if root else []
+    candidates.append(file_path)
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _unescape_pdf_string(raw: bytes) -> bytes:
+    if b"\\" not in raw:
+        return raw
+
+    def _replace(match):
+        escape = match.group(1)
+        if escape[0] in b"01234567":
+            return bytes([int(escape, 8) & 0xFF])
+        if escape in (b"\n", b"\r"):
+            return b""
+        return _PDF_ESCAPES.get(escape, escape)
+    return _PDF_ESCAPE.sub(_replace, raw)
+
+
+def _content_stream_text(content: bytes) -> List[str]:
+    """Text shown by a PDF content stream, one entry per text line."""
+    lines, current = [], []
+    for match in _PDF_TEXT_OPERATORS.finditer(content):
+        if match.group("newline"):
+            if current:
+                lines.append(b"".join(current).decode("latin-1"))
+                current = []
+        elif match.group("string") is not None:
+            current.append(_unescape_pdf_string(match.group("string")))
+        else:
+            current.extend(_unescape_pdf_string(part) for part in _PDF_ARRAY_STRING.findall(match.group("array")))
+    if current:
+        lines.append(b"".join(current).decode("latin-1"))
+    return lines
+
+
+def extract_pdf_text(data) -> str:
+    """Extract text from an uncompressed or FlateDecode PDF held in a buffer such as an mmap.
+
+    Only stream payloads are sliced out of the buffer, so the file is never
+    copied as a whole. Scanned (image-only) PDFs yield no text.
+    """
+    lines = []
+    with memoryview(data) as view:
+        for match in _PDF_STREAM.finditer(data):
+            start = match.end()
+            end = data.find(b"endstream", start)
+            if end < 0:
+                break
+            header = data[max(0, match.start() - 512):match.start()]
+            header = header[header.rfind(b"obj"):]
+            payload = view[start:end]
+            try:
+                content = zlib.decompress(payload) if b"/FlateDecode" in header else bytes(payload)
+            except zlib.error:
+                continue
+            finally:
+                payload.release()
+            if b"/Subtype /Image" in header or b"/Subtype/Image" in header:
+                continue
+            lines.extend(_content_stream_text(content))
+    return "\n".join(lines)
+
+
+def _coerce(field: str, value: str) -> Any:
+    """Convert a printed value into the type the mock content uses for it."""
+    if field in LIST_FIELDS:
+        return [item.strip() for item in value.split(",") if item.strip() and item.strip().lower() != "none"]
+    lowered = value.lower()
+    if lowered in ("yes", "true", "verified"):
+        return True
+    if lowered in ("no", "false"):
+        return False
+    if lowered in ("", "none", "n/a", "null"):
+        return None
+    if _NUMBER.match(value) and not _DATE.match(value):
+        number = float(value.replace("$", "").replace(",", "").rstrip("%"))
+        return int(number) if number.is_integer() and "." not in value else number
+    return value
+
+
+def _normalize_label(label: str) -> str:
+    field = re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+    return FIELD_ALIASES.get(field, field)
+
+
+def extract_fields(text: str, document_type: str) -> Dict[str, Any]:
+    """Extract the known fields of a document type from ``Label: value`` lines.
+
+    Bank statements also derive ``overdraft_fees`` and ``fee_dates`` from
+    their transaction lines when the summary does not print them.
+    """
+    known = set(DOCUMENT_FIELDS.get(document_type, []))
+    fields: Dict[str, Any] = {}
+    for label, value in _LABEL_LINE.findall(text):
+        field = _normalize_label(label)
+        if field in known and field not in fields:
+            fields[field] = _coerce(field, value)
+
+    if document_type == "Bank Statements" and "overdraft_fees" not in fields:
+        fees = [(day, float(amount.replace("$", "").replace(",", "")))
+                for day, description, amount in _TRANSACTION_LINE.findall(text)
+                if "overdraft" in description.lower()]
+        fields["overdraft_fees"] = round(sum(abs(amount) for _, amount in fees), 2)
+        fields.setdefault("fee_dates", sorted({day for day, _ in fees}))
+    return fields
+
+
+def _file_digest(data) -> str:
+    digest = hashlib.sha256()
+    with memoryview(data) as view:
+        for offset in range(0, len(view), 1 << 20):
+            digest.update(view[offset:offset + (1 << 20)])
+    return digest.hexdigest()
+
+
+def _extract(data, path: str, document_type: str) -> Dict[str, Any]:
+    text = extract_pdf_text(data) if data[:5] == b"%PDF-" else str(data[:], "utf-8", errors="replace")
+    return {
+        **extract_fields(text, document_type),
+        "text_excerpt": text[:TEXT_EXCERPT_CHARACTERS],
+        "extracted_text_characters": len(text),
+    }
+
+
+def extract_document_file(path: str, document_type: str) -> Tuple[str, Dict[str, Any]]:
+    """Hash and extract a document file through a read-only memory map.
+
+    Extraction results are looked up in memory, then in the on-disk document
+    cache shared by worker processes (``SCRA_DOCUMENT_CACHE``), before parsing.
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: ``(content_sha256, extracted fields)``
+    """
+    from agents.document_cache import shared_document_cache
+    disk_cache = shared_document_cache()
+
+    stat = os.stat(path)
+    file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _CACHE_LOCK:
+        content_hash = _FILE_HASHES.get(file_key)
+        extracted = _EXTRACTION_CACHE.get((content_hash, document_type)) if content_hash is not None else None
+        if extracted is not None:
+            _FILE_HASHES.move_to_end(file_key)
+            _EXTRACTION_CACHE.move_to_end((content_hash, document_type))
+            return content_hash, extracted
+
+    with open(path, "rb") as f:
+        if stat.st_size == 0:
+            content_hash, extracted = hashlib.sha256(b"").hexdigest(), _extract(b"", path, document_type)
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                content_hash = _file_digest(data)
+                with _CACHE_LOCK:
+                    extracted = _EXTRACTION_CACHE.get((content_hash, document_type))
+                if extracted is None and disk_cache is not None:
+                    extracted = disk_cache.get(content_hash, document_type)
+                if extracted is None:
+                    extracted = _extract(data, path, document_type)
+                    if disk_cache is not None:
+                        disk_cache.put(content_hash, document_type, extracted)
+
+    with _CACHE_LOCK:
+        _FILE_HASHES[file_key] = content_hash
+        _FILE_HASHES.move_to_end(file_key)
+        while len(_FILE_HASHES) > FILE_HASH_CACHE_SIZE:
+            _FILE_HASHES.popitem(last=False)
+        _EXTRACTION_CACHE[(content_hash, document_type)] = extracted
+        _EXTRACTION_CACHE.move_to_end((content_hash, document_type))
+        while len(_EXTRACTION_CACHE) > EXTRACTION_CACHE_SIZE:
+            _EXTRACTION_CACHE.popitem(last=False)
+    return content_hash, extracted
+
+
+def ingest_document(file_path: str, document_type: str, document_id: str) -> Optional[Dict[str, Any]]:
+    """Build ``get_document`` content from the real file, or return None if no file is found.
+
+    Args:
+        file_path (str): The document's ``filePath`` from the request
+        document_type (str): The document's ``documentType``
+        document_id (str): The document ID reported in the content
+
+    Returns:
+        Optional[Dict[str, Any]]: Content shaped like the mock content, plus
+        ``content_sha256``, a text excerpt and the extracted text length
+    """
+    path = resolve_document_path(file_path)
+    if path is None:
+        return None
+    content_hash, extracted = extract_document_file(path, document_type)
+    return {
+        "document_id": document_id,
+        "file_path": file_path,
+        "processed_date": date.today().isoformat(),
+        "content_sha256": content_hash,
+        **extracted,
+    }
@@ -7,6 +7,17 @@ from autogen_agentchat.agents import AssistantAgent
 from autogen_core.model_context import UnboundedChatCompletionContext
 
 
+# Required documents per benefit type, as listed in the BENEFIT ELIGIBILITY RULES below.
+# Each inner list is satisfied by any one of its document types. Keep in sync with the prompt;
+# the pre-screen, pre-score, decision cache and synthetic population all read this table.
+REQUIRED_DOCUMENTS = {
+    "Auto Loan Deferment": [["Orders Document"], ["Loan Statement"], ["Financial Hardship Documentation"]],
+    "Foreclosure Protection": [["Orders Document"], ["Mortgage Documents"]],
+    "Overdraft Fee Refund": [["Bank Statements"], ["Orders Document"]],
+    "Credit Card APR Reduction": [["Credit Statements"], ["Orders Document"]],
+}
+
+
 def create_eligibility_decision_agent(model_client):
     """Create the Eligibility Decision Agent."""
     
@@ -0,0 +1,329 @@
+"""
+Record Types for the Benefit Orchestrator System.
+Compact typed records for requests, customers, documents and search results, with a fast JSON codec.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import typing
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Distinct key layouts of document content shared between records; past this, each record keeps its own
+MAX_SHARED_KEY_LAYOUTS = 1024
+
+_KEY_LAYOUTS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+if orjson is not None:
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value).decode("utf-8")
+
+    _loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    _dumps = _encoder.encode
+    _loads = json.loads
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if value.__class__ is str else value
+
+
+def _freeze(value: Any) -> Any:
+    """JSON arrays as tuples, so records stay immutable and share nothing with the decoded document."""
+    if value.__class__ is list:
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if value.__class__ is tuple:
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _record(camel: bool = True, interned: Iterable[str] = (), omit_none: Iterable[str] = ()):
+    """Give a ``NamedTuple`` record ``from_dict``, ``to_dict``, ``from_json`` and ``to_json``.
+
+    The dict converters are generated once per class from its field annotations,
+    as ``namedtuple`` and ``dataclasses`` generate their methods: nested records
+    (optionally ``None``) and tuples of records are converted recursively, other
+    tuples map to JSON arrays. Keys are the camelCase field names when ``camel``
+    is set, as in the request and customer data. ``interned`` fields hold a few
+    distinct values (states, branches, document types) and are shared through
+    ``sys.intern``; ``omit_none`` fields are left out of ``to_dict`` when None.
+    """
+    interned, omit_none = set(interned), set(omit_none)
+
+    def decorate(cls):
+        namespace: Dict[str, Any] = {"_new": tuple.__new__, "_cls": cls, "_intern": _intern, "_freeze": _freeze,
+                                     "_thaw": _thaw}
+        decode, encode, optional_encode = [], [], []
+        for index, (field, annotation) in enumerate(typing.get_type_hints(cls).items()):
+            key = _camel(field) if camel else field
+            origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+            nested = next((arg for arg in (annotation, *args) if hasattr(arg, "_record_keys")), None)
+            value = f"r[{index}]"
+            if nested is not None and origin is tuple:
+                namespace[f"_from{index}"], namespace[f"_to{index}"] = nested.from_dict, nested.to_dict
+                decoded = f"tuple(map(_from{index}, g({key!r}) or ()))"
+                encoded = f"list(map(_to{index}, {value}))"
+            elif nested is not None:
+                namespace[f"_from{index}"], namespace[f"_to{index}"] = nested.from_dict, nested.to_dict
+                decoded = f"(_from{index}(v) if (v := g({key!r})) is not None else None)"
+                encoded = f"(_to{index}({value}) if {value} is not None else None)"
+            elif origin is tuple:
+                decoded, encoded = f"_freeze(g({key!r}))", f"_thaw({value})"
+            elif field in interned:
+                decoded, encoded = f"_intern(g({key!r}))", value
+            else:
+                decoded, encoded = f"g({key!r})", value
+            decode.append(decoded)
+            if field in omit_none:
+                optional_encode.append(f"    if {value} is not None: d[{key!r}] = {encoded}")
+            else:
+                encode.append(f"{key!r}: {encoded}")
+        source = "\n".join([
+            "def from_dict(d):",
+            "    g = d.get",
+            f"    return _new(_cls, ({', '.join(decode)},))",
+            "def to_dict(r):",
+            f"    d = {{{', '.join(encode)}}}",
+            *optional_encode,
+            "    return d",
+        ])
+        exec(source, namespace)
+        cls._record_keys = tuple(_camel(field) if camel else field for field in cls._fields)
+        cls.from_dict = staticmethod(namespace["from_dict"])
+        cls.to_dict = namespace["to_dict"]
+        cls.from_json = classmethod(lambda record_cls, text: record_cls.from_dict(_loads(text)))
+        cls.to_json = lambda self: _dumps(self.to_dict())
+        return cls
+
+    return decorate
+
+
+@_record(interned=("city", "state"))
+class Address(NamedTuple):
+    street: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    zip: Optional[str]
+
+
+@_record(interned=("military_status", "branch"))
+class Requestor(NamedTuple):
+    full_name: Optional[str]
+    date_of_birth: Optional[str]
+    ssn_last4: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    address: Optional[Address]
+    military_status: Optional[str]
+    branch: Optional[str]
+    service_start_date: Optional[str]
+    service_end_date: Optional[str]
+
+
+@_record(interned=("military_status", "branch"))
+class Customer(NamedTuple):
+    customer_id: Optional[str]
+    full_name: Optional[str]
+    date_of_birth: Optional[str]
+    ssn_last4: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    address: Optional[Address]
+    military_status: Optional[str]
+    branch: Optional[str]
+    service_start_date: Optional[str]
+    service_end_date: Optional[str]
+
+
+@_record(interned=("benefit_type",))
+class RequestDetails(NamedTuple):
+    benefit_type: Optional[str]
+    description: Optional[str]
+    requested_effective_date: Optional[str]
+
+
+@_record(interned=("document_type",), omit_none=("request_id",))
+class DocumentRef(NamedTuple):
+    """A document listed on a request; population document rows also carry their ``request_id``."""
+    document_id: Optional[str]
+    document_type: Optional[str]
+    file_name: Optional[str]
+    file_path: Optional[str]
+    request_id: Optional[str] = None
+
+
+@_record()
+class Request(NamedTuple):
+    request_id: Optional[str]
+    timestamp: Optional[str]
+    customer_id: Optional[str]
+    requestor: Optional[Requestor]
+    request_details: Optional[RequestDetails]
+    documents: Tuple[DocumentRef, ...]
+
+
+@_record(camel=False)
+class SearchResult(NamedTuple):
+    """One ``customer_search`` result: the customer, its confidence and the factors behind it."""
+    customer: Optional[Customer]
+    confidence_percentage: Optional[int]
+    confidence_factors: Tuple[Tuple[Any, ...], ...]
+    match_summary: Optional[str]
+
+
+class DocumentContent(NamedTuple):
+    """Processed document content: the common fields plus the fields of its document type.
+
+    The type-specific keys vary by document type and extraction, so they are
+    kept as a key tuple shared by every record with the same layout and a value
+    tuple, rather than a dict per record.
+    """
+    document_id: Optional[str]
+    file_path: Optional[str]
+    processed_date: Optional[str]
+    detail_keys: Tuple[str, ...]
+    detail_values: Tuple[Any, ...]
+
+    _COMMON_KEYS = ("document_id", "file_path", "processed_date")
+
+    @staticmethod
+    def from_dict(d: Dict[str, Any]) -> "DocumentContent":
+        details = [(key, value) for key, value in d.items() if key not in DocumentContent._COMMON_KEYS]
+        keys = tuple(key for key, _ in details)
+        shared = _KEY_LAYOUTS.get(keys)
+        if shared is None and len(_KEY_LAYOUTS) < MAX_SHARED_KEY_LAYOUTS:
+            shared = _KEY_LAYOUTS[keys] = tuple(sys.intern(key) for key in keys)
+        return tuple.__new__(DocumentContent, (d.get("document_id"), d.get("file_path"), d.get("processed_date"),
+                                               shared or keys, tuple(value for _, value in details)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"document_id": self[0], "file_path": self[1], "processed_date": self[2]}
+        d.update(zip(self[3], self[4]))
+        return d
+
+    @classmethod
+    def from_json(cls, text) -> "DocumentContent":
+        return cls.from_dict(_loads(text))
+
+    def to_json(self) -> str:
+        return _dumps(self.to_dict())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """A field by its JSON key, common or type-specific."""
+        if key in self._COMMON_KEYS:
+            return self[self._COMMON_KEYS.index(key)]
+        try:
+            return self.detail_values[self.detail_keys.index(key)]
+        except ValueError:
+            return default
+
+
+def _sample_records(population: Optional[str], count: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Record dicts of each kind, from the population database or the embedded mock data."""
+    import itertools
+    from agents.customer_verification_agent import MOCK_CUSTOMERS_DATA, bulk_customer_search
+    from agents.document_processing_agent import get_document
+    from agents.orchestrator_agent import get_request_details
+
+    if population:
+        from simulation.synthetic_population import read_population
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(population)
+        requests = list(itertools.islice(read_population(population, "request"), count))
+        customers = list(itertools.islice(read_population(population, "customer"), count))
+        documents = list(itertools.islice(read_population(population, "document"), count))
+    else:
+        embedded = [json.loads(get_request_details(f"REQ-{i:03d}"))["request"] for i in range(1, 6)]
+        requests = list(itertools.islice(itertools.cycle(embedded), count))
+        customers = list(itertools.islice(itertools.cycle(MOCK_CUSTOMERS_DATA), count))
+        documents = list(itertools.islice(itertools.cycle(
+            [document for request in embedded for document in request["documents"]]), count))
+
+    contents = []
+    for request in itertools.cycle(requests[:max(1, count // 2)]):
+        for document in request["documents"]:
+            contents.append(json.loads(get_document(request["requestId"], document["documentId"]))["content"])
+        if len(contents) >= count:
+            break
+    searches = bulk_customer_search((request["requestor"]["ssnLast4"], request["requestor"]["fullName"], "")
+                                    for request in requests)
+    results = list(itertools.islice(itertools.cycle(
+        [result for search in searches for result in search["results"]]), count))
+    return {"Request": requests, "Customer": customers, "DocumentRef": documents,
+            "DocumentContent": contents[:count], "SearchResult": results}
+
+
+def _traced_bytes(build: Callable[[], List[Any]]) -> Tuple[List[Any], int]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return built, size
+
+
+def _rate(function: Callable[[Any], Any], items: List[Any]) -> float:
+    started = time.perf_counter()
+    for item in items:
+        function(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def main():
+    """Benchmark record memory and JSON encode/decode throughput against plain dicts.
+
+    Both sides use the same JSON codec, so the throughput columns show the
+    cost of building and flattening records, not the difference between codecs.
+    """
+    parser = argparse.ArgumentParser(description="Compare typed records with plain dicts.")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--records", type=int, default=20_000, help="Records of each kind")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-benchmark")
+    samples = _sample_records(args.population, args.records)
+    record_types = {"Request": Request, "Customer": Customer, "DocumentRef": DocumentRef,
+                    "DocumentContent": DocumentContent, "SearchResult": SearchResult}
+
+    print(f"📊 Records against dicts (JSON codec: {'orjson' if orjson is not None else 'json'})")
+    print(f"   {'record':<16} {'count':>7} {'dict B':>8} {'record B':>9} {'saved':>6}"
+          f" {'dict dec/s':>11} {'rec dec/s':>11} {'dict enc/s':>11} {'rec enc/s':>11}")
+    for name, dicts in samples.items():
+        record_type = record_types[name]
+        texts = [_dumps(d) for d in dicts]
+        plain, dict_bytes = _traced_bytes(lambda: [_loads(text) for text in texts])
+        records, record_bytes = _traced_bytes(lambda: [record_type.from_json(text) for text in texts])
+        if any(record.to_dict() != d for record, d in zip(records, plain)):
+            print(f"❌ {name}: records do not round-trip to the original dicts")
+            continue
+        dict_decode = _rate(_loads, texts)
+        record_decode = _rate(record_type.from_json, texts)
+        dict_encode = _rate(_dumps, plain)
+        record_encode = _rate(record_type.to_json, records)
+        count = len(dicts)
+        print(f"   {name:<16} {count:>7} {dict_bytes / count:>8.0f} {record_bytes / count:>9.0f}"
+              f" {100 * (1 - record_bytes / dict_bytes):>5.0f}% {dict_decode:>11,.0f} {record_decode:>11,.0f}"
+              f" {dict_encode:>11,.0f} {record_encode:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
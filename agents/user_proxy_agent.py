@@ -6,10 +6,16 @@ Handles user interactions and input collection.
 from autogen_agentchat.agents import UserProxyAgent
 
 
-def create_user_proxy_agent():
-    """Create the User Proxy Agent."""
+def create_user_proxy_agent(input_func=None):
+    """Create the User Proxy Agent.
+
+    Args:
+        input_func: Optional callable that supplies the operations user's reply
+            (defaults to console input; unattended runners pass an auto-reviewer)
+    """
     
     return UserProxyAgent(
         name="User_Proxy_agent",
-        description="Handles user questions, uploads, and final approval"
+        description="Handles user questions, uploads, and final approval",
+        input_func=input_func
     ) 
\ No newline at end of file
@@ -6,9 +6,16 @@ This script creates a complete AutoGen team for processing military benefit requ
 using a modular architecture with individual agent files.
 """
 
+import argparse
+import ast
+import dis
+import hashlib
+import inspect
 import json
 import os
-from typing import Dict, Any
+import re
+import time
+from typing import Dict, Any, Callable, List
 
 # AutoGen imports
 from autogen_agentchat.teams import SelectorGroupChat
@@ -25,10 +32,38 @@ from agents.benefit_execution_agent import create_benefit_execution_agent
 from agents.judge_agent import create_judge_agent
 from agents.user_proxy_agent import create_user_proxy_agent
 
+# Backstop for conversations that never mention TERMINATE
+MAX_MESSAGES = 200
 
 
-def create_benefit_orchestrator_team():
-    """Create the complete benefit orchestrator team."""
+def create_benefit_orchestrator_team(user_input_func=None, checkpointer=None, scheduler=None, tail_latency=None,
+                                     profiler=None, metrics=None, transcript_store=None, cascade=None,
+                                     decision_cache=None, budget=None):
+    """Create the complete benefit orchestrator team.
+
+    Args:
+        user_input_func: Optional input function for the User Proxy Agent, used by
+            unattended runners instead of console input
+        checkpointer: Optional ``runtime.turn_checkpoint.TurnCheckpointer``; when given,
+            the team pauses after every turn so the checkpointer can persist its state
+        scheduler: Optional ``runtime.model_scheduler.ModelCallScheduler`` shared by every
+            team in the process; all agent and speaker-selection model calls go through it
+        tail_latency: Optional ``runtime.tail_latency.TailLatencyControls`` applying per-agent
+            call deadlines, retries and hedging around those model calls
+        profiler: Optional ``runtime.profiling.RequestProfiler`` recording CPU profiles of
+            every agent turn and tool invocation
+        metrics: Optional ``runtime.metrics.TeamMetrics`` recording turn, tool and model call
+            latency, selector retries and Orchestrator JSON parse failures
+        transcript_store: Optional ``runtime.transcript_store.TranscriptStore`` shared by every
+            team in the process; agents' model contexts keep their messages interned in it
+        cascade: Optional ``runtime.model_cascade.ModelCascade`` answering the Verification,
+            Execution and Orchestrator agents' calls from a deterministic tier first and
+            escalating to the model only when that tier cannot answer
+        decision_cache: Optional ``runtime.decision_cache.DecisionCache`` shared by every team
+            in the process; the Eligibility agent reuses decisions for identical fact patterns
+        budget: Optional ``runtime.request_budget.RequestBudget``; the team stops a request
+            that exceeds its token, cost, turn or wall-clock budget
+    """
     
     print("=== Benefit Orchestrator Team Creation ===\n")
     
@@ -54,16 +89,60 @@ def create_benefit_orchestrator_team():
     eligibility_decision_agent = create_eligibility_decision_agent(model_client)
     benefit_execution_agent = create_benefit_execution_agent(model_client)
     judge_agent = create_judge_agent(model_client)
-    user_proxy_agent = create_user_proxy_agent()
+    user_proxy_agent = create_user_proxy_agent(user_input_func)
+
+    model_agents = (customer_verification_agent, document_processing_agent, orchestrator_agent,
+                    eligibility_decision_agent, benefit_execution_agent, judge_agent)
+    selector_model_client = model_client
+    # Scheduling wraps the raw clients so that retries and hedges are admitted through it
+    if scheduler is not None:
+        from runtime.model_scheduler import ScheduledChatCompletionClient, schedule_agent
+        for agent in model_agents:
+            schedule_agent(agent, scheduler)
+        selector_model_client = ScheduledChatCompletionClient(model_client, scheduler)
+    if tail_latency is not None:
+        from runtime.tail_latency import SELECTOR_KEY
+        for agent in model_agents:
+            tail_latency.apply_to_agent(agent)
+        selector_model_client = tail_latency.wrap_client(selector_model_client, SELECTOR_KEY)
+    # The cascade and decision cache sit outside the scheduler and tail latency controls, so answers
+    # they give without the model take no scheduler capacity and only escalated calls are admitted
+    if cascade is not None:
+        for agent in model_agents:
+            cascade.apply_to_agent(agent)
+    if decision_cache is not None:
+        decision_cache.apply_to_agent(eligibility_decision_agent)
+    if profiler is not None:
+        for agent in model_agents:
+            profiler.apply_to_agent(agent)
+    if metrics is not None:
+        from runtime.tail_latency import SELECTOR_KEY
+        for agent in model_agents:
+            metrics.apply_to_agent(agent)
+        selector_model_client = metrics.wrap_client(selector_model_client, SELECTOR_KEY)
+    if transcript_store is not None:
+        import uuid
+        team_session = uuid.uuid4().hex
+        for agent in model_agents:
+            transcript_store.apply_to_agent(agent, team_session)
     
     print("Creating termination conditions...")
     
     # Create termination conditions
-    max_message_termination = MaxMessageTermination(max_messages=200)
     text_mention_termination = TextMentionTermination(text="TERMINATE")
+    if checkpointer is None:
+        max_message_termination = MaxMessageTermination(max_messages=MAX_MESSAGES)
+    else:
+        # The group chat resets its termination condition at every checkpointer pause,
+        # which would restart MaxMessageTermination's count after each turn
+        from runtime.request_budget import TurnBudgetTermination
+        max_message_termination = TurnBudgetTermination(MAX_MESSAGES)
     
-    # Use simple TextMentionTermination to avoid constructor issues
-    termination_condition = text_mention_termination
+    termination_condition = text_mention_termination | max_message_termination
+    if budget is not None and budget.termination() is not None:
+        termination_condition = termination_condition | budget.termination()
+    if checkpointer is not None:
+        termination_condition = termination_condition | checkpointer.turn_boundary()
     
     print("Creating team...")
     
@@ -78,7 +157,7 @@ def create_benefit_orchestrator_team():
             judge_agent,
             user_proxy_agent
         ],
-        model_client=model_client,
+        model_client=selector_model_client,
         model_context=HeadAndTailChatCompletionContext(head_size=1, tail_size=2),
         termination_condition=termination_condition,
         allow_repeated_speaker=False,
@@ -100,25 +179,262 @@ Read the above history and find the final speaker. Apply the rules. Return ONLY
     return team
 
 
-def export_team_config(team, output_file: str = "generated_orchestrator.json"):
-    """Export the team configuration to JSON."""
+# Matches the embedded mock dataset literals inside tool function source
+DATASET_NAME_PATTERN = re.compile(r"^MOCK_[A-Z_]+_DATA$")
+
+
+class ComponentEncoder(json.JSONEncoder):
+    """JSON encoder that flattens AutoGen component models into plain dicts."""
+
+    def default(self, obj):
+        # Try to convert ComponentModel to dict
+        if hasattr(obj, '__dict__'):
+            return obj.__dict__
+        elif hasattr(obj, 'dump_component'):
+            return obj.dump_component()
+        return str(obj)
+
+
+def _global_names(code) -> List[str]:
+    """Global names a code object loads, including in its nested functions and comprehensions, in first-use order."""
+    names = []
+    for instruction in dis.get_instructions(code):
+        if instruction.opname in ("LOAD_GLOBAL", "LOAD_NAME") and instruction.argval not in names:
+            names.append(instruction.argval)
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            names += [name for name in _global_names(constant) if name not in names]
+    return names
+
+
+def _inline_tool_globals(source_code: str, function: Callable) -> str:
+    """Make a tool's serialized source self-contained by inlining the module-level names it uses.
+
+    Data constants the tool reads are assigned at the top of its body, where
+    compact mode finds and externalizes the MOCK_*_DATA literals. Helper
+    functions, and the modules and constants they use, are appended after the
+    tool, since AutoGen loads the first function in the source as the tool.
+
+    Args:
+        source_code (str): The serialized tool function source
+        function (Callable): The tool function, whose module globals are inlined
+
+    Returns:
+        str: The tool source with its module-level dependencies inlined
+    """
+    module_globals = function.__globals__
+    body_constants: List[str] = []
+    definitions: List[str] = []
+    seen = {(function.__name__, False)}
+
+    def visit(code, in_tool: bool):
+        for name in _global_names(code):
+            if name not in module_globals:
+                continue  # builtins
+            value = module_globals[name]
+            same_module = getattr(value, "__module__", None) == function.__module__
+            constant = not (inspect.ismodule(value) or inspect.isfunction(value) or inspect.isclass(value))
+            key = (name, in_tool and constant)
+            if key in seen:
+                continue
+            seen.add(key)
+            if inspect.ismodule(value):
+                definitions.append(f"import {value.__name__}" + (f" as {name}" if name != value.__name__ else ""))
+            elif not constant and same_module:
+                if inspect.isfunction(value):
+                    visit(value.__code__, False)
+                definitions.append(inspect.getsource(value).rstrip())
+            elif not constant:
+                definitions.append(f"from {value.__module__} import {value.__qualname__}"
+                                   + (f" as {name}" if name != value.__qualname__ else ""))
+            else:
+                literal = repr(value)
+                try:
+                    round_trips = ast.literal_eval(literal) == value
+                except (ValueError, SyntaxError):
+                    round_trips = False
+                if not round_trips:
+                    raise ValueError(f"{name}, used by tool {function.__name__}, is not a literal and cannot be inlined")
+                (body_constants if in_tool else definitions).append(f"{name} = {literal}")
+
+    visit(function.__code__, True)
+    if not body_constants and not definitions:
+        return source_code
+
+    lines = source_code.splitlines(keepends=True)
+    if body_constants:
+        body = ast.parse(source_code).body[0].body
+        has_docstring = (isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant)
+                         and isinstance(body[0].value.value, str))
+        insert_at = body[0].end_lineno if has_docstring else body[0].lineno - 1
+        indent = " " * body[0].col_offset
+        lines[insert_at:insert_at] = [f"{indent}{constant}\n" for constant in body_constants]
+    source_code = "".join(lines).rstrip() + "\n"
+    if definitions:
+        source_code += "\n\n" + "\n\n\n".join(definitions) + "\n"
+    return source_code
+
+
+def _tool_functions(team) -> Dict[str, Callable]:
+    """The function of every FunctionTool in the team, by tool name."""
+    functions = {}
+    for agent in getattr(team, "_participants", []):
+        for workbench in getattr(agent, "_workbench", None) or []:
+            for tool in getattr(workbench, "_tools", []):
+                if getattr(tool, "_func", None) is not None:
+                    functions[tool.name] = tool._func
+    return functions
+
+
+def _inline_globals(config: Any, functions: Dict[str, Callable]) -> None:
+    """Walk a serialized component config and inline the module-level names of every FunctionTool."""
+    if isinstance(config, dict):
+        if isinstance(config.get("source_code"), str) and config.get("name") in functions:
+            config["source_code"] = _inline_tool_globals(config["source_code"], functions[config["name"]])
+        for value in config.values():
+            _inline_globals(value, functions)
+    elif isinstance(config, list):
+        for value in config:
+            _inline_globals(value, functions)
+
+
+def _dataset_loader_source(name: str, key: str, data_file: str, indent: str) -> str:
+    """Build the source lines that replace an embedded dataset literal.
+
+    The side file is read on the first tool call and cached in the tool's
+    exec globals, so loading the team config in AutoGen Studio never parses
+    the datasets and later calls never re-read the file. Its path is resolved
+    at call time: ``SCRA_DATASETS_FILE`` if set, else ``data_file`` as given
+    (relative paths are relative to the working directory of the tool's process).
+    """
+    lines = [
+        'if "_SCRA_DATASETS" not in globals():',
+        '    import json as _json, os as _os',
+        f'    with open(_os.environ.get("SCRA_DATASETS_FILE", {data_file!r}), encoding="utf-8") as _dataset_file:',
+        '        globals()["_SCRA_DATASETS"] = _json.load(_dataset_file)',
+        f'{name} = globals()["_SCRA_DATASETS"][{key!r}]',
+    ]
+    return "\n".join(indent + line for line in lines) + "\n"
+
+
+def _externalize_tool_datasets(source_code: str, datasets: Dict[str, Any], data_file: str) -> str:
+    """Replace embedded MOCK_*_DATA literals in a tool's source with side-file lookups.
+
+    Args:
+        source_code (str): The serialized tool function source
+        datasets (Dict[str, Any]): Shared dataset store, keyed by content hash, filled in place
+        data_file (str): Default path of the side file the tool will read at call time
+
+    Returns:
+        str: The rewritten tool source
+    """
+    lines = source_code.splitlines(keepends=True)
+    replacements = []
+    for node in ast.walk(ast.parse(source_code)):
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name) or not DATASET_NAME_PATTERN.match(target.id):
+            continue
+        try:
+            value = ast.literal_eval(node.value)
+        except ValueError:
+            continue
+
+        # Identical datasets embedded in several tools are stored once
+        canonical = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        key = f"{target.id}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]}"
+        datasets.setdefault(key, value)
+
+        indent = lines[node.lineno - 1][:node.col_offset]
+        replacements.append((node.lineno, node.end_lineno, _dataset_loader_source(target.id, key, data_file, indent)))
+
+    # Replace bottom-up so earlier line numbers stay valid
+    for start, end, replacement in sorted(replacements, reverse=True):
+        lines[start - 1:end] = [replacement]
+    return "".join(lines)
+
+
+def _externalize_datasets(config: Any, datasets: Dict[str, Any], data_file: str) -> None:
+    """Walk a serialized component config and externalize datasets of every FunctionTool."""
+    if isinstance(config, dict):
+        if isinstance(config.get("source_code"), str):
+            config["source_code"] = _externalize_tool_datasets(config["source_code"], datasets, data_file)
+        for value in config.values():
+            _externalize_datasets(value, datasets, data_file)
+    elif isinstance(config, list):
+        for value in config:
+            _externalize_datasets(value, datasets, data_file)
+
+
+def _average_parse_seconds(text: str, repeat: int = 20) -> float:
+    """Average json.loads time for a serialized document."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def report_export_comparison(standard_text: str, compact_text: str, data_text: str):
+    """Print a size and parse-time comparison of the standard and compact exports."""
+    standard_size = len(standard_text.encode('utf-8'))
+    compact_size = len(compact_text.encode('utf-8'))
+    data_size = len(data_text.encode('utf-8'))
+    standard_parse = _average_parse_seconds(standard_text)
+    compact_parse = _average_parse_seconds(compact_text)
+    data_parse = _average_parse_seconds(data_text)
+
+    print("\n📊 Export comparison (standard vs compact):")
+    print(f"   Standard config:     {standard_size:>10,} bytes, parse {standard_parse * 1000:8.3f} ms")
+    print(f"   Compact config:      {compact_size:>10,} bytes, parse {compact_parse * 1000:8.3f} ms")
+    print(f"   Dataset side file:   {data_size:>10,} bytes, parse {data_parse * 1000:8.3f} ms (lazy, first tool call)")
+    print(f"   Config size reduction: {100 * (1 - compact_size / standard_size):.1f}%"
+          f" ({100 * (1 - (compact_size + data_size) / standard_size):.1f}% including side file)")
+    if compact_parse > 0:
+        print(f"   Config parse speedup:  {standard_parse / compact_parse:.1f}x")
+
+
+def export_team_config(team, output_file: str = "generated_orchestrator.json",
+                       compact: bool = False, data_file: str = None):
+    """Export the team configuration to JSON.
+
+    Args:
+        team: The team to export
+        output_file (str): Path of the team configuration file
+        compact (bool): Move the embedded mock datasets into a single de-duplicated
+            side file and write minified JSON, then report the size and parse-time savings
+        data_file (str): Path of the dataset side file in compact mode
+            (defaults to ``<output_file stem>_data.json``)
+    """
     try:
         print(f"Exporting team configuration to {output_file}...")
         config = team.dump_component()
         
-        # Try to serialize the config with custom JSON encoder
-        import json
-        class ComponentEncoder(json.JSONEncoder):
-            def default(self, obj):
-                # Try to convert ComponentModel to dict
-                if hasattr(obj, '__dict__'):
-                    return obj.__dict__
-                elif hasattr(obj, 'dump_component'):
-                    return obj.dump_component()
-                return str(obj)
+        # Tool source is loaded on its own, so it must carry the module-level helpers and data it uses
+        config = json.loads(json.dumps(config, ensure_ascii=False, cls=ComponentEncoder))
+        _inline_globals(config, _tool_functions(team))
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False, cls=ComponentEncoder)
+        if not compact:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+        else:
+            data_file = data_file or os.path.splitext(output_file)[0] + "_data.json"
+            standard_text = json.dumps(config, indent=2, ensure_ascii=False)
+
+            # The config stays portable: tools resolve the side file at call time, not by this machine's path
+            compact_config = json.loads(standard_text)
+            datasets = {}
+            _externalize_datasets(compact_config, datasets, data_file)
+
+            compact_text = json.dumps(compact_config, separators=(',', ':'), ensure_ascii=False)
+            data_text = json.dumps(datasets, separators=(',', ':'), ensure_ascii=False)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(compact_text)
+            with open(data_file, 'w', encoding='utf-8') as f:
+                f.write(data_text)
+
+            print(f"✅ Externalized {len(datasets)} unique datasets to {data_file}")
+            report_export_comparison(standard_text, compact_text, data_text)
         
         print(f"✅ Team configuration exported successfully to {output_file}")
         return True
@@ -140,16 +456,25 @@ def export_team_config(team, output_file: str = "generated_orchestrator.json"):
 
 def main():
     """Main function to create and export the benefit orchestrator team."""
+    parser = argparse.ArgumentParser(description="Create and export the benefit orchestrator team.")
+    parser.add_argument("--output", default="generated_orchestrator.json",
+                        help="Team configuration output file")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write minified JSON with mock datasets moved to a de-duplicated side file")
+    parser.add_argument("--data-file", default=None,
+                        help="Dataset side file for --compact (default: <output>_data.json)")
+    args = parser.parse_args()
+
     try:
         # Create the team
         team = create_benefit_orchestrator_team()
         
         # Export to JSON
-        success = export_team_config(team)
+        success = export_team_config(team, args.output, compact=args.compact, data_file=args.data_file)
         
         if success:
             print("\n🎉 Benefit Orchestrator creation completed successfully!")
-            print("📄 Configuration saved to: generated_orchestrator.json")
+            print(f"📄 Configuration saved to: {args.output}")
             print("🚀 Ready to use in AutoGen Studio!")
         else:
             print("\n⚠️  Team created but export failed.")
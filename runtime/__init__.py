@@ -0,0 +1,2 @@
+# Agent Simulator - Runtime support
+# This package contains infrastructure for running benefit teams unattended and at scale
@@ -0,0 +1,192 @@
+"""
+Decision Consistency Harness for the Benefit Orchestrator System.
+Samples the Eligibility decision K times per request over a shared deterministic prefix and reports the spread.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+from autogen_agentchat.messages import TextMessage
+
+from runtime.deterministic_stages import build_prefix
+from runtime.team_runner import DECISION_PATTERN, message_text
+
+
+def decision_label(text: str) -> str:
+    """Classify an Eligibility reply as APPROVED/DECLINED/PENDING, a document request, or UNPARSED."""
+    match = DECISION_PATTERN.search(text)
+    if match:
+        return match.group(1)
+    if re.search(r"REQUEST_PROCESS_DOC", text):
+        return "REQUEST_PROCESS_DOC"
+    return "UNPARSED"
+
+
+class ConsistencyHarness:
+    """Runs each request K times and reports the distribution of decisions and Judge scores.
+
+    The deterministic prefix (request fetch, customer verification and document
+    content) is computed once per request and shared by all samples; only the
+    Eligibility decision, and the Judge's scoring of it, is sampled K times.
+    ``max_concurrency`` bounds concurrent model calls across all requests.
+    """
+
+    def __init__(self, eligibility_factory: Callable[[], Any], judge_factory: Optional[Callable[[], Any]] = None,
+                 samples: int = 5, max_concurrency: int = 16):
+        self.eligibility_factory = eligibility_factory
+        self.judge_factory = judge_factory
+        self.samples = samples
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._prefixes: Dict[str, asyncio.Future] = {}
+
+    async def shared_prefix(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Deterministic prefix for a request, computed once even under concurrent callers."""
+        if request_id not in self._prefixes:
+            self._prefixes[request_id] = asyncio.ensure_future(asyncio.to_thread(build_prefix, request_id))
+        return await self._prefixes[request_id]
+
+    async def _sample(self, prefix_messages: List[Any]) -> Dict[str, Any]:
+        async with self._slots:
+            result = await self.eligibility_factory().run(task=prefix_messages)
+        decision_text = message_text(result.messages[-1])
+        sample = {"decision": decision_label(decision_text), "judge_score": None}
+
+        if self.judge_factory is not None:
+            judged = prefix_messages + [TextMessage(source="Eligibility_Decision_agent", content=decision_text)]
+            async with self._slots:
+                judge_result = await self.judge_factory().run(task=judged)
+            try:
+                sample["judge_score"] = json.loads(message_text(judge_result.messages[-1])).get("quality_score")
+            except (json.JSONDecodeError, AttributeError):
+                pass
+        return sample
+
+    async def sample_request(self, request_id: str) -> Dict[str, Any]:
+        """Sample one request K times and summarize the spread of outcomes."""
+        started = time.perf_counter()
+        prefix = await self.shared_prefix(request_id)
+        if prefix is None:
+            return {"request_id": request_id, "error": "Request not found"}
+        prefix_seconds = time.perf_counter() - started
+
+        samples = await asyncio.gather(*(self._sample(prefix["messages"]) for _ in range(self.samples)),
+                                       return_exceptions=True)
+        failures = [s for s in samples if isinstance(s, BaseException)]
+        samples = [s for s in samples if not isinstance(s, BaseException)]
+
+        decisions = Counter(s["decision"] for s in samples)
+        scores = [s["judge_score"] for s in samples if s["judge_score"] is not None]
+        modal_decision, modal_count = decisions.most_common(1)[0] if decisions else (None, 0)
+        return {
+            "request_id": request_id,
+            "benefit_type": prefix["request"]["requestDetails"]["benefitType"],
+            "verification_result": prefix["verification"]["verification_result"],
+            "samples": len(samples),
+            "failed_samples": len(failures),
+            "decisions": dict(decisions),
+            "modal_decision": modal_decision,
+            "agreement": modal_count / len(samples) if samples else None,
+            "judge_scores": dict(Counter(scores)),
+            "mean_judge_score": sum(scores) / len(scores) if scores else None,
+            "prefix_seconds": round(prefix_seconds, 3),
+            "total_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    async def run(self, request_ids: Iterable[str], max_requests_in_flight: int = 32):
+        """Sample many requests concurrently, yielding reports as they finish."""
+        request_slots = asyncio.Semaphore(max_requests_in_flight)
+
+        async def _bounded(request_id: str):
+            async with request_slots:
+                report = await self.sample_request(request_id)
+            # The prefix is no longer needed once every sample has run
+            self._prefixes.pop(request_id, None)
+            return report
+
+        pending = set()
+        for request_id in request_ids:
+            pending.add(asyncio.ensure_future(_bounded(request_id)))
+            if len(pending) >= max_requests_in_flight * 2:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        for task in asyncio.as_completed(pending):
+            yield await task
+
+
+def summarize_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate per-request reports into dataset-level consistency figures."""
+    sampled = [r for r in reports if r.get("samples")]
+    unanimous = sum(1 for r in sampled if r["agreement"] == 1.0)
+    return {
+        "requests": len(reports),
+        "sampled_requests": len(sampled),
+        "unanimous_requests": unanimous,
+        "unanimous_rate": unanimous / len(sampled) if sampled else None,
+        "mean_agreement": sum(r["agreement"] for r in sampled) / len(sampled) if sampled else None,
+        "inconsistent_request_ids": [r["request_id"] for r in sampled if r["agreement"] < 1.0][:100],
+    }
+
+
+def main():
+    """Run the decision-consistency harness from the command line."""
+    parser = argparse.ArgumentParser(description="Measure Eligibility decision consistency over repeated samples.")
+    parser.add_argument("request_ids", nargs="*", help="Request IDs to sample (e.g. REQ-004)")
+    parser.add_argument("--population", default=None,
+                        help="Synthetic population SQLite database; samples its requests when no IDs are given")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of population requests")
+    parser.add_argument("--samples", type=int, default=5, help="Eligibility samples per request (K)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum concurrent model calls")
+    parser.add_argument("--no-judge", action="store_true", help="Skip Judge scoring of each sample")
+    parser.add_argument("--output", default="consistency_report.jsonl", help="Per-request report file")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ OPENAI_API_KEY must be set to sample model decisions")
+        return
+
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+    from agents.eligibility_decision_agent import create_eligibility_decision_agent
+    from agents.judge_agent import create_judge_agent
+
+    request_ids: Iterable[str] = args.request_ids
+    if args.population:
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+        if not request_ids:
+            from simulation.synthetic_population import read_population
+            request_ids = (record["requestId"] for record in
+                           itertools.islice(read_population(args.population, "request"), args.limit))
+
+    model_client = OpenAIChatCompletionClient(model="gpt-4o-mini")
+    harness = ConsistencyHarness(
+        eligibility_factory=lambda: create_eligibility_decision_agent(model_client),
+        judge_factory=None if args.no_judge else (lambda: create_judge_agent(model_client)),
+        samples=args.samples,
+        max_concurrency=args.concurrency,
+    )
+
+    async def _run():
+        reports = []
+        with open(args.output, "w", encoding="utf-8") as f:
+            async for report in harness.run(request_ids):
+                f.write(json.dumps(report) + "\n")
+                reports.append({key: report.get(key) for key in ("request_id", "samples", "agreement")})
+                print(f"   {report['request_id']}: {report.get('decisions', report.get('error'))}")
+        return reports
+
+    started = time.perf_counter()
+    reports = asyncio.run(_run())
+    elapsed = time.perf_counter() - started
+    print(f"\n📊 Consistency summary: {json.dumps(summarize_reports(reports), indent=2)}")
+    print(f"⏱️  {len(reports)} requests in {elapsed:.1f}s; report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Deadline-aware Request Scheduling for the Benefit Orchestrator System.
+Orders queued requests by slack to their requested effective date and estimated cost, and reports deadline misses.
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Deque, List, Optional, Tuple
+
+from runtime.request_worker import QueueItem
+
+
+# Cost of a request before any have been observed: seconds per unit, one unit plus one per document
+DEFAULT_SECONDS_PER_UNIT = 20.0
+
+# Weight of each newly observed duration in the per-benefit-type cost estimate
+COST_SMOOTHING = 0.1
+
+SCHEDULING_POLICIES = ("deadline", "fifo")
+
+# Queued requests read ahead of dispatch, so the most urgent one can be picked
+DEFAULT_LOOKAHEAD = 1000
+
+# Lateness and queue-wait samples kept for the report's quantiles; past this, a uniform sample of the run
+QUANTILE_SAMPLES = 10_000
+
+
+def request_deadline(request: Dict[str, Any]) -> Optional[float]:
+    """Start of the requested effective date (UTC) as a POSIX timestamp, or None."""
+    effective = (request.get("requestDetails") or {}).get("requestedEffectiveDate")
+    try:
+        return datetime.fromisoformat(str(effective)[:10]).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+class CostModel:
+    """Estimated processing seconds of a request from its benefit type and document count.
+
+    A request costs ``1 + documents`` units; seconds per unit start at
+    ``DEFAULT_SECONDS_PER_UNIT`` and follow an exponential moving average of the
+    observed durations of each benefit type.
+    """
+
+    def __init__(self, seconds_per_unit: Optional[Dict[str, float]] = None, smoothing: float = COST_SMOOTHING):
+        self.seconds_per_unit = dict(seconds_per_unit or {})
+        self.smoothing = smoothing
+
+    @staticmethod
+    def _key(request: Dict[str, Any]) -> Tuple[str, int]:
+        return (request.get("requestDetails") or {}).get("benefitType"), 1 + len(request.get("documents") or [])
+
+    def estimate(self, request: Dict[str, Any]) -> float:
+        benefit_type, units = self._key(request)
+        return units * self.seconds_per_unit.get(benefit_type, DEFAULT_SECONDS_PER_UNIT)
+
+    def observe(self, request: Dict[str, Any], seconds: float):
+        benefit_type, units = self._key(request)
+        current = self.seconds_per_unit.get(benefit_type)
+        observed = seconds / units
+        self.seconds_per_unit[benefit_type] = observed if current is None \
+            else current + self.smoothing * (observed - current)
+
+
+class _Entry:
+    __slots__ = ("item", "request", "deadline", "cost", "queued_at", "dispatched_at")
+
+    def __init__(self, item: QueueItem, request: Optional[Dict[str, Any]], deadline: Optional[float], cost: float,
+                 queued_at: float):
+        self.item = item
+        self.request = request
+        self.deadline = deadline
+        self.cost = cost
+        self.queued_at = queued_at
+        self.dispatched_at: Optional[float] = None
+
+
+class _Reservoir:
+    """Uniform sample of at most ``size`` values from a stream, for quantiles over a whole run in bounded memory."""
+
+    def __init__(self, size: int = QUANTILE_SAMPLES, seed: int = 0):
+        self.size = size
+        self.count = 0
+        self.samples: List[float] = []
+        self._random = random.Random(seed)
+
+    def add(self, value: float):
+        self.count += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            index = self._random.randrange(self.count)
+            if index < self.size:
+                self.samples[index] = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class DeadlineScheduler:
+    """Least-slack-first ordering of queued requests.
+
+    Slack is the time left before a request's deadline once its estimated cost
+    is spent; ordering by ``deadline - cost`` is the same as ordering by slack
+    at any moment. Requests that can still finish in time go first, the most
+    urgent (ties: the cheapest) first. Requests that can no longer make their
+    deadline wait until none of those are queued and then go earliest deadline
+    first, so they do not push requests that are still on time past theirs.
+    Requests without a deadline (unknown request IDs, missing dates) fail or
+    finish quickly and go first. With ``policy="fifo"`` requests keep arrival
+    order and only the deadline outcomes are recorded.
+    """
+
+    def __init__(self, cost_model: Optional[CostModel] = None, policy: str = "deadline"):
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}'; expected one of {SCHEDULING_POLICIES}")
+        self.cost_model = cost_model or CostModel()
+        self.policy = policy
+        self._on_time: List[Tuple[float, float, int, _Entry]] = []
+        self._late: List[Tuple[float, int, _Entry]] = []
+        self._immediate: Deque[_Entry] = deque()
+        self._dispatched: Dict[Any, _Entry] = {}
+        self._sequence = itertools.count()
+        self.outcomes: Counter = Counter()
+        self.by_benefit: Dict[str, Counter] = {}
+        self._lateness = _Reservoir()
+        self._waits = _Reservoir()
+
+    def __len__(self) -> int:
+        return len(self._on_time) + len(self._late) + len(self._immediate)
+
+    def push(self, item: QueueItem, request: Optional[Dict[str, Any]], now: float):
+        deadline = request_deadline(request) if request else None
+        cost = self.cost_model.estimate(request) if request else 0.0
+        entry = _Entry(item, request, deadline, cost, now)
+        if deadline is None or self.policy == "fifo":
+            self._immediate.append(entry)
+        else:
+            heapq.heappush(self._on_time, (deadline - cost, cost, next(self._sequence), entry))
+
+    def pop(self, now: float) -> Optional[QueueItem]:
+        """The queued request to run next, or None if none is queued."""
+        if self._immediate:
+            entry = self._immediate.popleft()
+        else:
+            # Move requests whose slack ran out to the late queue
+            while self._on_time and self._on_time[0][0] < now:
+                entry = heapq.heappop(self._on_time)[3]
+                heapq.heappush(self._late, (entry.deadline, next(self._sequence), entry))
+            if self._on_time:
+                entry = heapq.heappop(self._on_time)[3]
+            elif self._late:
+                entry = heapq.heappop(self._late)[2]
+            else:
+                return None
+        entry.dispatched_at = now
+        self._dispatched[entry.item.position] = entry
+        self._waits.add(now - entry.queued_at)
+        return entry.item
+
+    def complete(self, item: QueueItem, now: float):
+        """Record a finished request: its deadline outcome and its duration for the cost model."""
+        entry = self._dispatched.pop(item.position, None)
+        if entry is None:
+            return
+        if entry.request is not None:
+            self.cost_model.observe(entry.request, now - entry.dispatched_at)
+        if entry.deadline is None:
+            self.outcomes["no_deadline"] += 1
+            return
+        benefit_type = (entry.request.get("requestDetails") or {}).get("benefitType") or "Unknown"
+        outcome = "met" if now <= entry.deadline else "missed"
+        self.outcomes[outcome] += 1
+        self.by_benefit.setdefault(benefit_type, Counter())[outcome] += 1
+        if outcome == "missed":
+            self._lateness.add(now - entry.deadline)
+
+    def report(self) -> Dict[str, Any]:
+        """Deadline-miss rates overall and per benefit type, lateness of misses and queue waits."""
+        def rate(counts: Counter) -> Optional[float]:
+            total = counts["met"] + counts["missed"]
+            return round(counts["missed"] / total, 4) if total else None
+
+        median_lateness, p95_wait = self._lateness.quantile(0.5), self._waits.quantile(0.95)
+        return {
+            "completed": sum(self.outcomes.values()),
+            "deadline_met": self.outcomes["met"],
+            "deadline_missed": self.outcomes["missed"],
+            "miss_rate": rate(self.outcomes),
+            "miss_rate_by_benefit": {benefit: rate(counts) for benefit, counts in sorted(self.by_benefit.items())},
+            "median_lateness_hours": round(median_lateness / 3600, 1) if median_lateness is not None else None,
+            "p95_queue_wait_seconds": round(p95_wait, 1) if p95_wait is not None else None,
+            "queued": len(self),
+        }
+
+
+class DeadlineScheduledSource:
+    """Queue source wrapper that hands out the most urgent queued request instead of the oldest.
+
+    Up to ``lookahead`` entries are read ahead from the wrapped source and
+    looked up for their effective date, benefit type and documents. The worker
+    still asks for work whenever a slot frees, so the pool stays saturated;
+    acknowledgements and checkpoint state pass through to the wrapped source,
+    whose watermark keeps read-ahead entries pending until they are done.
+    """
+
+    def __init__(self, source, lookahead: int = DEFAULT_LOOKAHEAD,
+                 lookup: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+                 scheduler: Optional[DeadlineScheduler] = None, clock: Callable[[], float] = time.time):
+        if lookup is None:
+            from runtime.deterministic_stages import fetch_request
+            lookup = fetch_request
+        self.source = source
+        self.lookahead = lookahead
+        self.lookup = lookup
+        self.scheduler = scheduler or DeadlineScheduler()
+        self.clock = clock
+
+    def restore(self, state: Dict[str, Any], completed):
+        self.source.restore(state, completed)
+
+    def next_item(self) -> Optional[QueueItem]:
+        while len(self.scheduler) < self.lookahead:
+            item = self.source.next_item()
+            if item is None:
+                break
+            request = self.lookup(item.request_id) if item.request_id and not item.error else None
+            self.scheduler.push(item, request, self.clock())
+        return self.scheduler.pop(self.clock())
+
+    def ack(self, item: QueueItem):
+        self.scheduler.complete(item, self.clock())
+        self.source.ack(item)
+
+    def state(self) -> Dict[str, Any]:
+        return self.source.state()
+
+    def report(self) -> Dict[str, Any]:
+        return self.scheduler.report()
+
+
+def simulate(requests: List[Dict[str, Any]], workers: int, load: float, policy: str,
+             noise: float = 0.3, seed: int = 42) -> Dict[str, Any]:
+    """Replay request arrivals through a pool of workers in virtual time.
+
+    Requests arrive at their timestamps. Service times follow the cost model
+    with lognormal noise, scaled so that the offered load is ``load`` times what
+    the pool can process over the arrival span; the scheduler's own cost model
+    starts empty and learns them as requests complete.
+    """
+    def arrival(request: Dict[str, Any]) -> float:
+        return datetime.fromisoformat(request["timestamp"].replace("Z", "+00:00")).timestamp()
+
+    requests = sorted(requests, key=arrival)
+    reference = CostModel()
+    rng = random.Random(seed)
+    start = arrival(requests[0])
+    span = arrival(requests[-1]) - start or 1.0
+    scale = load * workers * span / sum(reference.estimate(request) for request in requests)
+    service = [reference.estimate(request) * scale * rng.lognormvariate(0, noise) for request in requests]
+
+    scheduler = DeadlineScheduler(CostModel(), policy=policy)
+    free_at = [start] * workers
+    running: List[Tuple[float, int, QueueItem]] = []
+    next_arrival, busy_seconds = 0, 0.0
+    for _ in requests:
+        # The earliest free worker takes the next request; an idle pool waits for the next arrival
+        now = heapq.heappop(free_at)
+        while running and running[0][0] <= now:
+            finish, _, done = heapq.heappop(running)
+            scheduler.complete(done, finish)
+        while next_arrival < len(requests) and (arrival(requests[next_arrival]) <= now or not len(scheduler)):
+            request = requests[next_arrival]
+            now = max(now, arrival(request))
+            scheduler.push(QueueItem(next_arrival, request["requestId"]), request, arrival(request))
+            next_arrival += 1
+        item = scheduler.pop(now)
+        finish = now + service[item.position]
+        busy_seconds += service[item.position]
+        heapq.heappush(running, (finish, item.position, item))
+        heapq.heappush(free_at, finish)
+    for finish, _, done in sorted(running):
+        scheduler.complete(done, finish)
+    report = scheduler.report()
+    report["utilization"] = round(busy_seconds / (workers * (max(free_at) - start)), 3)
+    return report
+
+
+def main():
+    """Compare deadline-miss rates of arrival-order and deadline-aware scheduling under load."""
+    parser = argparse.ArgumentParser(description="Simulate deadline-aware scheduling of benefit requests.")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--limit", type=int, default=20_000, help="Maximum number of population requests")
+    parser.add_argument("--workers", type=int, default=8, help="Requests processed concurrently")
+    parser.add_argument("--load", type=float, nargs="+", default=[0.9, 1.1, 1.3],
+                        help="Offered load as a multiple of pool capacity")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-simulation")
+    if args.population:
+        from simulation.synthetic_population import read_population
+        requests = list(itertools.islice(read_population(args.population, "request"), args.limit))
+    else:
+        from runtime.deterministic_stages import fetch_request
+        requests = [fetch_request(f"REQ-{i:03d}") for i in range(1, 6)]
+
+    print(f"📊 {len(requests)} requests, {args.workers} workers")
+    for load in args.load:
+        for policy in ("fifo", "deadline"):
+            report = simulate(requests, args.workers, load, policy)
+            by_benefit = ", ".join(f"{benefit} {rate:.1%}" for benefit, rate in report["miss_rate_by_benefit"].items()
+                                   if rate is not None)
+            print(f"   load {load:.1f} {policy:<8} miss rate {report['miss_rate']:.1%} "
+                  f"(median lateness {report['median_lateness_hours']} h, utilization {report['utilization']:.0%})")
+            print(f"      {by_benefit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+"""
+Decision Cache for the Benefit Orchestrator System.
+Reuses confirmed Eligibility decisions for requests with the same decision-relevant facts, without a model call.
+"""
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Any, AsyncGenerator, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelInfo, RequestUsage
+
+from agents.eligibility_decision_agent import REQUIRED_DOCUMENTS, create_eligibility_decision_agent
+from runtime.eligibility_prescore import (ACTIVATION_DAYS, ACTIVATION_DAYS_AUTO_LOAN, FEE_WINDOW_DAYS, MISSING_DATE,
+                                          UNKNOWN, _evaluate, rule_inputs)
+from runtime.team_runner import DECISION_PATTERN
+
+
+ELIGIBILITY_AGENT = "Eligibility_Decision_agent"
+
+# Bump when the fact signature or what may be stored changes, so entries from older versions are dropped
+SIGNATURE_VERSION = 2
+
+# Service length at the requested effective date, in days: under 1 year, 1-5 years, 5 years or more
+SERVICE_LENGTH_BUCKETS = (365, 5 * 365)
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+# Field values shorter than this are too likely to occur by accident in decision text to template
+MIN_TEMPLATED_LENGTH = 4
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS decisions (
+        signature TEXT PRIMARY KEY,
+        rules_hash TEXT NOT NULL,
+        decision TEXT NOT NULL,
+        template TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+"""
+
+
+def rules_hash() -> str:
+    """Hash of the Eligibility Decision Agent's rules: its factory source, required documents and the signature."""
+    source = inspect.getsource(create_eligibility_decision_agent)
+    payload = json.dumps([SIGNATURE_VERSION, source, REQUIRED_DOCUMENTS], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _bucket(value: int, edges: Sequence[int]) -> int:
+    return sum(value >= edge for edge in edges)
+
+
+def _order(first: int, second: int) -> int:
+    """-1, 0 or 1 as ``first`` is before, on or after ``second``; UNKNOWN when either date is missing."""
+    if first == MISSING_DATE or second == MISSING_DATE:
+        return UNKNOWN
+    return (first > second) - (first < second)
+
+
+def fact_signature(request: Dict[str, Any], contents: Iterable[Dict[str, Any]],
+                   verification: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Normalized signature of a request's decision-relevant facts, or None when it should not be cached.
+
+    Category codes and flags are kept as they are; day counts and dates are
+    reduced to the side of each rule threshold they fall on, plus a coarse
+    service-length bucket. Requests with an unknown verification outcome and
+    requests within a threshold's margin (where bucketed facts could decide
+    differently) get no signature.
+    """
+    row = rule_inputs(request, contents, verification)
+    if row["verified"] == UNKNOWN or row["benefit"] == UNKNOWN or _evaluate(row)[3]:
+        return None
+    fee_age = UNKNOWN if row["last_fee"] == MISSING_DATE or row["effective"] == MISSING_DATE \
+        else _bucket(row["effective"] - row["last_fee"], (0, FEE_WINDOW_DAYS + 1))
+    service_length = UNKNOWN if row["service_start"] == MISSING_DATE or row["effective"] == MISSING_DATE \
+        else _bucket(row["effective"] - row["service_start"], (0, *SERVICE_LENGTH_BUCKETS))
+    facts = (
+        row["benefit"], row["status"], row["verified"], row["documents"], row["orders_pcs"],
+        row["hardship_service"], row["dishonorable"],
+        UNKNOWN if row["orders_days"] == UNKNOWN else _bucket(row["orders_days"], (ACTIVATION_DAYS,
+                                                                                   ACTIVATION_DAYS_AUTO_LOAN)),
+        _order(row["mortgage_origination"], row["service_start"]),
+        _order(row["account_opening"], row["service_start"]),
+        fee_age, service_length,
+    )
+    return hashlib.sha256(json.dumps([SIGNATURE_VERSION, facts]).encode("utf-8")).hexdigest()
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value[:10])
+    except ValueError:
+        return False
+    return True
+
+
+def _date_variants(value: str) -> List[str]:
+    """An ISO date as written in decision text: as is, and as "July 14, 2025"."""
+    if not _is_date(value):
+        return [value]
+    day = date.fromisoformat(value[:10])
+    return [value, f"{day:%B} {day.day}, {day.year}"] if len(value) == 10 else [value, value[:10]]
+
+
+def request_fields(request: Dict[str, Any], contents: Iterable[Dict[str, Any]],
+                   verification: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """The request-specific text values a decision may quote, by field path.
+
+    Documents and their content are addressed by document type rather than
+    position, so the same path names the same fact in another request.
+    """
+    fields: Dict[str, str] = {}
+
+    def add(path: str, value: Any):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                add(f"{path}.{key}", child)
+        elif isinstance(value, str) and len(value) >= MIN_TEMPLATED_LENGTH:
+            for index, variant in enumerate(_date_variants(value)):
+                fields.setdefault(path if index == 0 else f"{path}~{index}", variant)
+
+    for key in ("requestId", "customerId", "timestamp", "requestor", "requestDetails"):
+        add(key, request.get(key))
+    for document in request.get("documents") or []:
+        add(f"documents[{document.get('documentType')}]", document)
+    for document in contents:
+        add(f"content[{document.get('document_type')}]", document.get("content") or {})
+    for key in ("customer_id", "customer_name"):
+        add(f"verification.{key}", (verification or {}).get(key))
+    return fields
+
+
+def make_template(text: str, fields: Dict[str, str]) -> str:
+    """Replace the request's own values in a decision with ``{{path}}`` placeholders, longest values first."""
+    by_value: Dict[str, str] = {}
+    for path, value in fields.items():
+        by_value.setdefault(value, path)
+    for value in sorted(by_value, key=len, reverse=True):
+        text = text.replace(value, "{{" + by_value[value] + "}}")
+    return text
+
+
+def request_tokens(request: Dict[str, Any], contents: Iterable[Dict[str, Any]],
+                   verification: Optional[Dict[str, Any]]) -> Set[str]:
+    """Every word and number of a request, its document content and its verification, lowercased.
+
+    Dates contribute their month name and year rather than their digits.
+    """
+    tokens: Set[str] = set()
+
+    def add(value: Any):
+        if isinstance(value, dict):
+            for child in value.values():
+                add(child)
+        elif isinstance(value, (list, tuple)):
+            for child in value:
+                add(child)
+        elif isinstance(value, str) and _is_date(value):
+            # Whole dates are templated; a partial one still names its month or year
+            day = date.fromisoformat(value[:10])
+            tokens.update((f"{day:%B}".lower(), str(day.year)))
+        elif value is not None and not isinstance(value, bool):
+            tokens.update(token.lower() for token in TOKEN_PATTERN.findall(str(value)))
+
+    add(request)
+    for document in contents:
+        add(document.get("content"))
+    add(verification)
+    return tokens
+
+
+@lru_cache(maxsize=1)
+def _rules_vocabulary() -> frozenset:
+    """Words and numbers of the Eligibility Decision Agent's prompt and required documents, lowercased."""
+    source = inspect.getsource(create_eligibility_decision_agent) + json.dumps(REQUIRED_DOCUMENTS)
+    return frozenset(token.lower() for token in TOKEN_PATTERN.findall(source))
+
+
+def untemplated_facts(template: str, tokens: Set[str]) -> List[str]:
+    """Request-specific text left in a decision template outside its placeholders.
+
+    That is any number other than the rules' own thresholds, any number that is
+    also one of the request's values, and any word of the request's values
+    (partial names, ranks, places) that the Eligibility rules never use. A
+    template with leftovers would quote one requestor's facts to another.
+    """
+    vocabulary = _rules_vocabulary()
+    leftovers = []
+    for token in TOKEN_PATTERN.findall(PLACEHOLDER_PATTERN.sub(" ", template)):
+        lowered = token.lower()
+        if token.isdigit() and (lowered in tokens or lowered not in vocabulary):
+            leftovers.append(token)
+        elif lowered in tokens and lowered not in vocabulary:
+            leftovers.append(token)
+    return leftovers
+
+
+def fill_template(template: str, fields: Dict[str, str]) -> Optional[str]:
+    """A decision for another request from a template, or None if the request lacks a quoted field."""
+    missing = [path for path in PLACEHOLDER_PATTERN.findall(template) if path not in fields]
+    if missing:
+        return None
+    return PLACEHOLDER_PATTERN.sub(lambda match: fields[match.group(1)], template)
+
+
+class DecisionCache:
+    """Confirmed Eligibility decision templates keyed by fact signature, in SQLite.
+
+    Entries carry the hash of the Eligibility rules they were decided under;
+    opening the cache with different rules drops them, and entries older than
+    ``ttl_seconds`` are dropped when looked up. Decisions are only stored once
+    the request has completed with a compliant Judge review, the operations
+    user's confirmation and a successful execution, and only as templates
+    without request-specific text outside their placeholders.
+    """
+
+    def __init__(self, path: str = "decision_cache.db", ttl_seconds: float = 7 * 24 * 3600,
+                 rules: Optional[str] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.rules_hash = rules or rules_hash()
+        self.stats = {"hits": 0, "misses": 0, "uncacheable": 0, "revisited": 0, "expired": 0, "stored": 0,
+                      "rejected": 0, "untemplated": 0, "invalidated": 0}
+        self._pending: Dict[str, Tuple[str, str, str]] = {}
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        with self._connection:
+            self.stats["invalidated"] = self._connection.execute(
+                "DELETE FROM decisions WHERE rules_hash != ?", (self.rules_hash,)).rowcount
+
+    def get(self, signature: str) -> Optional[Tuple[str, str]]:
+        """The ``(decision, template)`` cached for a signature, or None on a miss."""
+        row = self._connection.execute("SELECT decision, template, created_at FROM decisions "
+                                       "WHERE signature = ? AND rules_hash = ?",
+                                       (signature, self.rules_hash)).fetchone()
+        if row is not None and time.time() - row[2] > self.ttl_seconds:
+            with self._connection:
+                self._connection.execute("DELETE FROM decisions WHERE signature = ?", (signature,))
+            self.stats["expired"] += 1
+            row = None
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        with self._connection:
+            self._connection.execute("UPDATE decisions SET hits = hits + 1 WHERE signature = ?", (signature,))
+        self.stats["hits"] += 1
+        return row[0], row[1]
+
+    def put(self, signature: str, decision: str, template: str):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?, ?, 0)",
+                                     (signature, self.rules_hash, decision, template, time.time()))
+        self.stats["stored"] += 1
+
+    def hold(self, request_id: str, signature: str, decision: str, template: str, tokens: Set[str]):
+        """Keep a model decision until its request's outcome shows whether it was confirmed.
+
+        Decisions whose template still quotes the request's own facts are never held.
+        """
+        if untemplated_facts(template, tokens):
+            self.stats["untemplated"] += 1
+            return
+        self._pending[request_id] = (signature, decision, template)
+
+    def discard(self, request_id: str):
+        """Drop a held decision that the workflow has since sent back for a new one."""
+        if self._pending.pop(request_id, None) is not None:
+            self.stats["rejected"] += 1
+
+    def request_finished(self, outcome: Dict[str, Any]):
+        """Store the held decision of a completed request if the workflow confirmed it, else drop it."""
+        pending = self._pending.pop(outcome.get("request_id"), None)
+        if pending is None:
+            return
+        signature, decision, template = pending
+        if (outcome.get("status") == "completed" and outcome.get("decision") == decision
+                and outcome.get("workflow_compliance") == "COMPLIANT"
+                and outcome.get("judge_recommendation") == "PROCEED"
+                and outcome.get("execution_status") == "success"):
+            self.put(signature, decision, template)
+        else:
+            self.stats["rejected"] += 1
+
+    def wrap_client(self, client: ChatCompletionClient) -> "CachedDecisionChatCompletionClient":
+        return CachedDecisionChatCompletionClient(client, self)
+
+    def apply_to_agent(self, agent):
+        """Serve the Eligibility Decision Agent's final decisions from the cache where the facts match."""
+        if agent.name == ELIGIBILITY_AGENT and not isinstance(agent._model_client, CachedDecisionChatCompletionClient):
+            agent._model_client = self.wrap_client(agent._model_client)
+        return agent
+
+    def report(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        entries = self._connection.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return {**self.stats, "lookups": lookups, "entries": entries,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None}
+
+    def close(self):
+        self._connection.close()
+
+
+class CachedDecisionChatCompletionClient(ChatCompletionClient):
+    """Eligibility Decision Agent client that answers from the decision cache before calling the model.
+
+    The request and verification come from the Orchestrator's routing output in
+    the agent's context and the document content from ``get_document`` (served
+    by the document cache when one is configured), so a hit also skips the
+    document processing round trip. Final APPROVED or DECLINED decisions from
+    the model are held for the cache until the request completes. Only a
+    request's first decision is served or held: once the agent has decided or
+    the operations user has replied with more than an approval, the decision
+    depends on the conversation, which the signature does not cover.
+    """
+
+    def __init__(self, client: ChatCompletionClient, cache: DecisionCache):
+        self.client = client
+        self.cache = cache
+
+    def _facts(self, messages: Sequence[LLMMessage]
+               ) -> Optional[Tuple[Dict[str, Any], str, Dict[str, str], Set[str]]]:
+        from runtime.deterministic_stages import fetch_documents
+        from runtime.model_cascade import request_from_context, verification_from_context
+        request, verification = request_from_context(messages), verification_from_context(messages)
+        if request is None or not request.get("requestId") or verification is None:
+            return None
+        try:
+            contents = fetch_documents(request)
+        except (KeyError, json.JSONDecodeError):
+            return None
+        signature = fact_signature(request, contents, verification)
+        if signature is None:
+            return None
+        return (request, signature, request_fields(request, contents, verification),
+                request_tokens(request, contents, verification))
+
+    @staticmethod
+    def _revisited(messages: Sequence[LLMMessage]) -> bool:
+        """Whether the context already holds an Eligibility decision or an operations user correction."""
+        from runtime.model_cascade import is_plain_approval
+        for message in messages:
+            content, source = getattr(message, "content", None), getattr(message, "source", None)
+            if not isinstance(content, str):
+                continue
+            match = DECISION_PATTERN.search(content) if source == ELIGIBILITY_AGENT else None
+            if match and match.group(1) in ("APPROVED", "DECLINED"):
+                return True
+            if source == "User_Proxy_agent" and not is_plain_approval(content):
+                return True
+        return False
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        if self._revisited(messages):
+            from runtime.model_cascade import request_from_context
+            request = request_from_context(messages)
+            if request is not None and request.get("requestId"):
+                self.cache.discard(request["requestId"])
+            self.cache.stats["revisited"] += 1
+            return await self.client.create(messages, **kwargs)
+        facts = self._facts(messages)
+        if facts is None:
+            self.cache.stats["uncacheable"] += 1
+            return await self.client.create(messages, **kwargs)
+        request, signature, fields, tokens = facts
+        cached = self.cache.get(signature)
+        text = fill_template(cached[1], fields) if cached else None
+        if text is not None:
+            return CreateResult(finish_reason="stop", content=text,
+                                usage=RequestUsage(prompt_tokens=0, completion_tokens=0), cached=True)
+        result = await self.client.create(messages, **kwargs)
+        match = DECISION_PATTERN.search(result.content) if isinstance(result.content, str) else None
+        if match and match.group(1) in ("APPROVED", "DECLINED"):
+            self.cache.hold(request["requestId"], signature, match.group(1), make_template(result.content, fields),
+                            tokens)
+        return result
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        yield await self.create(messages, **kwargs)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.client.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.client.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.client.model_info
+
+
+def main():
+    """Replay a backlog through the decision cache, using the rule pre-score as the stand-in model decision.
+
+    Only hit rates are measured. The stand-in decisions come from the same rule
+    inputs as the fact signature, so cached decisions always agree with them;
+    whether a cached decision is right for a request needs recorded model
+    decisions to check.
+    """
+    parser = argparse.ArgumentParser(description="Measure decision cache hit rates over a request backlog.")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--limit", type=int, default=5000, help="Maximum number of population requests")
+    parser.add_argument("--cache", default=":memory:", help="Decision cache database")
+    parser.add_argument("--ttl-hours", type=float, default=168, help="Entry time to live")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-simulation")
+    if args.population:
+        os.environ["SCRA_POPULATION_DB"] = args.population
+        from simulation.synthetic_population import read_population
+        requests = list(itertools.islice(read_population(args.population, "request"), args.limit))
+    else:
+        from runtime.deterministic_stages import fetch_request
+        requests = [fetch_request(f"REQ-{i:03d}") for i in range(1, 6)]
+
+    from runtime.deterministic_stages import fetch_documents, verify_requestors
+    from runtime.eligibility_prescore import DECISIONS, BacklogColumns, score_backlog
+
+    cache = DecisionCache(args.cache, ttl_seconds=args.ttl_hours * 3600)
+    verifications = verify_requestors([request["requestor"] for request in requests])
+    started = time.perf_counter()
+    for request, verification in zip(requests, verifications):
+        contents = fetch_documents(request)
+        backlog = BacklogColumns()
+        backlog.append(request, contents, verification)
+        decision = DECISIONS[score_backlog(backlog)[0][0]]
+        signature = fact_signature(request, contents, verification)
+        if signature is None:
+            cache.stats["uncacheable"] += 1
+            continue
+        fields = request_fields(request, contents, verification)
+        cached = cache.get(signature)
+        if (cached is None or fill_template(cached[1], fields) is None) and decision != "PENDING":
+            text = (f"## ELIGIBILITY DECISION\n\n**Decision:** {decision}\n\n"
+                    f"**Benefit Type:** {request['requestDetails']['benefitType']}\n\n"
+                    f"**Justification:** {request['requestor']['fullName']} ({request['requestor']['militaryStatus']}"
+                    f", service since {request['requestor']['serviceStartDate']}) requested an effective date of "
+                    f"{request['requestDetails']['requestedEffectiveDate']}.")
+            cache.hold(request["requestId"], signature, decision, make_template(text, fields),
+                       request_tokens(request, contents, verification))
+            cache.request_finished({"request_id": request["requestId"], "status": "completed",
+                                    "decision": decision, "workflow_compliance": "COMPLIANT",
+                                    "judge_recommendation": "PROCEED", "execution_status": "success"})
+    elapsed = time.perf_counter() - started
+
+    report = cache.report()
+    print(f"📊 {len(requests)} requests, {report['entries']} distinct cached fact patterns")
+    print(f"   lookups {report['lookups']}, hits {report['hits']} (hit rate {report['hit_rate'] or 0:.1%}), "
+          f"uncacheable {report['uncacheable']}, not stored with request text left in {report['untemplated']}")
+    print(f"   {len(requests) / elapsed:,.0f} requests/s including document retrieval")
+    print("⚠️  Hit rates only: the stand-in decisions are the rule pre-score, which reads the same facts as the "
+          "signature, so decision quality needs recorded model decisions to measure")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Deterministic Workflow Stages for the Benefit Orchestrator System.
+Runs request fetch, customer verification and document retrieval directly through the tools, without model calls.
+"""
+
+import json
+from typing import Dict, Any, List, Optional
+
+from autogen_agentchat.messages import TextMessage
+
+from agents.customer_verification_agent import bulk_customer_search, customer_search
+from agents.document_processing_agent import get_document
+from agents.orchestrator_agent import get_request_details
+
+
+# Confidence bands from the Customer Verification Agent prompt
+VERIFIED_CONFIDENCE = 80
+NOT_FOUND_CONFIDENCE = 40
+
+
+def fetch_request(request_id: str) -> Optional[Dict[str, Any]]:
+    """Return the request record, or None if the request ID is unknown."""
+    response = json.loads(get_request_details(request_id))
+    return response["request"] if response.get("success") else None
+
+
+def requestor_address(requestor: Dict[str, Any]) -> str:
+    """Flatten a requestor address into the single string ``customer_search`` expects."""
+    address = requestor.get("address") or {}
+    return " ".join(str(address.get(part, "")) for part in ("street", "city", "state", "zip")).strip()
+
+
+def classify_search_results(search: Dict[str, Any], requestor_name: str) -> Dict[str, Any]:
+    """Turn a ``customer_search`` response into a ``verification_response``-shaped result.
+
+    A single match at or above the HIGH band is verified, several HIGH matches are
+    ambiguous, a best match below the INSUFFICIENT band is not found, and anything
+    in between is ambiguous (manual review).
+    """
+    # Accept both the full and the compact (SCRA_TOOL_OUTPUT=compact) result shapes
+    results = [{
+        "confidence_percentage": result["confidence"],
+        "match_summary": result["match"],
+        "customer": {"customerId": result["customer_id"], "fullName": result["name"]},
+    } if "confidence" in result else result for result in search.get("results", [])]
+    top = results[0] if results else None
+    top_confidence = top["confidence_percentage"] if top else 0
+    runner_up = results[1]["confidence_percentage"] if len(results) > 1 else 0
+
+    if top_confidence < NOT_FOUND_CONFIDENCE:
+        verification, recommendation = "not_found", "Additional verification needed"
+    elif top_confidence >= VERIFIED_CONFIDENCE and runner_up < VERIFIED_CONFIDENCE:
+        verification, recommendation = "verified", "Proceed with high confidence"
+    else:
+        verification, recommendation = "ambiguous", "Manual review recommended"
+
+    customer = top["customer"] if top and verification == "verified" else None
+    return {
+        "verification_result": verification,
+        "confidence_percentage": top_confidence,
+        "customer_id": customer["customerId"] if customer else None,
+        "customer_name": customer["fullName"] if customer else requestor_name,
+        "actor": "self",
+        "match_details": top["match_summary"] if top else "No matching customer records",
+        "search_strategy_used": "SSN + name + address combination",
+        "recommendation": recommendation,
+    }
+
+
+def verify_requestor(requestor: Dict[str, Any]) -> Dict[str, Any]:
+    """Verify a requestor with a single SSN + name + address search."""
+    search = json.loads(customer_search(
+        ssn=requestor.get("ssnLast4", ""),
+        name=requestor.get("fullName", ""),
+        address=requestor_address(requestor),
+    ))
+    return classify_search_results(search, requestor.get("fullName", ""))
+
+
+def verify_requestors(requestors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Verify a batch of requestors with one bulk search; same results as ``verify_requestor`` for each."""
+    searches = bulk_customer_search(
+        (requestor.get("ssnLast4", ""), requestor.get("fullName", ""), requestor_address(requestor))
+        for requestor in requestors)
+    return [classify_search_results(search, requestor.get("fullName", ""))
+            for search, requestor in zip(searches, requestors)]
+
+
+def fetch_documents(request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Retrieve the content of every document attached to a request."""
+    return [json.loads(get_document(request["requestId"], document["documentId"]))
+            for document in request.get("documents", [])]
+
+
+def build_prefix(request_id: str, include_documents: bool = True) -> Optional[Dict[str, Any]]:
+    """Run the deterministic stages for a request and build the transcript the Eligibility agent reads.
+
+    Returns:
+        Optional[Dict[str, Any]]: ``request``, ``verification``, ``documents`` and
+        ``messages`` (user task, request details, verification and document content),
+        or None if the request ID is unknown
+    """
+    request = fetch_request(request_id)
+    if request is None:
+        return None
+    verification = verify_requestor(request["requestor"])
+    documents = fetch_documents(request) if include_documents else []
+
+    messages = [
+        TextMessage(source="user", content=request_id),
+        TextMessage(source="Orchestrator_agent", content=json.dumps({"success": True, "request": request})),
+        TextMessage(source="Customer_Verification_agent", content=json.dumps(verification)),
+    ]
+    if documents:
+        messages.append(TextMessage(source="Document_Processing_agent", content=json.dumps(documents)))
+    return {"request": request, "verification": verification, "documents": documents, "messages": messages}
@@ -0,0 +1,356 @@
+"""
+Eligibility Pre-scoring for the Benefit Orchestrator System.
+Columnar batch evaluation of the benefit rules over a request backlog, for triage and capacity planning.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from array import array
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agents.eligibility_decision_agent import REQUIRED_DOCUMENTS
+
+
+BENEFIT_TYPES = ("Auto Loan Deferment", "Foreclosure Protection", "Overdraft Fee Refund",
+                 "Credit Card APR Reduction")
+MILITARY_STATUSES = ("Active Duty", "Reserve", "National Guard", "Veteran")
+DOCUMENT_TYPES = ("Orders Document", "Proof of Military Service", "Leave and Earnings Statement",
+                  "Proof of Residence", "Loan Statement", "Financial Hardship Documentation", "Mortgage Documents",
+                  "Bank Statements", "Credit Statements", "Account History")
+
+DECISIONS = ("APPROVED", "DECLINED", "PENDING")
+CONFIDENCE_BUCKETS = ("high", "medium", "low")
+APPROVED, DECLINED, PENDING = range(3)
+HIGH, MEDIUM, LOW = range(3)
+
+AUTO_LOAN, FORECLOSURE, OVERDRAFT, CREDIT_CARD = range(4)
+ACTIVE_DUTY, RESERVE, NATIONAL_GUARD, VETERAN = range(4)
+
+# Thresholds from the Eligibility Decision Agent's BENEFIT ELIGIBILITY RULES
+ACTIVATION_DAYS_AUTO_LOAN = 180
+ACTIVATION_DAYS = 30
+# "fees ... within 60 days", read as the latest fee falling within 60 days before the requested effective date
+FEE_WINDOW_DAYS = 60
+
+# Results this close to a threshold are bucketed as medium confidence
+DATE_MARGIN_DAYS = 30
+ORDERS_MARGIN_DAYS = 15
+FEE_MARGIN_DAYS = 7
+
+# Unknown categories, flags, day counts and dates
+UNKNOWN = -1
+MISSING_DATE = -(2 ** 30)
+
+_COLUMN_TYPES = {
+    "benefit": "b", "status": "b", "verified": "b", "documents": "h", "orders_pcs": "b", "hardship_service": "b",
+    "dishonorable": "b", "orders_days": "i", "service_start": "i", "effective": "i", "mortgage_origination": "i",
+    "account_opening": "i", "last_fee": "i",
+}
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def _days(value: Optional[str]) -> int:
+    """Days since 1970-01-01 of an ISO date (the date part of a timestamp), or MISSING_DATE."""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal() - _EPOCH
+    except ValueError:
+        return MISSING_DATE
+
+
+def _flag(value: Any) -> int:
+    return UNKNOWN if value is None else int(bool(value))
+
+
+def _code(values: Tuple[str, ...], value: Any) -> int:
+    try:
+        return values.index(value)
+    except ValueError:
+        return UNKNOWN
+
+
+def _required_masks() -> Dict[int, List[int]]:
+    """Per benefit code, one document-type bitmask per required group (any one type satisfies a group)."""
+    return {BENEFIT_TYPES.index(benefit): [sum(1 << DOCUMENT_TYPES.index(document_type) for document_type in group)
+                                           for group in groups]
+            for benefit, groups in REQUIRED_DOCUMENTS.items() if benefit in BENEFIT_TYPES}
+
+
+def rule_inputs(request: Dict[str, Any], contents: Iterable[Dict[str, Any]] = (),
+                verification: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """The rule inputs of one request: category codes, flags, day counts and dates as days since 1970-01-01."""
+    requestor = request.get("requestor") or {}
+    details = request.get("requestDetails") or {}
+    row = {
+        "benefit": _code(BENEFIT_TYPES, details.get("benefitType")),
+        "status": _code(MILITARY_STATUSES, requestor.get("militaryStatus")),
+        "verified": UNKNOWN if verification is None else
+        {"verified": 1, "not_found": 0, "ambiguous": 0}.get(verification.get("verification_result"), UNKNOWN),
+        "documents": sum(1 << DOCUMENT_TYPES.index(t) for t in
+                         {document.get("documentType") for document in request.get("documents", [])}
+                         if t in DOCUMENT_TYPES),
+        "orders_pcs": UNKNOWN, "hardship_service": UNKNOWN, "dishonorable": 0, "orders_days": UNKNOWN,
+        "service_start": _days(requestor.get("serviceStartDate")),
+        "effective": _days(details.get("requestedEffectiveDate")),
+        "mortgage_origination": MISSING_DATE, "account_opening": MISSING_DATE, "last_fee": MISSING_DATE,
+    }
+    for document in contents:
+        document_type, content = document.get("document_type"), document.get("content") or {}
+        if document_type == "Orders Document":
+            if isinstance(content.get("duration_days"), (int, float)):
+                row["orders_days"] = max(row["orders_days"], int(content["duration_days"]))
+            kind = f"{content.get('orders_type') or ''} {content.get('deployment_type') or ''}".lower()
+            if kind.strip():
+                row["orders_pcs"] = max(row["orders_pcs"], int("pcs" in kind or "permanent change" in kind
+                                                               or "deploy" in kind))
+        elif document_type == "Proof of Military Service":
+            row["dishonorable"] |= int("dishonorable" in str(content.get("discharge_type") or "").lower())
+        elif document_type == "Financial Hardship Documentation":
+            row["hardship_service"] = max(row["hardship_service"], _flag(content.get("service_connection")))
+        elif document_type == "Mortgage Documents":
+            row["mortgage_origination"] = _days(content.get("loan_origination_date"))
+        elif document_type in ("Credit Statements", "Account History"):
+            opened = _days(content.get("account_opening_date") or content.get("opening_date"))
+            if opened != MISSING_DATE:
+                row["account_opening"] = opened if row["account_opening"] == MISSING_DATE \
+                    else min(row["account_opening"], opened)
+        elif document_type == "Bank Statements":
+            fees = [_days(day) for day in content.get("fee_dates") or []]
+            row["last_fee"] = max([row["last_fee"], *fees])
+    return row
+
+
+class BacklogColumns:
+    """The rule inputs of a backlog, one typed column per field and one row per request.
+
+    Columns are ``array.array`` buffers while loading and are viewed as NumPy
+    arrays without copying when NumPy is installed.
+    """
+
+    def __init__(self):
+        self.request_ids: List[str] = []
+        self.columns: Dict[str, Any] = {name: array(typecode) for name, typecode in _COLUMN_TYPES.items()}
+
+    def __len__(self) -> int:
+        return len(self.request_ids)
+
+    def append(self, request: Dict[str, Any], contents: Iterable[Dict[str, Any]] = (),
+               verification: Optional[Dict[str, Any]] = None):
+        """Add one request, the content of its documents and, optionally, its requestor's verification."""
+        row = rule_inputs(request, contents, verification)
+        self.request_ids.append(request.get("requestId"))
+        for name, value in row.items():
+            self.columns[name].append(value)
+
+    def arrays(self) -> Dict[str, Any]:
+        """The columns as NumPy arrays (views of the loading buffers), or the buffers themselves."""
+        if np is None:
+            return self.columns
+        return {name: np.frombuffer(column, dtype=column.typecode) if len(column) else
+                np.zeros(0, dtype=column.typecode) for name, column in self.columns.items()}
+
+
+def _evaluate(c: Dict[str, Any]) -> Tuple[Any, Any, Any, Any]:
+    """The benefit rules over columns (NumPy arrays) or over one row (Python scalars).
+
+    Only operators that mean the same elementwise and on scalars are used, so
+    both backends share these rules.
+
+    Returns:
+        Tuple: ``(hard_decline, eligible, decided, borderline)``; a request is decided
+        when it is eligible or every field its rule needs is known
+    """
+    benefit, status, documents = c["benefit"], c["status"], c["documents"]
+    active = status == ACTIVE_DUTY
+    reserve = (status == RESERVE) | (status == NATIONAL_GUARD)
+    veteran = status == VETERAN
+    days, pcs = c["orders_days"], c["orders_pcs"]
+    start, start_known = c["service_start"], c["service_start"] != MISSING_DATE
+    mortgage, mortgage_known = c["mortgage_origination"], c["mortgage_origination"] != MISSING_DATE
+    opening, opening_known = c["account_opening"], c["account_opening"] != MISSING_DATE
+    fee_age = c["effective"] - c["last_fee"]
+    fee_known = (c["last_fee"] != MISSING_DATE) & (c["effective"] != MISSING_DATE)
+
+    missing_documents = benefit != benefit
+    for code, masks in _required_masks().items():
+        for mask in masks:
+            missing_documents = missing_documents | ((benefit == code) & ((documents & mask) == 0))
+    hard_decline = (c["verified"] == 0) | missing_documents | (c["dishonorable"] == 1)
+
+    rules = {
+        AUTO_LOAN: (
+            (active & (pcs == 1)) | (reserve & (days >= ACTIVATION_DAYS_AUTO_LOAN)) | (veteran & (c["hardship_service"] == 1)),
+            (active & (pcs >= 0)) | (reserve & (days >= 0)) | (veteran & (c["hardship_service"] >= 0)),
+            reserve & (abs(days - ACTIVATION_DAYS_AUTO_LOAN) <= ORDERS_MARGIN_DAYS),
+        ),
+        FORECLOSURE: (
+            (active & ((mortgage_known & start_known & (mortgage < start)) | (pcs == 1)))
+            | (reserve & (days >= ACTIVATION_DAYS)),
+            (active & mortgage_known & start_known & (pcs >= 0)) | (reserve & (days >= 0)) | veteran,
+            (active & mortgage_known & start_known & (abs(mortgage - start) <= DATE_MARGIN_DAYS))
+            | (reserve & (abs(days - ACTIVATION_DAYS) <= ORDERS_MARGIN_DAYS)),
+        ),
+        OVERDRAFT: (
+            active & (pcs == 1) & fee_known & (fee_age >= 0) & (fee_age <= FEE_WINDOW_DAYS),
+            (active & (pcs >= 0) & fee_known) | reserve | veteran,
+            active & fee_known & (abs(fee_age - FEE_WINDOW_DAYS) <= FEE_MARGIN_DAYS),
+        ),
+        CREDIT_CARD: (
+            (active & opening_known & start_known & (opening < start)) | (reserve & (days >= ACTIVATION_DAYS)),
+            (active & opening_known & start_known) | (reserve & (days >= 0)) | veteran,
+            (active & opening_known & start_known & (abs(opening - start) <= DATE_MARGIN_DAYS))
+            | (reserve & (abs(days - ACTIVATION_DAYS) <= ORDERS_MARGIN_DAYS)),
+        ),
+    }
+    eligible = known = borderline = benefit != benefit
+    for code, (rule_eligible, rule_known, rule_borderline) in rules.items():
+        selected = benefit == code
+        eligible = eligible | (selected & rule_eligible)
+        known = known | (selected & rule_known)
+        borderline = borderline | (selected & rule_borderline)
+    return hard_decline, eligible, eligible | known, borderline
+
+
+def score_backlog(backlog: BacklogColumns) -> Tuple[Any, Any]:
+    """Likely decision and confidence bucket codes per request (indexes into DECISIONS and CONFIDENCE_BUCKETS).
+
+    Verification failures, missing required documents and dishonorable discharge
+    are high-confidence declines. Other decisions are high confidence unless the
+    requestor is unverified or a date or day count is near its threshold. Requests
+    whose rule lacks a field (or with an unknown benefit type or status) are
+    low-confidence PENDING.
+    """
+    columns = backlog.arrays()
+    if np is not None:
+        hard_decline, eligible, decided, borderline = _evaluate(columns)
+        decisions = np.where(hard_decline, DECLINED, np.where(decided, np.where(eligible, APPROVED, DECLINED),
+                                                              PENDING)).astype(np.int8)
+        confidence = np.where(hard_decline, HIGH, np.where(decided, np.where(
+            borderline | (columns["verified"] != 1), MEDIUM, HIGH), LOW)).astype(np.int8)
+        return decisions, confidence
+
+    decisions, confidence = array("b"), array("b")
+    names = list(columns)
+    for values in zip(*columns.values()):
+        hard_decline, eligible, decided, borderline = _evaluate(dict(zip(names, values)))
+        if hard_decline:
+            decisions.append(DECLINED)
+            confidence.append(HIGH)
+        elif not decided:
+            decisions.append(PENDING)
+            confidence.append(LOW)
+        else:
+            decisions.append(APPROVED if eligible else DECLINED)
+            confidence.append(MEDIUM if borderline or values[names.index("verified")] != 1 else HIGH)
+    return decisions, confidence
+
+
+def load_backlog(requests: Iterable[Dict[str, Any]],
+                 contents: Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+                 verify: bool = False, batch_size: int = 1000) -> BacklogColumns:
+    """Load a backlog's rule inputs into columns.
+
+    Args:
+        requests (Iterable[Dict[str, Any]]): Request records
+        contents (Optional[Callable]): Returns the ``get_document`` responses of a request;
+            defaults to ``runtime.deterministic_stages.fetch_documents``
+        verify (bool): Also verify requestors, ``batch_size`` at a time with one bulk
+            customer search per batch
+    """
+    from runtime.deterministic_stages import fetch_documents, verify_requestors
+    contents = contents or fetch_documents
+    backlog = BacklogColumns()
+    requests = iter(requests)
+    while True:
+        batch = list(itertools.islice(requests, batch_size))
+        if not batch:
+            return backlog
+        verifications = verify_requestors([request["requestor"] for request in batch]) if verify \
+            else [None] * len(batch)
+        for request, verification in zip(batch, verifications):
+            backlog.append(request, contents(request), verification)
+
+
+def _tiled(backlog: BacklogColumns, rows: int) -> BacklogColumns:
+    """The backlog repeated up to ``rows`` rows, for throughput measurements."""
+    tiled = BacklogColumns()
+    repeats = -(-rows // max(1, len(backlog)))
+    tiled.request_ids = (backlog.request_ids * repeats)[:rows]
+    tiled.columns = {name: (column * repeats)[:rows] for name, column in backlog.columns.items()}
+    return tiled
+
+
+def main():
+    """Pre-score a backlog: likely decisions and confidence per request, and scoring throughput."""
+    parser = argparse.ArgumentParser(description="Batch eligibility pre-scoring of a request backlog.")
+    parser.add_argument("request_ids", nargs="*", help="Request IDs (defaults to REQ-001 to REQ-005)")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database to score")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of population requests")
+    parser.add_argument("--verify", action="store_true", help="Verify requestors with bulk customer searches")
+    parser.add_argument("--output", default=None, help="JSONL file for the per-request decisions")
+    parser.add_argument("--benchmark-rows", type=int, default=0,
+                        help="Also time scoring over the loaded backlog repeated to this many rows")
+    args = parser.parse_args()
+
+    from runtime.deterministic_stages import fetch_request
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-prescore")
+    if args.population:
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+    if args.population and not args.request_ids:
+        from simulation.synthetic_population import read_population
+        requests: Iterable[Dict[str, Any]] = itertools.islice(read_population(args.population, "request"),
+                                                              args.limit)
+    else:
+        request_ids = args.request_ids or [f"REQ-{i:03d}" for i in range(1, 6)]
+        requests = (request for request in map(fetch_request, request_ids) if request is not None)
+
+    started = time.perf_counter()
+    backlog = load_backlog(requests, verify=args.verify)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    decisions, confidence = score_backlog(backlog)
+    score_seconds = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for request_id, benefit, decision, bucket in zip(backlog.request_ids, backlog.columns["benefit"],
+                                                             decisions, confidence):
+                f.write(json.dumps({"request_id": request_id,
+                                    "benefit_type": BENEFIT_TYPES[benefit] if benefit != UNKNOWN else None,
+                                    "likely_decision": DECISIONS[decision],
+                                    "confidence": CONFIDENCE_BUCKETS[bucket]}) + "\n")
+
+    backend = "numpy" if np is not None else "pure Python"
+    print(f"📊 Pre-scored {len(backlog)} requests ({backend}): loaded in {load_seconds:.2f}s, "
+          f"scored in {score_seconds * 1000:.1f} ms")
+    table = Counter(zip(backlog.columns["benefit"], decisions, confidence))
+    for benefit in sorted({key[0] for key in table}):
+        name = BENEFIT_TYPES[benefit] if benefit != UNKNOWN else "Unknown benefit type"
+        cells = ", ".join(f"{DECISIONS[decision]}/{CONFIDENCE_BUCKETS[bucket]} {count}"
+                          for (b, decision, bucket), count in sorted(table.items()) if b == benefit)
+        print(f"   {name}: {cells}")
+
+    if args.benchmark_rows:
+        tiled = _tiled(backlog, args.benchmark_rows)
+        started = time.perf_counter()
+        score_backlog(tiled)
+        seconds = time.perf_counter() - started
+        print(f"📈 Scoring throughput: {len(tiled) / seconds:,.0f} requests/s over {len(tiled):,} rows")
+    if args.output:
+        print(f"✅ Decisions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Memory Accounting for the Benefit Orchestrator System.
+Per-request tracemalloc accounting, bounded transcript retention and a soak test for long-running workers.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from autogen_agentchat.messages import MessageFactory
+
+
+TRANSCRIPT_POLICIES = ("drop", "keep", "spill")
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryAccountant:
+    """Per-request memory accounting from tracemalloc snapshots taken before and after each request.
+
+    Net and peak figures are process-wide, so they are exact for a worker
+    running one request at a time and approximate when requests overlap.
+    """
+
+    def __init__(self, top: int = 3):
+        self.top = top
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def request(self) -> Iterator[Dict[str, Any]]:
+        """Yields a dict that holds ``memory_net_kib``, ``memory_peak_kib`` and ``memory_top_growth`` on exit."""
+        usage: Dict[str, Any] = {}
+        before = tracemalloc.take_snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield usage
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            growth = tracemalloc.take_snapshot().compare_to(before, "lineno")
+            usage.update({
+                "memory_net_kib": round((current - start_current) / 1024, 1),
+                "memory_peak_kib": round((peak - start_current) / 1024, 1),
+                "memory_top_growth": [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+                                      f"{stat.size_diff / 1024:+.1f} KiB"
+                                      for stat in growth[:self.top] if stat.size_diff > 0],
+            })
+
+
+class TranscriptRetention:
+    """What happens to a completed request's transcript.
+
+    ``drop`` keeps nothing; ``keep`` holds the last ``keep`` transcripts in
+    memory and forgets older ones; ``spill`` holds the last ``keep`` and writes
+    older ones to ``spill_dir`` as one JSONL file per request.
+    """
+
+    def __init__(self, policy: str = "drop", keep: int = 100, spill_dir: Optional[str] = None):
+        if policy not in TRANSCRIPT_POLICIES:
+            raise ValueError(f"Unknown transcript policy '{policy}'; expected one of {TRANSCRIPT_POLICIES}")
+        if policy == "spill" and not spill_dir:
+            raise ValueError("The spill policy needs a spill directory")
+        self.policy = policy
+        self.keep = keep
+        self.spill_dir = spill_dir
+        self._recent: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._message_factory = MessageFactory()
+        self.stats = {"retained": 0, "spilled": 0, "dropped": 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, request_id: str) -> str:
+        return os.path.join(self.spill_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", request_id) + ".jsonl")
+
+    def retain(self, request_id: str, messages: List[Any]):
+        """Hand over a completed transcript; the caller should drop its own references."""
+        if self.policy == "drop":
+            self.stats["dropped"] += 1
+            return
+        # Dumped dicts instead of message objects, so nothing else stays reachable from them
+        self._recent[request_id] = [message.dump() for message in messages]
+        self._recent.move_to_end(request_id)
+        self.stats["retained"] += 1
+        while len(self._recent) > self.keep:
+            old_id, old_messages = self._recent.popitem(last=False)
+            if self.policy == "spill":
+                with open(self._spill_path(old_id), "w", encoding="utf-8") as f:
+                    for message in old_messages:
+                        f.write(json.dumps(message, default=str) + "\n")
+                self.stats["spilled"] += 1
+            else:
+                self.stats["dropped"] += 1
+
+    def get(self, request_id: str) -> Optional[List[Any]]:
+        """A retained transcript as message objects, from memory or the spill directory."""
+        dumped = self._recent.get(request_id)
+        if dumped is None and self.policy == "spill" and os.path.exists(self._spill_path(request_id)):
+            with open(self._spill_path(request_id), encoding="utf-8") as f:
+                dumped = [json.loads(line) for line in f if line.strip()]
+        if dumped is None:
+            return None
+        return [self._message_factory.create(message) for message in dumped]
+
+
+SELECTOR_HISTORY_PATTERN = re.compile(r"<CONVERSATION_HISTORY>(.*)</CONVERSATION_HISTORY>", re.S)
+
+SOAK_DECISION = """## ELIGIBILITY DECISION
+
+**Decision:** APPROVED
+
+**Benefit Type:** {benefit_type}
+
+**Justification:** Soak test decision
+
+**Appeal Rights:** Decision may be appealed within 30 days"""
+
+SOAK_ASSESSMENT = {"quality_score": 7, "workflow_compliance": "COMPLIANT", "evaluation_summary": "Soak test",
+                   "strengths": [], "concerns": [], "recommendation": "PROCEED"}
+
+
+def soak_model_reply(body: Dict[str, Any]) -> str:
+    """Stub model answer for the soak test's teams, from a chat completions request body.
+
+    Speaker selection follows the selector prompt's rules, the Eligibility
+    Decision Agent approves and the Judge passes the workflow; other agents'
+    calls are answered by the deterministic cascade tier before they reach here.
+    """
+    messages = body.get("messages") or []
+    system = str(messages[0].get("content")) if messages else ""
+    text = "\n".join(str(message.get("content")) for message in messages)
+    history = SELECTOR_HISTORY_PATTERN.search(text)
+    if history:
+        speakers = re.findall(r"^(\w+):", history.group(1), re.M)
+        routes = re.findall(r'"next_agent"\s*:\s*"(\w+)"', history.group(1))
+        if speakers and speakers[-1] == "Orchestrator_agent" and routes:
+            return routes[-1]
+        return "Orchestrator_agent"
+    if system.startswith("You are the Eligibility Decision Agent"):
+        benefit_type = re.search(r'"benefitType"\s*:\s*"([^"]+)"', text)
+        return SOAK_DECISION.format(benefit_type=benefit_type.group(1) if benefit_type else "Unknown")
+    if system.startswith("You are the Judge Agent"):
+        return json.dumps(SOAK_ASSESSMENT)
+    return "OK"
+
+
+async def _soak(request_ids: List[str], policy: str, keep: int, spill_dir: Optional[str], sample_every: int,
+                account: bool, max_turns: int) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Run the requests one at a time through the queue worker, sampling memory as it goes.
+
+    The teams are real and call their models over HTTP; ``OPENAI_BASE_URL``
+    must point at a stub model answering with ``soak_model_reply``. The
+    deterministic cascade tier drives the Orchestrator, Verification and
+    Execution agents through the workflow's tools, and a turn budget ends
+    requests the stub's replies leave unfinished.
+    """
+    from create_benefit_orchestrator import create_benefit_orchestrator_team
+    from runtime.model_cascade import ModelCascade
+    from runtime.request_budget import RequestBudget
+    from runtime.request_worker import JsonlTailSource, RequestQueueWorker
+    from runtime.team_pool import TeamPool
+    from runtime.team_runner import auto_approve_input
+
+    cascade = ModelCascade()
+    budget = RequestBudget(max_turns=max_turns)
+    pool = TeamPool(lambda: create_benefit_orchestrator_team(user_input_func=auto_approve_input, cascade=cascade,
+                                                             budget=budget), size=1)
+    retention = TranscriptRetention(policy, keep=keep, spill_dir=spill_dir)
+    samples = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        queue_file = os.path.join(work_dir, "queue.jsonl")
+        with open(queue_file, "w", encoding="utf-8") as f:
+            for request_id in request_ids:
+                f.write(json.dumps({"request_id": request_id}) + "\n")
+
+        worker = RequestQueueWorker(
+            JsonlTailSource(queue_file), os.path.join(work_dir, "results.jsonl"),
+            os.path.join(work_dir, "checkpoint.json"), team_factory=None, max_in_flight=1,
+            exit_when_idle=True, team_pool=pool, retention=retention,
+            memory=MemoryAccountant() if account else None)
+
+        started = time.perf_counter()
+        stop_event = asyncio.Event()
+
+        async def sample():
+            while not stop_event.is_set():
+                done = sum(worker.counts.values())
+                if done >= len(samples) * sample_every:
+                    samples.append({"requests": done, "rss_mb": round(rss_bytes() / 1024 / 1024, 1),
+                                    "seconds": round(time.perf_counter() - started, 1)})
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.create_task(sample())
+        await worker.run()
+        stop_event.set()
+        await sampler
+        samples.append({"requests": sum(worker.counts.values()), "rss_mb": round(rss_bytes() / 1024 / 1024, 1),
+                        "seconds": round(time.perf_counter() - started, 1)})
+    return samples, worker.counts
+
+
+def main():
+    """Soak test: run many sequential requests through the worker and check that memory stays flat."""
+    parser = argparse.ArgumentParser(description="Soak-test worker memory over many sequential requests.")
+    parser.add_argument("--requests", type=int, default=10_000, help="Sequential requests to run")
+    parser.add_argument("--population", default=None,
+                        help="Synthetic population SQLite database (distinct request IDs instead of REQ-001 to REQ-005)")
+    parser.add_argument("--transcripts", choices=TRANSCRIPT_POLICIES, default="spill",
+                        help="What to do with completed transcripts")
+    parser.add_argument("--keep", type=int, default=100, help="Transcripts held in memory")
+    parser.add_argument("--spill-dir", default=None, help="Directory for spilled transcripts (default: temporary)")
+    parser.add_argument("--sample-every", type=int, default=500, help="Requests between memory samples")
+    parser.add_argument("--account", action="store_true",
+                        help="Also record per-request tracemalloc accounting (slower)")
+    parser.add_argument("--max-turns", type=int, default=40, help="Agent turn budget per request")
+    parser.add_argument("--tolerance-mb", type=float, default=10.0,
+                        help="RSS growth after warm-up still counted as flat")
+    args = parser.parse_args()
+
+    from runtime.rate_limit_stub import RateLimitedStub
+
+    # Only the model is a stub; the teams, tools and worker around it are the real ones
+    stub = RateLimitedStub(requests_per_minute=600_000, tokens_per_minute=10 ** 9, latency_seconds=0.0,
+                           reply=soak_model_reply).start()
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    os.environ["OPENAI_API_KEY"] = "stub"
+    request_ids = [f"REQ-{index % 5 + 1:03d}" for index in range(args.requests)]
+    if args.population:
+        import itertools
+        from simulation.synthetic_population import read_population
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+        request_ids = [record["requestId"] for record in
+                       itertools.islice(read_population(args.population, "request"), args.requests)]
+
+    try:
+        with tempfile.TemporaryDirectory() as default_spill:
+            spill_dir = args.spill_dir or (default_spill if args.transcripts == "spill" else None)
+            samples, counts = asyncio.run(_soak(request_ids, args.transcripts, args.keep, spill_dir,
+                                                args.sample_every, args.account, args.max_turns))
+    finally:
+        stub.stop()
+
+    print(f"📊 Memory over {len(request_ids)} sequential requests ({args.transcripts} transcripts, "
+          f"{stub.counts['completed']:,} stub model calls, outcomes {dict(counts)}):")
+    for sample in samples:
+        print(f"   {sample['requests']:>7} requests  {sample['rss_mb']:>8.1f} MB RSS  {sample['seconds']:>7.1f}s")
+    # The first tenth warms the caches, the team pool and the allocator
+    warm = next((s for s in samples if s["requests"] >= len(request_ids) // 10), samples[0])
+    growth = samples[-1]["rss_mb"] - warm["rss_mb"]
+    verdict = "✅ flat" if growth <= args.tolerance_mb else "❌ growing"
+    print(f"{verdict}: {growth:+.1f} MB after {warm['requests']} warm-up requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Operational Metrics for the Benefit Orchestrator System.
+Counters, gauges and latency histograms for running teams, served as Prometheus text over HTTP or written to a file.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, AsyncGenerator, List, Optional, Sequence, Tuple, Union
+
+from autogen_agentchat.base import Response
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelInfo, RequestUsage
+
+from runtime.tail_latency import SELECTOR_KEY
+
+
+# Seconds; spans fast tool calls up to slow model calls and whole agent turns
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+ORCHESTRATOR_AGENT = "Orchestrator_agent"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels):
+        with self._lock:
+            self._values[self._key(labels)] += amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        return super().render() + [f"{self.name}{_labels(self.label_names, key)} {value:g}"
+                                   for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names, lock)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative) ..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, seconds: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe collection of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names, self._lock))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names, self._lock))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, self._lock, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write the current metrics to ``path`` atomically (e.g. for the node exporter's textfile collector)."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+class MeteredChatCompletionClient(ChatCompletionClient):
+    """Chat completion client that records call latency, and speaker-selection retries for the selector.
+
+    Wraps the outermost client, so latency includes scheduler queueing and any
+    tail-latency retries, i.e. the time the agent actually waited.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, key: str, metrics: "TeamMetrics"):
+        self.inner = inner
+        self.key = key
+        self.metrics = metrics
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        # SelectorGroupChat re-asks with the rejected answer and feedback appended
+        if self.key == SELECTOR_KEY and len(messages) > 1:
+            self.metrics.selector_retries.inc()
+        started = time.perf_counter()
+        try:
+            return await self.inner.create(messages, **kwargs)
+        except Exception:
+            self.metrics.model_call_errors.inc(client=self.key)
+            raise
+        finally:
+            self.metrics.model_call_seconds.observe(time.perf_counter() - started, client=self.key)
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        # SelectorGroupChat streams its selection calls when model_client_streaming is set
+        if self.key == SELECTOR_KEY and len(messages) > 1:
+            self.metrics.selector_retries.inc()
+        started = time.perf_counter()
+        try:
+            async for chunk in self.inner.create_stream(messages, **kwargs):
+                yield chunk
+        except Exception:
+            self.metrics.model_call_errors.inc(client=self.key)
+            raise
+        finally:
+            self.metrics.model_call_seconds.observe(time.perf_counter() - started, client=self.key)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.inner.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.inner.model_info
+
+
+class TeamMetrics:
+    """The benefit team's operational metrics, shared by every team in the process."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.requests_started = r.counter("scra_requests_started_total", "Benefit requests started")
+        self.requests_completed = r.counter("scra_requests_completed_total",
+                                            "Benefit requests finished, by status and eligibility decision",
+                                            ("status", "decision"))
+        self.in_flight = r.gauge("scra_conversations_in_flight", "Benefit requests currently running")
+        self.turn_seconds = r.histogram("scra_agent_turn_seconds", "Agent turn latency", ("agent",))
+        self.tool_seconds = r.histogram("scra_tool_seconds", "Tool call latency", ("tool",))
+        self.tool_errors = r.counter("scra_tool_errors_total", "Tool calls that raised", ("tool",))
+        self.model_call_seconds = r.histogram("scra_model_call_seconds", "Model call latency as seen by the caller",
+                                              ("client",))
+        self.model_call_errors = r.counter("scra_model_call_errors_total", "Model calls that raised", ("client",))
+        self.selector_retries = r.counter("scra_selector_retries_total",
+                                          "Speaker-selection attempts after the first (max_selector_attempts)")
+        self.orchestrator_parse_failures = r.counter("scra_orchestrator_json_parse_failures_total",
+                                                     "Orchestrator replies that were not valid JSON")
+
+    def request_started(self):
+        self.requests_started.inc()
+        self.in_flight.inc()
+
+    def request_finished(self, outcome: Dict[str, Any]):
+        self.in_flight.dec()
+        self.requests_completed.inc(status=outcome.get("status", "error"), decision=outcome.get("decision") or "none")
+
+    def wrap_client(self, client: ChatCompletionClient, key: str) -> ChatCompletionClient:
+        return MeteredChatCompletionClient(client, key, self)
+
+    def wrap_tool(self, tool):
+        """Time a tool's calls (and count those that raise)."""
+        if getattr(tool, "_metered", False):
+            return tool
+        run = tool.run
+
+        async def metered_run(args, cancellation_token):
+            started = time.perf_counter()
+            try:
+                return await run(args, cancellation_token)
+            except Exception:
+                self.tool_errors.inc(tool=tool.name)
+                raise
+            finally:
+                self.tool_seconds.observe(time.perf_counter() - started, tool=tool.name)
+
+        tool.run = metered_run
+        tool._metered = True
+        return tool
+
+    def apply_to_agent(self, agent):
+        """Meter the agent's model client, tools and turns."""
+        if getattr(agent, "_metered", False):
+            return agent
+        agent._model_client = self.wrap_client(agent._model_client, agent.name)
+        for workbench in getattr(agent, "_workbench", None) or []:
+            for tool in getattr(workbench, "_tools", []):
+                self.wrap_tool(tool)
+        on_messages_stream = agent.on_messages_stream
+
+        async def metered_stream(messages, cancellation_token) -> AsyncGenerator[Any, None]:
+            started = time.perf_counter()
+            async for item in on_messages_stream(messages, cancellation_token):
+                if isinstance(item, Response):
+                    self.turn_seconds.observe(time.perf_counter() - started, agent=agent.name)
+                    if agent.name == ORCHESTRATOR_AGENT:
+                        self._check_orchestrator_reply(item)
+                yield item
+
+        agent.on_messages_stream = metered_stream
+        agent._metered = True
+        return agent
+
+    def _check_orchestrator_reply(self, response: Response):
+        content = getattr(response.chat_message, "content", None)
+        if not isinstance(content, str):
+            return
+        try:
+            json.loads(content)
+        except json.JSONDecodeError:
+            self.orchestrator_parse_failures.inc()
+
+
+class MetricsServer:
+    """Serves ``/metrics`` in the Prometheus text format from a background thread."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class MetricsFileExporter:
+    """Rewrites a metrics file every ``interval`` seconds from a background thread, and once more on stop."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.registry.write(self.path)
+
+    def start(self) -> "MetricsFileExporter":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.registry.write(self.path)
+
+
+async def _simulate(metrics: TeamMetrics, requests: int):
+    """Feed simulated requests, turns, tool calls and selector retries through the metrics."""
+    rng = random.Random(7)
+    agents = ["Orchestrator_agent", "Customer_Verification_agent", "Document_Processing_agent",
+              "Eligibility_Decision_agent", "Judge_agent", "Benefit_Execution_agent"]
+    for _ in range(requests):
+        metrics.request_started()
+        for agent in agents:
+            metrics.model_call_seconds.observe(rng.lognormvariate(-0.5, 0.6), client=agent)
+            metrics.turn_seconds.observe(rng.lognormvariate(0.0, 0.6), agent=agent)
+            if rng.random() < 0.05:
+                metrics.selector_retries.inc()
+        metrics.tool_seconds.observe(rng.lognormvariate(-6, 0.5), tool="customer_search")
+        metrics.tool_seconds.observe(rng.lognormvariate(-7, 0.5), tool="get_document")
+        if rng.random() < 0.02:
+            metrics.orchestrator_parse_failures.inc()
+        await asyncio.sleep(0)
+        metrics.request_finished({"status": "completed", "decision": rng.choice(["APPROVED", "DECLINED"])})
+
+
+def main():
+    """Serve simulated metrics, to check a Prometheus scrape configuration or dashboard."""
+    parser = argparse.ArgumentParser(description="Serve benefit team metrics in the Prometheus text format.")
+    parser.add_argument("--port", type=int, default=9464, help="HTTP port for /metrics")
+    parser.add_argument("--file", default=None, help="Also write the metrics to this file")
+    parser.add_argument("--requests", type=int, default=100, help="Simulated requests to record")
+    parser.add_argument("--serve", action="store_true", help="Keep serving until interrupted")
+    args = parser.parse_args()
+
+    metrics = TeamMetrics()
+    asyncio.run(_simulate(metrics, args.requests))
+    server = MetricsServer(metrics.registry, port=args.port).start()
+    print(f"📈 Metrics at {server.url}")
+    if args.file:
+        metrics.registry.write(args.file)
+        print(f"   Written to {args.file}")
+    try:
+        while args.serve:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
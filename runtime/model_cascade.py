@@ -0,0 +1,761 @@
+"""
+Model Cascade for the Benefit Orchestrator System.
+Answers structured agent calls from a cheap or deterministic tier first and escalates to the agent's own model.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, Any, AsyncGenerator, Callable, List, Optional, Sequence, Tuple, Union
+
+from autogen_core import FunctionCall
+from autogen_core.models import (AssistantMessage, ChatCompletionClient, CreateResult, FunctionExecutionResult,
+                                 FunctionExecutionResultMessage, LLMMessage, ModelInfo, RequestUsage, SystemMessage,
+                                 UserMessage)
+
+from runtime.team_runner import AUTO_APPROVE_REPLY, BENEFIT_TYPE_PATTERN, DECISION_PATTERN
+
+
+ORCHESTRATOR_AGENT = "Orchestrator_agent"
+VERIFICATION_AGENT = "Customer_Verification_agent"
+EXECUTION_AGENT = "Benefit_Execution_agent"
+
+# Agents whose outputs are structured and low-ambiguity enough to try a cheaper tier first
+CASCADE_AGENTS = (ORCHESTRATOR_AGENT, VERIFICATION_AGENT, EXECUTION_AGENT)
+
+# Valid answers that still go to the next tier, per agent
+LOW_CONFIDENCE_CHECKS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    VERIFICATION_AGENT: lambda answer: answer.get("verification_result") == "ambiguous",
+    EXECUTION_AGENT: lambda answer: answer.get("status") == "failure",
+}
+
+# Mean token probability below which a tier's answer counts as low confidence (when it reports logprobs)
+MIN_TOKEN_PROBABILITY = 0.8
+
+# Operations user replies read as confirming the decision; anything else needs the model to interpret
+APPROVAL_PATTERN = re.compile(r"^\s*(i agree|agreed|approved?|yes|confirm(ed)?|proceed|looks good)\b", re.IGNORECASE)
+NEGATION_PATTERN = re.compile(r"\b(not|no|don't|disagree|change|override|instead|but|however|reconsider)\b",
+                              re.IGNORECASE)
+
+_JSON_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool, "null": type(None)}
+
+
+class CascadeDecline(Exception):
+    """Raised by a tier that cannot answer a call, so the cascade moves on to the next tier."""
+
+
+def validate_json_schema(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Check a value against the JSON Schema subset used by the agents' ``response_format`` schemas.
+
+    Supports ``type`` (including type lists), ``enum``, ``properties``,
+    ``required``, ``additionalProperties: false``, ``items``, ``minimum`` and
+    ``maximum``.
+
+    Returns:
+        List[str]: One message per violation; empty when the value is valid
+    """
+    errors = []
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        matched = any(
+            (isinstance(value, int) and not isinstance(value, bool)) if kind == "integer" else
+            (isinstance(value, (int, float)) and not isinstance(value, bool)) if kind == "number" else
+            isinstance(value, _JSON_TYPES.get(kind, object)) and not (kind != "boolean" and isinstance(value, bool))
+            for kind in types)
+        if not matched:
+            return [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: {value} is below {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: {value} is above {schema['maximum']}")
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        errors += [f"{path}: missing {key}" for key in schema.get("required", []) if key not in value]
+        if schema.get("additionalProperties") is False:
+            errors += [f"{path}: unexpected {key}" for key in value if key not in properties]
+        for key, child in value.items():
+            if key in properties:
+                errors += validate_json_schema(child, properties[key], f"{path}.{key}")
+    if isinstance(value, list) and "items" in schema:
+        for index, item in enumerate(value):
+            errors += validate_json_schema(item, schema["items"], f"{path}[{index}]")
+    return errors
+
+
+def _create_args(client: ChatCompletionClient) -> Dict[str, Any]:
+    """The create arguments of the OpenAI client under any scheduling, tail latency or metrics wrappers."""
+    while not hasattr(client, "_create_args"):
+        inner = getattr(client, "inner", None) or getattr(client, "client", None)
+        if not isinstance(inner, ChatCompletionClient):
+            return {}
+        client = inner
+    return client._create_args or {}
+
+
+def response_schema(client: ChatCompletionClient) -> Optional[Dict[str, Any]]:
+    """The JSON schema of a structured-output client's ``response_format``, if it has one."""
+    response_format = _create_args(client).get("response_format") or {}
+    return (response_format.get("json_schema") or {}).get("schema")
+
+
+def is_plain_approval(reply: str) -> bool:
+    """Whether an operations user reply simply confirms the decision, with no correction to interpret."""
+    return reply.strip() == AUTO_APPROVE_REPLY or bool(APPROVAL_PATTERN.search(reply)
+                                                       and not NEGATION_PATTERN.search(reply))
+
+
+def _tool_schemas(tools: Sequence[Any]) -> Dict[str, Dict[str, Any]]:
+    schemas = {}
+    for tool in tools:
+        schema = tool.schema if hasattr(tool, "schema") else tool
+        schemas[schema["name"]] = schema.get("parameters") or {}
+    return schemas
+
+
+def _text(message: LLMMessage) -> str:
+    return message.content if isinstance(getattr(message, "content", None), str) else ""
+
+
+def _json_object(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        value = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def routing_response(next_agent: str, request: Dict[str, Any], verification: Optional[Dict[str, Any]],
+                     progress: str) -> str:
+    """A ``routing_response`` for the Orchestrator, with the request details restricted to the schema's fields."""
+    requestor = request.get("requestor") or {}
+    verification = verification or {"verification_result": "pending", "confidence_percentage": 0,
+                                    "customer_id": None, "customer_name": requestor.get("fullName", "")}
+    details = {key: request.get(key) for key in ("requestId", "timestamp", "customerId", "requestor",
+                                                 "requestDetails", "documents")}
+    details["customerVerification"] = {key: verification.get(key) for key in
+                                       ("verification_result", "confidence_percentage", "customer_id",
+                                        "customer_name")}
+    benefit_type = (request.get("requestDetails") or {}).get("benefitType", "")
+    instructions = {
+        VERIFICATION_AGENT: f"Verify requestor {requestor.get('fullName', '')} (SSN last 4 "
+                            f"{requestor.get('ssnLast4', '')}) against the System of Record.",
+        "Eligibility_Decision_agent": f"Determine eligibility for {benefit_type} using the verification "
+                                      "results and the request's documents.",
+        "Document_Processing_agent": "Process the documents requested by the Eligibility Decision Agent.",
+        "Judge_agent": "Evaluate the eligibility decision for quality and workflow compliance.",
+        "User_Proxy_agent": "Review the eligibility decision and the Judge evaluation, and confirm or correct it.",
+        EXECUTION_AGENT: "Execute the confirmed eligibility decision.",
+        "TERMINATE": "Workflow complete.",
+    }[next_agent]
+    return json.dumps({
+        "next_agent": next_agent,
+        "request_details": details,
+        "context_summary": f"{request.get('requestId', '')} ({benefit_type}): {progress}.",
+        "instructions": instructions,
+    })
+
+
+def execution_response(outcome: str, request_id: str, benefit_type: str, basis: str) -> str:
+    """An ``execution_response`` for an APPROVED or DECLINED decision."""
+    if outcome == "APPROVED":
+        return json.dumps({
+            "execution_type": "benefit_activation",
+            "status": "success",
+            "customer_message": f"Your {benefit_type} request {request_id} has been approved and the benefit "
+                                "has been activated.",
+            "details": f"Benefit activated for {request_id}. Eligibility basis: {basis}",
+        })
+    return json.dumps({
+        "execution_type": "decline_notification",
+        "status": "success",
+        "customer_message": f"Your {benefit_type} request {request_id} has been declined: {basis}. "
+                            "You may appeal within 30 days.",
+        "details": f"Decline notification sent for {request_id}. Eligibility basis: {basis}",
+    })
+
+
+def request_from_context(messages: Sequence[LLMMessage]) -> Optional[Dict[str, Any]]:
+    """The request record, from routing output or ``get_request_details`` results in the context."""
+    for message in reversed(messages):
+        if isinstance(message, FunctionExecutionResultMessage):
+            for result in message.content:
+                response = _json_object(result.content)
+                if response and isinstance(response.get("request"), dict):
+                    return response["request"]
+        response = _json_object(_text(message))
+        if response and isinstance(response.get("request_details"), dict):
+            return response["request_details"]
+        if response and isinstance(response.get("request"), dict):
+            return response["request"]
+    # The Orchestrator's head-and-tail context keeps the task message even when the lookup has scrolled out
+    task = next((message for message in messages if getattr(message, "source", None) == "user"), None)
+    if task is not None and task is not messages[-1] and re.fullmatch(r"[A-Za-z]+-\d+", _text(task).strip()):
+        from runtime.deterministic_stages import fetch_request
+        return fetch_request(_text(task).strip())
+    return None
+
+
+def verification_from_context(messages: Sequence[LLMMessage]) -> Optional[Dict[str, Any]]:
+    """The latest customer verification result in an agent's context."""
+    for message in reversed(messages):
+        response = _json_object(_text(message))
+        if response and "verification_result" in response:
+            return response
+        if response and isinstance((response.get("request_details") or {}).get("customerVerification"), dict):
+            return response["request_details"]["customerVerification"]
+    return None
+
+
+class _OfflineTier(ChatCompletionClient):
+    """Shared plumbing of the tiers that answer without calling a model API."""
+
+    def __init__(self):
+        self._usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _result(self, content: Union[str, List[FunctionCall]], usage: RequestUsage) -> CreateResult:
+        self._usage = RequestUsage(prompt_tokens=self._usage.prompt_tokens + usage.prompt_tokens,
+                                   completion_tokens=self._usage.completion_tokens + usage.completion_tokens)
+        return CreateResult(finish_reason="function_calls" if isinstance(content, list) else "stop",
+                            content=content, usage=usage, cached=False)
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        yield await self.create(messages, **kwargs)
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return self._usage
+
+    def total_usage(self) -> RequestUsage:
+        return self._usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return sum(len(str(getattr(message, "content", ""))) for message in messages) // 4
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return 128_000 - self.count_tokens(messages)
+
+    @property
+    def capabilities(self):
+        return self.model_info
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return ModelInfo(vision=False, function_calling=True, json_output=True, family="unknown",
+                         structured_output=True)
+
+
+class DeterministicTier(_OfflineTier):
+    """Tier that answers the structured agents' standard workflow steps without a model.
+
+    The Orchestrator's routing follows its WORKFLOW RULES from the last message
+    in its context; verification calls ``customer_search`` and classifies the
+    result with the Customer Verification Agent's confidence bands; execution
+    turns an APPROVED or DECLINED decision into the execution response. Any
+    other situation raises ``CascadeDecline``.
+    """
+
+    name = "deterministic"
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+        self._answers = {ORCHESTRATOR_AGENT: self._route, VERIFICATION_AGENT: self._verify,
+                         EXECUTION_AGENT: self._execute}
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        answer = self._answers.get(self.agent_name)
+        if answer is None:
+            raise CascadeDecline(f"No deterministic answers for {self.agent_name}")
+        content = answer([message for message in messages if not isinstance(message, SystemMessage)])
+        return self._result(content, RequestUsage(prompt_tokens=0, completion_tokens=0))
+
+    @staticmethod
+    def _call(name: str, arguments: Dict[str, Any]) -> List[FunctionCall]:
+        return [FunctionCall(id=f"call_{uuid.uuid4().hex[:24]}", name=name, arguments=json.dumps(arguments))]
+
+    # Orchestrator
+
+    def _route(self, messages: Sequence[LLMMessage]) -> Union[str, List[FunctionCall]]:
+        last = next((message for message in reversed(messages)
+                     if not (isinstance(message, AssistantMessage) and isinstance(message.content, list))), None)
+        if last is None:
+            raise CascadeDecline("Empty context")
+        request = request_from_context(messages)
+
+        if isinstance(last, FunctionExecutionResultMessage):
+            if request is None:
+                raise CascadeDecline("Request details lookup failed")
+            next_agent = VERIFICATION_AGENT
+        elif isinstance(last, AssistantMessage):
+            raise CascadeDecline("No new message since the last routing decision")
+        else:
+            source, text = getattr(last, "source", None), _text(last)
+            if source == "user":
+                if request is not None:
+                    raise CascadeDecline("New user input after the request was retrieved")
+                request_id = text.strip()
+                if not re.fullmatch(r"[A-Za-z]+-\d+", request_id):
+                    raise CascadeDecline("User message is not a bare request ID")
+                return self._call("get_request_details", {"request_id": request_id})
+            if source in (VERIFICATION_AGENT, "Document_Processing_agent"):
+                next_agent = "Eligibility_Decision_agent"
+            elif source == "Eligibility_Decision_agent":
+                if "REQUEST_PROCESS_DOC" in text:
+                    next_agent = "Document_Processing_agent"
+                elif (match := DECISION_PATTERN.search(text)) and match.group(1) in ("APPROVED", "DECLINED"):
+                    next_agent = "Judge_agent"
+                else:
+                    raise CascadeDecline("Eligibility reply is neither a document request nor a final decision")
+            elif source == "Judge_agent":
+                next_agent = "User_Proxy_agent"
+            elif source == "User_Proxy_agent":
+                if not is_plain_approval(text):
+                    raise CascadeDecline("Operations user reply needs interpretation")
+                next_agent = EXECUTION_AGENT
+            elif source == EXECUTION_AGENT:
+                next_agent = "TERMINATE"
+            else:
+                raise CascadeDecline(f"No routing rule after {source}")
+            if request is None:
+                raise CascadeDecline("Request details are not in the context")
+
+        return routing_response(next_agent, request, verification_from_context(messages),
+                                f"last step by {getattr(last, 'source', 'tool')}")
+
+    # Customer verification
+
+    def _verify(self, messages: Sequence[LLMMessage]) -> Union[str, List[FunctionCall]]:
+        from runtime.deterministic_stages import classify_search_results, requestor_address
+        if isinstance(messages[-1], FunctionExecutionResultMessage):
+            search = _json_object(messages[-1].content[0].content) if messages[-1].content else None
+            request = request_from_context(messages) or {}
+            if search is None or "results" not in search:
+                raise CascadeDecline("customer_search result is not a search response")
+            return json.dumps(classify_search_results(search, (request.get("requestor") or {}).get("fullName", "")))
+        request = request_from_context(messages)
+        if request is None or not request.get("requestor"):
+            raise CascadeDecline("Requestor details are not in the context")
+        requestor = request["requestor"]
+        return self._call("customer_search", {"ssn": requestor.get("ssnLast4", ""),
+                                              "name": requestor.get("fullName", ""),
+                                              "address": requestor_address(requestor)})
+
+    # Benefit execution
+
+    def _execute(self, messages: Sequence[LLMMessage]) -> str:
+        decision = next((message for message in reversed(messages)
+                         if getattr(message, "source", None) == "Eligibility_Decision_agent"
+                         and DECISION_PATTERN.search(_text(message))), None)
+        if decision is None:
+            raise CascadeDecline("No eligibility decision in the context")
+        confirmation = next((message for message in reversed(messages)
+                             if getattr(message, "source", None) == "User_Proxy_agent"), None)
+        if confirmation is not None and not is_plain_approval(_text(confirmation)):
+            raise CascadeDecline("Operations user reply needs interpretation")
+        text = _text(decision)
+        outcome = DECISION_PATTERN.search(text).group(1)
+        benefit_match = BENEFIT_TYPE_PATTERN.search(text)
+        benefit_type = benefit_match.group(1).strip() if benefit_match else "the requested benefit"
+        basis_match = re.search(r"\*\*Eligibility Basis:\*\*\s*([^\n]+)", text)
+        basis = basis_match.group(1).strip() if basis_match else "the eligibility rules"
+        if outcome == "PENDING":
+            raise CascadeDecline("Eligibility decision is still pending")
+        return execution_response(outcome, (request_from_context(messages) or {}).get("requestId", ""), benefit_type, basis)
+
+
+class CascadeChatCompletionClient(ChatCompletionClient):
+    """Chat completion client that tries ``tiers`` in order and falls back to the agent's own client.
+
+    A tier's answer is accepted when it is a call to one of the offered tools
+    with arguments matching the tool's parameters, or text that parses as JSON
+    matching the agent's response schema and passes the agent's low-confidence
+    check (and, when the tier reports logprobs, ``MIN_TOKEN_PROBABILITY``).
+    Otherwise the call escalates; the last tier (the agent's client) is always
+    accepted.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[str, ChatCompletionClient]], agent_name: str,
+                 schema: Optional[Dict[str, Any]], stats: "CascadeStats"):
+        self.tiers = list(tiers)
+        self.agent_name = agent_name
+        self.schema = schema
+        self.stats = stats
+        self.strong = self.tiers[-1][1]
+
+    def _rejection(self, result: CreateResult, tools: Sequence[Any]) -> Optional[str]:
+        if isinstance(result.content, list):
+            schemas = _tool_schemas(tools)
+            for call in result.content:
+                if call.name not in schemas:
+                    return "invalid"
+                arguments = _json_object(call.arguments)
+                if arguments is None or validate_json_schema(arguments, schemas[call.name]):
+                    return "invalid"
+            return None
+        answer = _json_object(result.content) if self.schema is not None else None
+        if self.schema is not None and (answer is None or validate_json_schema(answer, self.schema)):
+            return "invalid"
+        check = LOW_CONFIDENCE_CHECKS.get(self.agent_name)
+        if answer is not None and check is not None and check(answer):
+            return "low_confidence"
+        if result.logprobs:
+            probability = math.exp(sum(entry.logprob for entry in result.logprobs) / len(result.logprobs))
+            if probability < MIN_TOKEN_PROBABILITY:
+                return "low_confidence"
+        return None
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        tools = kwargs.get("tools") or []
+        for tier_name, tier in self.tiers[:-1]:
+            try:
+                result = await tier.create(messages, **kwargs)
+            except CascadeDecline:
+                self.stats.escalated(self.agent_name, tier_name, "declined")
+                continue
+            except Exception:
+                self.stats.escalated(self.agent_name, tier_name, "error")
+                continue
+            reason = self._rejection(result, tools)
+            if reason is None:
+                self.stats.answered(self.agent_name, tier_name)
+                return result
+            self.stats.escalated(self.agent_name, tier_name, reason)
+        tier_name, tier = self.tiers[-1]
+        result = await tier.create(messages, **kwargs)
+        self.stats.answered(self.agent_name, tier_name)
+        return result
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        yield await self.create(messages, **kwargs)
+
+    async def close(self) -> None:
+        for _, tier in self.tiers:
+            await tier.close()
+
+    def actual_usage(self) -> RequestUsage:
+        usages = [tier.actual_usage() for _, tier in self.tiers]
+        return RequestUsage(prompt_tokens=sum(u.prompt_tokens for u in usages),
+                            completion_tokens=sum(u.completion_tokens for u in usages))
+
+    def total_usage(self) -> RequestUsage:
+        usages = [tier.total_usage() for _, tier in self.tiers]
+        return RequestUsage(prompt_tokens=sum(u.prompt_tokens for u in usages),
+                            completion_tokens=sum(u.completion_tokens for u in usages))
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.strong.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.strong.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.strong.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.strong.model_info
+
+
+class CascadeStats:
+    """Which tier answered each agent's calls, and why earlier tiers were passed over."""
+
+    def __init__(self):
+        self.answers: Dict[str, Counter] = defaultdict(Counter)
+        self.escalations: Dict[str, Counter] = defaultdict(Counter)
+
+    def answered(self, agent: str, tier: str):
+        self.answers[agent][tier] += 1
+
+    def escalated(self, agent: str, tier: str, reason: str):
+        self.escalations[agent][f"{tier}:{reason}"] += 1
+
+    def report(self, strong_tier: str = "model") -> Dict[str, Any]:
+        """Per agent: calls, the share escalated all the way to ``strong_tier``, and each tier's escalation rate."""
+        report = {}
+        for agent in sorted(self.answers):
+            calls = sum(self.answers[agent].values())
+            escalated_from = Counter()
+            for key, count in self.escalations[agent].items():
+                escalated_from[key.split(":")[0]] += count
+            report[agent] = {
+                "calls": calls,
+                "answered_by": dict(self.answers[agent]),
+                "escalations": dict(self.escalations[agent]),
+                "escalation_rate": round(self.answers[agent][strong_tier] / calls, 4),
+                "tier_escalation_rates": {
+                    tier: round(count / (count + self.answers[agent][tier]), 4)
+                    for tier, count in escalated_from.items()},
+            }
+        return report
+
+
+class StubTier(_OfflineTier):
+    """Offline stand-in for a model tier, answering from a reference function.
+
+    ``error_rate`` of the answers are corrupted the way a weaker model goes
+    wrong (a dropped required field, an out-of-enum value, empty tool
+    arguments), so the cascade's validation and escalation can be exercised
+    without API calls. Usage is estimated at four characters per token.
+    """
+
+    def __init__(self, answer: Callable[[Sequence[LLMMessage]], Union[str, List[FunctionCall]]],
+                 error_rate: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.answer = answer
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def _corrupt(self, content: Union[str, List[FunctionCall]]) -> Union[str, List[FunctionCall]]:
+        if isinstance(content, list):
+            return [FunctionCall(id=call.id, name=call.name, arguments="{}") for call in content]
+        answer = json.loads(content)
+        key = self._random.choice(sorted(answer))
+        if self._random.random() < 0.5:
+            del answer[key]
+        else:
+            answer[key] = "unknown"
+        return json.dumps(answer)
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        content = self.answer(messages)
+        if self._random.random() < self.error_rate:
+            content = self._corrupt(content)
+        completion = content if isinstance(content, str) else "".join(call.arguments for call in content)
+        return self._result(content, RequestUsage(prompt_tokens=self.count_tokens(messages),
+                                                  completion_tokens=len(completion) // 4))
+
+
+class ModelCascade:
+    """Cascade configuration shared by every team in the process.
+
+    ``tiers`` builds the cheaper tiers for an agent, given the agent's name and
+    its own model client (e.g. to copy its ``response_format``). By default the
+    only cheaper tier is ``DeterministicTier``; ``cheap_model`` adds an OpenAI
+    model with the agent's response format between it and the agent's model.
+    """
+
+    def __init__(self, agents: Sequence[str] = CASCADE_AGENTS, cheap_model: Optional[str] = None,
+                 tiers: Optional[Callable[[str, ChatCompletionClient],
+                                          List[Tuple[str, ChatCompletionClient]]]] = None):
+        self.agents = tuple(agents)
+        self.cheap_model = cheap_model
+        self._tiers = tiers or self._default_tiers
+        self.stats = CascadeStats()
+
+    def _default_tiers(self, agent_name: str, client: ChatCompletionClient) -> List[Tuple[str, ChatCompletionClient]]:
+        tiers: List[Tuple[str, ChatCompletionClient]] = [(DeterministicTier.name, DeterministicTier(agent_name))]
+        if self.cheap_model:
+            from autogen_ext.models.openai import OpenAIChatCompletionClient
+            response_format = _create_args(client).get("response_format")
+            tiers.append((self.cheap_model, OpenAIChatCompletionClient(
+                model=self.cheap_model, **({"response_format": response_format} if response_format else {}))))
+        return tiers
+
+    def wrap_client(self, client: ChatCompletionClient, agent_name: str) -> ChatCompletionClient:
+        return CascadeChatCompletionClient([*self._tiers(agent_name, client), ("model", client)], agent_name,
+                                           response_schema(client), self.stats)
+
+    def apply_to_agent(self, agent):
+        """Put the cascade in front of the agent's model client, for the agents it covers."""
+        if agent.name in self.agents and not isinstance(agent._model_client, CascadeChatCompletionClient):
+            agent._model_client = self.wrap_client(agent._model_client, agent.name)
+        return agent
+
+    def report(self) -> Dict[str, Any]:
+        return self.stats.report()
+
+
+# Operations user replies in the offline benchmark, with the route and outcome a strong model would read from them
+USER_REPLIES = [
+    ("Looks good, go ahead.", EXECUTION_AGENT, None),
+    ("Agreed.", EXECUTION_AGENT, None),
+    ("Yes, but double-check the effective date before activating.", EXECUTION_AGENT, None),
+    ("I disagree, the discharge papers are not in the file. Please decline instead.",
+     "Eligibility_Decision_agent", "DECLINED"),
+    ("Hold off until the service dates are confirmed with the branch.", "Eligibility_Decision_agent", "PENDING"),
+]
+
+
+def _scripted_calls(request: Dict[str, Any], decision: str, reply: str, reply_route: str,
+                    reply_outcome: Optional[str]) -> List[Tuple[str, List[LLMMessage], Any]]:
+    """The structured agents' model calls over one request's workflow, with the reference answer of each.
+
+    Contexts mirror the agents' own: the Orchestrator's head-and-tail window
+    (first message plus the last three) and the full history for the others.
+    """
+    from agents.customer_verification_agent import customer_search
+    from agents.orchestrator_agent import get_request_details
+    from runtime.deterministic_stages import classify_search_results, requestor_address
+
+    request_id, requestor = request["requestId"], request["requestor"]
+    benefit_type = request["requestDetails"]["benefitType"]
+    task = UserMessage(content=request_id, source="user")
+    lookup = [FunctionCall(id="call_lookup", name="get_request_details",
+                           arguments=json.dumps({"request_id": request_id}))]
+    search_arguments = {"ssn": requestor.get("ssnLast4", ""), "name": requestor.get("fullName", ""),
+                        "address": requestor_address(requestor)}
+    search = [FunctionCall(id="call_search", name="customer_search", arguments=json.dumps(search_arguments))]
+    search_result = customer_search(**search_arguments)
+    verification = classify_search_results(json.loads(search_result), requestor.get("fullName", ""))
+
+    calls = [(ORCHESTRATOR_AGENT, [task], lookup)]
+    history: List[LLMMessage] = [task, AssistantMessage(content=lookup, source=ORCHESTRATOR_AGENT),
+                                 FunctionExecutionResultMessage(content=[FunctionExecutionResult(
+                                     content=get_request_details(request_id), name="get_request_details",
+                                     call_id="call_lookup", is_error=False)])]
+    shared: List[LLMMessage] = [task]
+
+    def route(next_agent: str):
+        window = history[:1] + history[1:][-3:]
+        answer = routing_response(next_agent, request, verification if len(shared) > 2 else None, "scripted")
+        calls.append((ORCHESTRATOR_AGENT, window, answer))
+        history.append(AssistantMessage(content=answer, source=ORCHESTRATOR_AGENT))
+        shared.append(UserMessage(content=answer, source=ORCHESTRATOR_AGENT))
+
+    def speak(source: str, content: str):
+        history.append(UserMessage(content=content, source=source))
+        shared.append(UserMessage(content=content, source=source))
+
+    route(VERIFICATION_AGENT)
+    calls.append((VERIFICATION_AGENT, list(shared), search))
+    calls.append((VERIFICATION_AGENT, [*shared, AssistantMessage(content=search, source=VERIFICATION_AGENT),
+                                       FunctionExecutionResultMessage(content=[FunctionExecutionResult(
+                                           content=search_result, name="customer_search", call_id="call_search",
+                                           is_error=False)])],
+                  json.dumps(verification)))
+    speak(VERIFICATION_AGENT, json.dumps(verification))
+    route("Eligibility_Decision_agent")
+    if request.get("documents"):
+        speak("Eligibility_Decision_agent", "REQUEST_PROCESS_DOC: please extract the supporting documents.")
+        route("Document_Processing_agent")
+        speak("Document_Processing_agent", "Document processing complete. Extracted fields are attached.")
+        route("Eligibility_Decision_agent")
+    basis = "Decision from the eligibility rules for the benefit type"
+    speak("Eligibility_Decision_agent", f"**Decision:** {decision}\n\n**Benefit Type:** {benefit_type}\n\n"
+                                        f"**Eligibility Basis:** {basis}")
+    route("Judge_agent")
+    speak("Judge_agent", "The decision follows the workflow rules and is well supported.")
+    route("User_Proxy_agent")
+    speak("User_Proxy_agent", reply)
+    route(reply_route)
+    if reply_route != EXECUTION_AGENT:
+        return calls
+    outcome = reply_outcome or decision
+    answer = execution_response(outcome, request_id, benefit_type, basis) if outcome != "PENDING" else json.dumps({
+        "execution_type": "decline_notification", "status": "failure",
+        "customer_message": f"Your request {request_id} is still under review.",
+        "details": "No final eligibility decision to execute."})
+    calls.append((EXECUTION_AGENT, list(shared), answer))
+    speak(EXECUTION_AGENT, answer)
+    route("TERMINATE")
+    return calls
+
+
+async def benchmark(requests: Sequence[Dict[str, Any]], decisions: Sequence[str], user_reply_rate: float,
+                    cheap_error_rate: float, seed: int = 0) -> Dict[str, Any]:
+    """Replay scripted workflows through cascades built from stub tiers and report escalation rates.
+
+    The reference answers play the strong model; the cheap tier is a
+    ``StubTier`` over the same answers with ``cheap_error_rate`` of them
+    corrupted. Two cascades run side by side: deterministic first then the
+    agent's model, and deterministic, cheap, then the agent's model.
+
+    Only escalation rates are measured. The reference answers are built by
+    the same rules as the deterministic tier, so agreement with them says
+    nothing about agreement with a real model.
+    """
+    from autogen_core.tools import FunctionTool
+    from agents.customer_verification_agent import customer_search
+    from agents.orchestrator_agent import get_request_details
+
+    tools = {ORCHESTRATOR_AGENT: [FunctionTool(name="get_request_details", description="Request lookup",
+                                               func=get_request_details).schema],
+             VERIFICATION_AGENT: [FunctionTool(name="customer_search", description="Customer search",
+                                               func=customer_search).schema],
+             EXECUTION_AGENT: []}
+    from agents.benefit_execution_agent import create_benefit_execution_agent
+    from agents.customer_verification_agent import create_customer_verification_agent
+    from agents.orchestrator_agent import create_orchestrator_agent
+    schemas = {agent.name: response_schema(agent._model_client) for agent in (
+        create_orchestrator_agent(None), create_customer_verification_agent(None), create_benefit_execution_agent(None))}
+
+    rng = random.Random(seed)
+    reference: Dict[str, Any] = {}
+    strong = lambda messages: reference["answer"]
+    cascades = {
+        "deterministic": ModelCascade(tiers=lambda agent, client: [
+            (DeterministicTier.name, DeterministicTier(agent))]),
+        "deterministic+cheap": ModelCascade(tiers=lambda agent, client: [
+            (DeterministicTier.name, DeterministicTier(agent)),
+            # A seed per agent, or every agent's cheap tier draws the same corruption sequence
+            ("cheap", StubTier(strong, cheap_error_rate, seed + CASCADE_AGENTS.index(agent)))]),
+    }
+    clients = {(name, agent): CascadeChatCompletionClient(
+        [*cascade._tiers(agent, None), ("model", StubTier(strong))], agent, schemas[agent], cascade.stats)
+        for name, cascade in cascades.items() for agent in CASCADE_AGENTS}
+    for request, decision in zip(requests, decisions):
+        if rng.random() < user_reply_rate:
+            reply, reply_route, reply_outcome = rng.choice(USER_REPLIES)
+        else:
+            reply, reply_route, reply_outcome = AUTO_APPROVE_REPLY, EXECUTION_AGENT, None
+        for agent, messages, answer in _scripted_calls(request, decision, reply, reply_route, reply_outcome):
+            reference["answer"] = answer
+            for name in cascades:
+                await clients[(name, agent)].create(messages, tools=tools[agent])
+    return {name: cascade.report() for name, cascade in cascades.items()}
+
+
+def main():
+    """Offline escalation rates of the cascade over scripted workflows, with stub model tiers."""
+    parser = argparse.ArgumentParser(description="Benchmark the model cascade offline with stub tiers.")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--limit", type=int, default=500, help="Maximum number of population requests")
+    parser.add_argument("--user-reply-rate", type=float, default=0.2,
+                        help="Share of workflows where the operations user writes a free-text reply")
+    parser.add_argument("--cheap-error-rate", type=float, default=0.15,
+                        help="Share of the stub cheap tier's answers that fail validation")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-simulation")
+    if args.population:
+        os.environ["SCRA_POPULATION_DB"] = args.population
+        from simulation.synthetic_population import read_population
+        requests = list(itertools.islice(read_population(args.population, "request"), args.limit))
+    else:
+        from runtime.deterministic_stages import fetch_request
+        requests = [fetch_request(f"REQ-{i:03d}") for i in range(1, 6)]
+
+    from runtime.eligibility_prescore import DECISIONS, load_backlog, score_backlog
+    decisions = [DECISIONS[code] for code in score_backlog(load_backlog(requests, verify=True))[0]]
+    print(f"📊 {len(requests)} scripted workflows, {args.user_reply_rate:.0%} free-text user replies, "
+          f"cheap tier error rate {args.cheap_error_rate:.0%}")
+    results = asyncio.run(benchmark(requests, decisions, args.user_reply_rate, args.cheap_error_rate))
+    for name, result in results.items():
+        print(f"\n📈 {name}")
+        for agent, stats in result.items():
+            tiers = ", ".join(f"{tier} {rate:.1%}" for tier, rate in stats["tier_escalation_rates"].items())
+            print(f"   {agent:<28} {stats['calls']:>6} calls, {stats['escalation_rate']:.1%} escalated to the model "
+                  f"(per tier: {tiers or 'none'})")
+            print(f"      answered by {stats['answered_by']}, escalations {stats['escalations']}")
+    print("\n⚠️  Escalation rates only: the scripted reference answers follow the same rules as the "
+          "deterministic tier, so answer quality needs recorded model outputs to measure")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Model Call Scheduler for the Benefit Orchestrator System.
+Shares requests-per-minute and tokens-per-minute budgets across every model client in the process, with priorities and 429 back-off.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from typing import Dict, Any, AsyncGenerator, List, Optional, Sequence, Union
+
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelInfo, RequestUsage
+
+
+# Lower values are dispatched first
+PRIORITY_FINISH = 0
+PRIORITY_NORMAL = 1
+
+# Agents whose calls complete an in-flight request rather than start a new one
+FINISHING_AGENTS = ("Judge_agent", "Benefit_Execution_agent")
+
+# Retry-After assumed when a 429 response does not carry one
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+# Jittered exponential back-off for transient errors, as in the OpenAI SDK's own retries
+TRANSIENT_BACKOFF_BASE = 0.5
+TRANSIENT_BACKOFF_CAP = 8.0
+
+
+class TokenBucket:
+    """A per-minute budget that refills continuously.
+
+    The level may go negative when a call uses more than it reserved; the
+    debt is repaid by the refill before the next call is admitted.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 60.0):
+        self.capacity = per_minute * burst_seconds / 60.0
+        self.level = self.capacity
+        self._refill_per_second = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._refill_per_second)
+        self._updated = now
+
+    def wait_seconds(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be taken now)."""
+        self._refill()
+        # A call larger than the whole budget is admitted once the bucket is full
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self._refill_per_second)
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount: float):
+        """Return unused reservation (positive) or charge extra usage (negative)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reported a rate limit."""
+        self._refill()
+        self.level = min(self.level, 0.0)
+
+
+class ModelCallScheduler:
+    """Process-wide admission control for model calls.
+
+    Calls wait in a priority queue and are admitted in priority order, then
+    arrival order, once the request and token budgets allow it and fewer than
+    ``concurrency_limit`` calls are in flight. A 429 response halves the
+    concurrency limit, drains the token budget and pauses admission for the
+    provider's Retry-After; the limit then grows back by one after each run of
+    ``concurrency_limit`` successful calls (additive increase, multiplicative
+    decrease). ``burst_seconds`` caps how much of the per-minute budget can be
+    spent at once, since providers also enforce limits over sub-minute windows.
+    """
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 200_000,
+                 max_concurrency: int = 32, burst_seconds: float = 10.0):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = max_concurrency
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._successes = 0
+        self._queue: List[Any] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"admitted": 0, "rate_limited": 0, "transient_retries": 0, "queued_seconds": {},
+                      "admitted_by_priority": {}}
+
+    async def acquire(self, estimated_tokens: int, priority: int = PRIORITY_NORMAL) -> float:
+        """Wait until a call may be sent.
+
+        Returns:
+            float: Seconds the call spent queued
+        """
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        future = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), estimated_tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller was cancelled; give the slot back
+                self.release(estimated_tokens, None)
+            raise
+        waited = time.monotonic() - queued_at
+        self.stats["queued_seconds"][priority] = self.stats["queued_seconds"].get(priority, 0.0) + waited
+        self.stats["admitted_by_priority"][priority] = self.stats["admitted_by_priority"].get(priority, 0) + 1
+        return waited
+
+    def release(self, reserved_tokens: int, used_tokens: Optional[int], rate_limited: bool = False,
+                retry_after: Optional[float] = None):
+        """Finish a call, reconciling its token reservation with actual usage.
+
+        Args:
+            reserved_tokens (int): Tokens reserved by ``acquire``
+            used_tokens (Optional[int]): Tokens the call actually used, or None if unknown
+            rate_limited (bool): Whether the provider answered with a 429
+            retry_after (Optional[float]): Provider-requested pause in seconds
+        """
+        self.in_flight -= 1
+        if rate_limited:
+            self.stats["rate_limited"] += 1
+            self.concurrency_limit = max(1, self.concurrency_limit // 2)
+            self._successes = 0
+            self.tokens.drain()
+            pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER_SECONDS
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        else:
+            if used_tokens is not None:
+                self.tokens.adjust(reserved_tokens - used_tokens)
+            self._successes += 1
+            if self._successes >= self.concurrency_limit and self.concurrency_limit < self.max_concurrency:
+                self.concurrency_limit += 1
+                self._successes = 0
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while the budgets allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            priority, _, estimated_tokens, future = self._queue[0]
+            if future.done():
+                # The waiter was cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= self.concurrency_limit:
+                return
+
+            # The head of the queue blocks later calls so large high-priority calls are not starved
+            wait = max(self._paused_until - time.monotonic(),
+                       self.requests.wait_seconds(1),
+                       self.tokens.wait_seconds(estimated_tokens))
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            future.set_result(None)
+
+    def report(self) -> Dict[str, Any]:
+        """Snapshot of admission counters and the current adaptive limit."""
+        return {
+            "admitted": self.stats["admitted"],
+            "rate_limited": self.stats["rate_limited"],
+            "transient_retries": self.stats["transient_retries"],
+            "queued": len(self._queue),
+            "in_flight": self.in_flight,
+            "concurrency_limit": self.concurrency_limit,
+            "mean_queued_seconds_by_priority": {
+                priority: round(seconds / self.stats["admitted_by_priority"][priority], 3)
+                for priority, seconds in self.stats["queued_seconds"].items()
+            },
+        }
+
+
+def disable_sdk_retries(client: ChatCompletionClient):
+    """Turn off the OpenAI SDK's built-in retries so a wrapper can own retry policy.
+
+    A scheduled client keeps retrying 429s through the shared back-off, but
+    leaves transient errors to the wrapper.
+    """
+    if isinstance(client, ScheduledChatCompletionClient):
+        client.max_transient_retries = 0
+        return
+    sdk_client = getattr(client, "_client", None)
+    if sdk_client is not None and hasattr(sdk_client, "with_options"):
+        client._client = sdk_client.with_options(max_retries=0)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(header) if header is not None else None
+    except ValueError:
+        return None
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed model call is worth retrying: timeouts, connection errors, 408, 409 and 5xx responses."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status >= 500 or status in (408, 409)
+    # openai.APIConnectionError and APITimeoutError carry no status code
+    return any(cls.__name__ in ("APIConnectionError", "APITimeoutError") for cls in type(error).__mro__)
+
+
+class ScheduledChatCompletionClient(ChatCompletionClient):
+    """Chat completion client that admits every call through a shared ``ModelCallScheduler``.
+
+    Rate-limited calls are retried here, after the scheduler's back-off, instead
+    of inside the OpenAI SDK, so every client in the process slows down together.
+    The SDK's retries of transient errors are replaced here too, with jittered
+    back-off, unless a wrapper such as the tail-latency controls owns them. A
+    streamed call is only retried before its first chunk reaches the caller.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, scheduler: ModelCallScheduler,
+                 priority: int = PRIORITY_NORMAL, completion_token_estimate: int = 800,
+                 max_rate_limit_retries: int = 6, max_transient_retries: int = 2):
+        self.inner = inner
+        self.scheduler = scheduler
+        self.priority = priority
+        self.completion_token_estimate = completion_token_estimate
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_transient_retries = max_transient_retries
+        # The SDK's own 429 retries would bypass the shared back-off
+        disable_sdk_retries(inner)
+
+    def estimate_tokens(self, messages: Sequence[LLMMessage], extra_create_args: Dict[str, Any]) -> int:
+        """Cheap token reservation: ~4 characters per prompt token plus the completion allowance."""
+        prompt_characters = sum(len(str(message.content)) for message in messages)
+        completion = extra_create_args.get("max_tokens") or self.completion_token_estimate
+        return prompt_characters // 4 + completion
+
+    def _retry_delay(self, error: Exception, retries: Counter) -> Optional[float]:
+        """Seconds to wait before retrying a failed call, or None if it should be raised."""
+        if _is_rate_limit(error):
+            retries["rate_limited"] += 1
+            # The scheduler already pauses admission for the Retry-After
+            return 0.0 if retries["rate_limited"] <= self.max_rate_limit_retries else None
+        if is_transient(error) and retries["transient"] < self.max_transient_retries:
+            backoff = random.uniform(0, min(TRANSIENT_BACKOFF_CAP, TRANSIENT_BACKOFF_BASE * 2 ** retries["transient"]))
+            retries["transient"] += 1
+            self.scheduler.stats["transient_retries"] += 1
+            return backoff
+        return None
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        estimated = self.estimate_tokens(messages, kwargs.get("extra_create_args") or {})
+        retries: Counter = Counter()
+        while True:
+            await self.scheduler.acquire(estimated, self.priority)
+            try:
+                result = await self.inner.create(messages, **kwargs)
+            except Exception as error:
+                self.scheduler.release(estimated, None, rate_limited=_is_rate_limit(error),
+                                       retry_after=_retry_after_seconds(error))
+                delay = self._retry_delay(error, retries)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.scheduler.release(estimated, None)
+                raise
+            used = result.usage.prompt_tokens + result.usage.completion_tokens
+            self.scheduler.release(estimated, used)
+            return result
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        estimated = self.estimate_tokens(messages, kwargs.get("extra_create_args") or {})
+        retries: Counter = Counter()
+        while True:
+            await self.scheduler.acquire(estimated, self.priority)
+            used, streamed = None, False
+            try:
+                async for chunk in self.inner.create_stream(messages, **kwargs):
+                    if isinstance(chunk, CreateResult):
+                        used = chunk.usage.prompt_tokens + chunk.usage.completion_tokens
+                    streamed = True
+                    yield chunk
+            except Exception as error:
+                self.scheduler.release(estimated, None, rate_limited=_is_rate_limit(error),
+                                       retry_after=_retry_after_seconds(error))
+                # Once chunks have reached the caller, a retry would repeat them
+                delay = None if streamed else self._retry_delay(error, retries)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.scheduler.release(estimated, None)
+                raise
+            self.scheduler.release(estimated, used)
+            return
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.inner.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.inner.model_info
+
+
+def schedule_agent(agent: Any, scheduler: ModelCallScheduler):
+    """Route an agent's model calls through the scheduler, prioritizing agents that finish requests."""
+    model_client = getattr(agent, "_model_client", None)
+    if model_client is None or isinstance(model_client, ScheduledChatCompletionClient):
+        return
+    priority = PRIORITY_FINISH if agent.name in FINISHING_AGENTS else PRIORITY_NORMAL
+    agent._model_client = ScheduledChatCompletionClient(model_client, scheduler, priority=priority)
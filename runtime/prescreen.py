@@ -0,0 +1,201 @@
+"""
+Deterministic Pre-screen for the Benefit Orchestrator System.
+Declines unverified customers and requests missing required documents without any model calls.
+"""
+
+import argparse
+import itertools
+import json
+import os
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+from autogen_agentchat.messages import TextMessage
+
+from agents.eligibility_decision_agent import REQUIRED_DOCUMENTS
+from runtime.deterministic_stages import fetch_request, verify_requestor, verify_requestors
+
+
+# Standard decline from the Eligibility Decision Agent's "customer verification failure" format
+VERIFICATION_DECLINE_TEMPLATE = """## ELIGIBILITY DECISION
+
+**Decision:** DECLINED
+
+**Benefit Type:** {benefit_type}
+
+**Eligibility Basis:** Customer verification failed - customer not found in system
+
+**Justification:** Cannot proceed with eligibility assessment because the customer could not be verified in our system (verification result: {verification_result}). Customer verification is a prerequisite for all benefit applications.
+
+**Conditions:** Customer must be verified before eligibility can be assessed
+
+**Effective Period:** N/A
+
+**Appeal Rights:** Customer may appeal by providing additional identification information
+
+**Missing Information:** Customer verification required"""
+
+MISSING_DOCUMENTS_DECLINE_TEMPLATE = """## ELIGIBILITY DECISION
+
+**Decision:** DECLINED
+
+**Benefit Type:** {benefit_type}
+
+**Eligibility Basis:** Required documentation not provided
+
+**Justification:** {benefit_type} requires {missing}, which {verb} not among the submitted documents ({submitted}). Eligibility cannot be established without the required documentation.
+
+**Conditions:** N/A
+
+**Effective Period:** N/A
+
+**Appeal Rights:** Decision may be appealed within 30 days by submitting the missing documentation
+
+**Missing Information:** {missing}"""
+
+
+def missing_required_documents(request: Dict[str, Any]) -> List[str]:
+    """List required document groups absent from a request, judged by document type only."""
+    benefit_type = request["requestDetails"]["benefitType"]
+    submitted = {document["documentType"] for document in request.get("documents", [])}
+    return [" or ".join(group) for group in REQUIRED_DOCUMENTS.get(benefit_type, [])
+            if not submitted.intersection(group)]
+
+
+def _execution_response(request: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    benefit_type = request["requestDetails"]["benefitType"]
+    return {
+        "execution_type": "decline_notification",
+        "status": "success",
+        "customer_message": (f"Your request for {benefit_type} ({request['requestId']}) has been declined: {reason}. "
+                             "You may appeal within 30 days or reapply with the required information."),
+        "details": f"Declined by deterministic pre-screen: {reason}",
+    }
+
+
+def prescreen_request(request_id: str, request: Optional[Dict[str, Any]] = None,
+                      verification: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Decide whether a request can be declined without running the agents.
+
+    Args:
+        request_id (str): Request to screen
+        request (Optional[Dict[str, Any]]): The request record, if already fetched
+        verification (Optional[Dict[str, Any]]): The requestor's verification, if already
+            computed (e.g. by ``verify_requestors``)
+
+    Returns:
+        Dict[str, Any]: ``outcome`` is "declined_unverified", "declined_missing_documents",
+        "request_not_found" or "requires_agents"; declines also carry ``decision_text``
+        and ``execution_response``
+    """
+    request = request or fetch_request(request_id)
+    if request is None:
+        return {"request_id": request_id, "outcome": "request_not_found"}
+
+    benefit_type = request["requestDetails"]["benefitType"]
+    result = {"request_id": request["requestId"], "benefit_type": benefit_type}
+
+    verification = verification or verify_requestor(request["requestor"])
+    result["verification"] = verification
+    if verification["verification_result"] in ("not_found", "ambiguous"):
+        result.update({
+            "outcome": "declined_unverified",
+            "decision_text": VERIFICATION_DECLINE_TEMPLATE.format(
+                benefit_type=benefit_type, verification_result=verification["verification_result"]),
+            "execution_response": _execution_response(request, "customer identity could not be verified"),
+        })
+        return result
+
+    missing = missing_required_documents(request)
+    if missing:
+        submitted = ", ".join(document["documentType"] for document in request.get("documents", [])) or "none"
+        result.update({
+            "outcome": "declined_missing_documents",
+            "missing_documents": missing,
+            "decision_text": MISSING_DOCUMENTS_DECLINE_TEMPLATE.format(
+                benefit_type=benefit_type, missing="; ".join(missing),
+                verb="is" if len(missing) == 1 else "are", submitted=submitted),
+            "execution_response": _execution_response(request, "required documents were not provided"),
+        })
+        return result
+
+    result["outcome"] = "requires_agents"
+    return result
+
+
+def prescreen_transcript(screen: Dict[str, Any]) -> List[TextMessage]:
+    """Messages equivalent to the short-circuited workflow, for transcript-based reporting."""
+    return [
+        TextMessage(source="user", content=screen["request_id"]),
+        TextMessage(source="Customer_Verification_agent", content=json.dumps(screen["verification"])),
+        TextMessage(source="Eligibility_Decision_agent", content=screen["decision_text"]),
+        TextMessage(source="Benefit_Execution_agent", content=json.dumps(screen["execution_response"])),
+    ]
+
+
+class PrescreenStats:
+    """Counts pre-screen outcomes to report the share of traffic handled without model calls."""
+
+    def __init__(self):
+        self.outcomes = Counter()
+
+    def record(self, screen: Dict[str, Any]):
+        self.outcomes[screen["outcome"]] += 1
+
+    def report(self) -> Dict[str, Any]:
+        total = sum(self.outcomes.values())
+        handled = self.outcomes["declined_unverified"] + self.outcomes["declined_missing_documents"]
+        return {
+            "screened": total,
+            "short_circuited": handled,
+            "short_circuit_rate": handled / total if total else None,
+            "outcomes": dict(self.outcomes),
+        }
+
+
+def prescreen_many(request_ids: Iterable[str], stats: Optional[PrescreenStats] = None,
+                   batch_size: int = 1000) -> PrescreenStats:
+    """Pre-screen requests and return the outcome counts.
+
+    Requestors are verified ``batch_size`` at a time with one bulk customer search
+    per batch, before any request would reach the agents.
+    """
+    stats = stats or PrescreenStats()
+    request_ids = iter(request_ids)
+    while True:
+        batch = list(itertools.islice(request_ids, batch_size))
+        if not batch:
+            return stats
+        requests = [(request_id, fetch_request(request_id)) for request_id in batch]
+        found = [request for _, request in requests if request is not None]
+        verifications = iter(verify_requestors([request["requestor"] for request in found]))
+        for request_id, request in requests:
+            if request is None:
+                stats.record(prescreen_request(request_id))
+            else:
+                stats.record(prescreen_request(request_id, request, next(verifications)))
+
+
+def main():
+    """Report what fraction of requests the pre-screen would handle without model calls."""
+    parser = argparse.ArgumentParser(description="Deterministic pre-screen of benefit requests.")
+    parser.add_argument("request_ids", nargs="*", help="Request IDs (defaults to REQ-001 to REQ-005)")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database to screen")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of population requests")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Requestors verified per bulk search")
+    args = parser.parse_args()
+
+    request_ids: Iterable[str] = args.request_ids or [f"REQ-{i:03d}" for i in range(1, 6)]
+    if args.population:
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+        if not args.request_ids:
+            from simulation.synthetic_population import read_population
+            request_ids = (record["requestId"] for record in
+                           itertools.islice(read_population(args.population, "request"), args.limit))
+
+    stats = prescreen_many(request_ids, batch_size=args.batch_size)
+    print(f"📊 Pre-screen report: {json.dumps(stats.report(), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
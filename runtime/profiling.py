@@ -0,0 +1,381 @@
+"""
+Profiling Hooks for the Benefit Orchestrator System.
+Opt-in deterministic CPU profiles of tool invocations and agent turns, collected per request ID.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+
+from autogen_agentchat.base import Response
+
+
+_CURRENT_REQUEST: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("profiled_request", default=None)
+
+# Label for work done outside any request scope
+UNSCOPED_REQUEST = "unscoped"
+
+# Flame-graph stacks deeper than this are truncated
+MAX_STACK_DEPTH = 64
+
+# From Python 3.12 cProfile runs on sys.monitoring, which allows one active profiler per interpreter
+_EXCLUSIVE_PROFILING = sys.version_info >= (3, 12)
+_ACTIVE_PROFILER = threading.Lock()
+
+
+@contextlib.contextmanager
+def _profiling(profile: cProfile.Profile) -> Iterator[bool]:
+    """Enable ``profile`` for the block; yields False, leaving it disabled, if another profiler is active.
+
+    Never waits for the other profiler, so overlapping tool calls and turns run
+    on unprofiled rather than queueing behind each other.
+    """
+    if _EXCLUSIVE_PROFILING and not _ACTIVE_PROFILER.acquire(blocking=False):
+        yield False
+        return
+    try:
+        try:
+            profile.enable()
+            enabled = True
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) holds the interpreter's profiler
+            enabled = False
+        try:
+            yield enabled
+        finally:
+            if enabled:
+                profile.disable()
+    finally:
+        if _EXCLUSIVE_PROFILING:
+            _ACTIVE_PROFILER.release()
+
+
+class _ProfiledAwaitable:
+    """Drives an awaitable with a profiler enabled only while it is executing.
+
+    Other tasks that run while the awaitable is suspended are not recorded,
+    so concurrent requests on one event loop do not pollute each other's profile.
+    Steps that run while another profiler is active are run unprofiled and
+    flagged in ``skipped``.
+    """
+
+    def __init__(self, awaitable, profile: cProfile.Profile):
+        self._awaitable = awaitable
+        self._profile = profile
+        self.skipped = False
+
+    def __await__(self):
+        iterator = self._awaitable.__await__()
+        value, error = None, None
+        while True:
+            with _profiling(self._profile) as enabled:
+                self.skipped |= not enabled
+                try:
+                    yielded = iterator.throw(error) if error is not None else iterator.send(value)
+                except StopIteration as stop:
+                    return stop.value
+            try:
+                value, error = (yield yielded), None
+            except BaseException as raised:
+                value, error = None, raised
+
+
+def _merged(*stats: pstats.Stats) -> pstats.Stats:
+    """A new Stats holding the sum of ``stats`` (Stats cannot be constructed from another Stats)."""
+    merged = pstats.Stats()
+    if stats:
+        merged.add(*stats)
+    return merged
+
+
+def _label(function: Tuple[str, int, str]) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def folded_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """Collapsed ``frame;frame;frame`` stacks with self time in microseconds, for flame-graph tools.
+
+    cProfile records caller/callee edges rather than whole stacks, so each
+    function's time is split across its callers in proportion to the time
+    each edge accounts for (the same approximation flameprof uses).
+    """
+    entries = stats.stats
+    callees: Dict[Any, List[Tuple[Any, float]]] = defaultdict(list)
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            callees[caller].append((function, edge_cumulative))
+
+    folded: Dict[str, int] = defaultdict(int)
+
+    def walk(function, path: List[str], seen: set, inclusive: float):
+        _, _, self_time, cumulative, _ = entries[function]
+        fraction = min(1.0, inclusive / cumulative) if cumulative else 0.0
+        path = path + [_label(function)]
+        micros = int(self_time * fraction * 1_000_000)
+        if micros:
+            folded[";".join(path)] += micros
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_cumulative in callees.get(function, ()):
+            if callee not in seen and edge_cumulative * fraction > 0:
+                walk(callee, path, seen | {callee}, edge_cumulative * fraction)
+
+    for function, (_, _, _, cumulative, callers) in entries.items():
+        if not callers:
+            walk(function, [], {function}, cumulative)
+    return dict(folded)
+
+
+class RequestProfiler:
+    """Collects cProfile data for tool calls and agent turns, grouped by request ID.
+
+    Profiling is opt-in: nothing is wrapped unless ``apply_to_agent`` is called,
+    so a team built without a profiler runs unchanged. Each finished request
+    scope writes ``<request_id>.prof`` (loadable with ``pstats`` or snakeviz);
+    ``write_reports`` adds the aggregate profile, collapsed flame-graph stacks
+    and a top-N hotspot report. From Python 3.12 only one profiler can be
+    active per interpreter, so tool calls and turn steps that overlap another
+    profiled section run unprofiled; the report counts them per tool and agent.
+    """
+
+    def __init__(self, output_dir: str, top: int = 25):
+        self.output_dir = output_dir
+        self.top = top
+        self._lock = threading.Lock()
+        self._pending: Dict[str, pstats.Stats] = {}
+        self._aggregate: Optional[pstats.Stats] = None
+        self._timings: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0])
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def request(self, request_id: str) -> Iterator[None]:
+        """Attribute tool calls and agent turns started in this scope to ``request_id``."""
+        token = _CURRENT_REQUEST.set(request_id)
+        try:
+            yield
+        finally:
+            _CURRENT_REQUEST.reset(token)
+            self._finish(request_id)
+
+    def _record(self, kind: str, name: str, profile: cProfile.Profile, seconds: float,
+                request_id: Optional[str] = None, skipped: bool = False):
+        request_id = request_id or _CURRENT_REQUEST.get() or UNSCOPED_REQUEST
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:
+            # Nothing was recorded (e.g. the call failed before running any code)
+            stats = None
+        with self._lock:
+            timing = self._timings[(kind, name)]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] += skipped
+            if stats is None:
+                return
+            if request_id in self._pending:
+                self._pending[request_id].add(stats)
+            else:
+                self._pending[request_id] = stats
+
+    def _finish(self, request_id: str):
+        with self._lock:
+            stats = self._pending.pop(request_id, None)
+            if stats is None:
+                return
+            if self._aggregate is None:
+                self._aggregate = _merged()
+            self._aggregate.add(stats)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", request_id)
+        stats.dump_stats(os.path.join(self.output_dir, f"{safe_name}.prof"))
+
+    def wrap_tool(self, tool):
+        """Profile a ``FunctionTool``'s function in the thread it runs in."""
+        function = getattr(tool, "_func", None)
+        if function is None or asyncio.iscoroutinefunction(function) or getattr(tool, "_has_cancellation_support",
+                                                                                   False):
+            return tool
+        if getattr(tool, "_profiled", False):
+            return tool
+
+        def profiled_call(**kwargs):
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            enabled = False
+            try:
+                with _profiling(profile) as enabled:
+                    return function(**kwargs)
+            finally:
+                self._record("tool", tool.name, profile, time.perf_counter() - started, skipped=not enabled)
+
+        async def run(args, cancellation_token):
+            kwargs = {name: getattr(args, name) for name in tool._signature.parameters if hasattr(args, name)}
+            # Unlike FunctionTool.run, carry the request scope into the executor thread
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(context.run, profiled_call, **kwargs))
+            cancellation_token.link_future(future)
+            return await future
+
+        tool.run = run
+        tool._profiled = True
+        return tool
+
+    def apply_to_agent(self, agent):
+        """Profile the agent's turns and its tool invocations."""
+        for workbench in getattr(agent, "_workbench", None) or []:
+            for tool in getattr(workbench, "_tools", []):
+                self.wrap_tool(tool)
+        if getattr(agent, "_profiled", False):
+            return agent
+        on_messages_stream = agent.on_messages_stream
+
+        async def profiled_stream(messages, cancellation_token) -> AsyncGenerator[Any, None]:
+            profile = cProfile.Profile()
+            request_id = _CURRENT_REQUEST.get()
+            started = time.perf_counter()
+            recorded = skipped = False
+            stream = on_messages_stream(messages, cancellation_token)
+            try:
+                while True:
+                    step = _ProfiledAwaitable(stream.__anext__(), profile)
+                    try:
+                        item = await step
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        skipped |= step.skipped
+                    if isinstance(item, Response):
+                        # on_messages stops consuming at the Response, leaving this generator to be closed later
+                        self._record("turn", agent.name, profile, time.perf_counter() - started, request_id, skipped)
+                        recorded = True
+                    yield item
+            finally:
+                await stream.aclose()
+                if not recorded:
+                    self._record("turn", agent.name, profile, time.perf_counter() - started, request_id, skipped)
+
+        agent.on_messages_stream = profiled_stream
+        agent._profiled = True
+        return agent
+
+    def hotspot_report(self) -> str:
+        """Top-N functions by self and cumulative time, plus wall time per tool and agent turn."""
+        lines = ["Calls and wall time", ""]
+        with self._lock:
+            timings = sorted(self._timings.items(), key=lambda item: -item[1][1])
+            aggregate = _merged(self._aggregate) if self._aggregate is not None else None
+        for (kind, name), (calls, seconds, skipped) in timings:
+            lines.append(f"  {kind:<5} {name:<32} {calls:>7} calls {seconds * 1000 / calls:>10.2f} ms mean"
+                         + (f" ({skipped} not or partly profiled: another profiler was active)" if skipped else ""))
+        if aggregate is not None:
+            for sort_key, title in (("tottime", "self time"), ("cumulative", "cumulative time")):
+                buffer = io.StringIO()
+                aggregate.stream = buffer
+                aggregate.sort_stats(sort_key).print_stats(self.top)
+                lines += ["", f"Top {self.top} functions by {title}", buffer.getvalue()]
+        return "\n".join(lines)
+
+    def write_reports(self) -> Dict[str, str]:
+        """Write the aggregate profile, collapsed stacks and hotspot report; returns their paths."""
+        paths = {
+            "profile": os.path.join(self.output_dir, "aggregate.prof"),
+            "folded": os.path.join(self.output_dir, "aggregate.folded"),
+            "hotspots": os.path.join(self.output_dir, "hotspots.txt"),
+        }
+        with self._lock:
+            aggregate = _merged(self._aggregate) if self._aggregate is not None else None
+        if aggregate is not None:
+            aggregate.dump_stats(paths["profile"])
+            with open(paths["folded"], "w", encoding="utf-8") as f:
+                for stack, micros in sorted(folded_stacks(aggregate).items()):
+                    f.write(f"{stack} {micros}\n")
+        with open(paths["hotspots"], "w", encoding="utf-8") as f:
+            f.write(self.hotspot_report())
+        return paths
+
+
+async def _run_tools(agents, request_ids: List[str], profiler: Optional[RequestProfiler]) -> float:
+    """Call the verification and document tools for each request, as the agents would."""
+    from runtime.deterministic_stages import fetch_request, requestor_address
+    from autogen_core import CancellationToken
+
+    tools = {tool.name: tool for agent in agents for workbench in agent._workbench for tool in workbench._tools}
+    started = time.perf_counter()
+    for request_id in request_ids:
+        request = fetch_request(request_id)
+        if request is None:
+            continue
+        scope = profiler.request(request_id) if profiler else contextlib.nullcontext()
+        with scope:
+            requestor = request["requestor"]
+            await tools["customer_search"].run_json(
+                {"ssn": requestor.get("ssnLast4", ""), "name": requestor.get("fullName", ""),
+                 "address": requestor_address(requestor)}, CancellationToken())
+            for document in request.get("documents", []):
+                await tools["get_document"].run_json(
+                    {"request_id": request_id, "document_id": document["documentId"]}, CancellationToken())
+    return time.perf_counter() - started
+
+
+def main():
+    """Profile the verification and document tools over a set of requests and write the reports."""
+    parser = argparse.ArgumentParser(description="Profile tool calls per request and write hotspot reports.")
+    parser.add_argument("request_ids", nargs="*", help="Request IDs (defaults to REQ-001 to REQ-005)")
+    parser.add_argument("--output", default="profiles", help="Directory for .prof, folded stacks and hotspots")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--limit", type=int, default=200, help="Population requests to profile")
+    parser.add_argument("--top", type=int, default=25, help="Functions per hotspot table")
+    args = parser.parse_args()
+
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+    from agents.customer_verification_agent import create_customer_verification_agent
+    from agents.document_processing_agent import create_document_processing_agent
+
+    request_ids = args.request_ids or [f"REQ-{i:03d}" for i in range(1, 6)]
+    if args.population:
+        import itertools
+        from simulation.synthetic_population import read_population
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+        if not args.request_ids:
+            request_ids = [record["requestId"] for record in
+                           itertools.islice(read_population(args.population, "request"), args.limit)]
+
+    os.environ.setdefault("OPENAI_API_KEY", "dummy-key-for-profiling")
+    model_client = OpenAIChatCompletionClient(model="gpt-4o-mini")
+
+    def build_agents():
+        return [create_customer_verification_agent(model_client), create_document_processing_agent(model_client)]
+
+    # Warm the per-process caches so both passes do the same work
+    asyncio.run(_run_tools(build_agents(), request_ids, None))
+    baseline = asyncio.run(_run_tools(build_agents(), request_ids, None))
+
+    profiler = RequestProfiler(args.output, top=args.top)
+    agents = build_agents()
+    for agent in agents:
+        profiler.apply_to_agent(agent)
+    profiled = asyncio.run(_run_tools(agents, request_ids, profiler))
+    paths = profiler.write_reports()
+
+    print(f"📊 {len(request_ids)} requests: {baseline:.2f}s unprofiled, {profiled:.2f}s profiled")
+    for kind, path in paths.items():
+        print(f"   {kind}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Rate-Limited Model Stub for the Benefit Orchestrator System.
+Serves OpenAI-compatible chat completions with request and token limits, and benchmarks the model call scheduler against it.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Optional
+
+from runtime.model_scheduler import (ModelCallScheduler, ScheduledChatCompletionClient,
+                                     PRIORITY_FINISH, PRIORITY_NORMAL)
+
+
+class RateLimitedStub:
+    """Local chat completions endpoint that answers 429 once a sliding window's budget is spent.
+
+    Limits are expressed per minute but enforced over ``window_seconds``, the way
+    providers quantize them, so a burst that fits the minute can still be refused.
+    Every completion answers "OK" unless ``reply`` maps the request body to another answer.
+    """
+
+    def __init__(self, requests_per_minute: int = 600, tokens_per_minute: int = 200_000,
+                 window_seconds: float = 1.0, latency_seconds: float = 0.05, completion_tokens: int = 50,
+                 host: str = "127.0.0.1", port: int = 0, reply: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.request_limit = requests_per_minute * window_seconds / 60.0
+        self.token_limit = tokens_per_minute * window_seconds / 60.0
+        self.window_seconds = window_seconds
+        self.latency_seconds = latency_seconds
+        self.completion_tokens = completion_tokens
+        self.reply = reply
+        self.counts = collections.Counter()
+        self._window = collections.deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def admit(self, tokens: int) -> Optional[float]:
+        """Record a call if the window has room; otherwise return the Retry-After in seconds."""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and self._window[0][0] <= now - self.window_seconds:
+                self._window.popleft()
+            used_tokens = sum(entry[1] for entry in self._window)
+            if len(self._window) + 1 > self.request_limit or used_tokens + tokens > self.token_limit:
+                self.counts["rate_limited"] += 1
+                oldest = self._window[0][0] if self._window else now
+                return max(0.05, oldest + self.window_seconds - now)
+            self._window.append((now, tokens))
+            self.counts["completed"] += 1
+            return None
+
+    def completion(self, body: Dict[str, Any], prompt_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-stub-{self.counts['completed']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop", "logprobs": None,
+                         "message": {"role": "assistant",
+                                     "content": self.reply(body) if self.reply else "OK"}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": self.completion_tokens,
+                      "total_tokens": prompt_tokens + self.completion_tokens},
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                body = json.loads(raw or b"{}")
+                prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+                retry_after = stub.admit(prompt_tokens + stub.completion_tokens)
+                if retry_after is not None:
+                    payload = {"error": {"message": "Rate limit reached", "type": "requests",
+                                         "code": "rate_limit_exceeded"}}
+                    self._send(429, payload, {"Retry-After": f"{retry_after:.2f}"})
+                    return
+                time.sleep(stub.latency_seconds)
+                self._send(200, stub.completion(body, prompt_tokens))
+
+            def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "RateLimitedStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+async def _burst(stub: RateLimitedStub, calls: int, scheduler: Optional[ModelCallScheduler]) -> Dict[str, Any]:
+    """Fire ``calls`` concurrent completions, a quarter of them at finishing priority."""
+    from autogen_core.models import UserMessage
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+    def _client(priority: int):
+        client = OpenAIChatCompletionClient(model="gpt-4o-mini", base_url=stub.base_url, api_key="stub")
+        if scheduler is None:
+            return client
+        return ScheduledChatCompletionClient(client, scheduler, priority=priority, completion_token_estimate=50)
+
+    clients = {PRIORITY_FINISH: _client(PRIORITY_FINISH), PRIORITY_NORMAL: _client(PRIORITY_NORMAL)}
+    latencies = {PRIORITY_FINISH: [], PRIORITY_NORMAL: []}
+
+    async def _call(index: int):
+        priority = PRIORITY_FINISH if index % 4 == 0 else PRIORITY_NORMAL
+        started = time.perf_counter()
+        await clients[priority].create([UserMessage(content=f"Benefit request {index}", source="user")])
+        latencies[priority].append(time.perf_counter() - started)
+
+    stub.counts.clear()
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_call(i) for i in range(calls)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    for client in clients.values():
+        await client.close()
+    return {
+        "calls": calls,
+        "failed": sum(1 for result in results if isinstance(result, BaseException)),
+        "responses_429": stub.counts["rate_limited"],
+        "elapsed_seconds": round(elapsed, 2),
+        "mean_latency_finish": round(sum(latencies[PRIORITY_FINISH]) / max(1, len(latencies[PRIORITY_FINISH])), 2),
+        "mean_latency_normal": round(sum(latencies[PRIORITY_NORMAL]) / max(1, len(latencies[PRIORITY_NORMAL])), 2),
+    }
+
+
+def main():
+    """Benchmark uncoordinated and scheduled model calls against the rate-limited stub."""
+    parser = argparse.ArgumentParser(description="Rate-limited chat completions stub and scheduler benchmark.")
+    parser.add_argument("--calls", type=int, default=200, help="Concurrent calls per run")
+    parser.add_argument("--rpm", type=int, default=600, help="Stub requests-per-minute limit")
+    parser.add_argument("--tpm", type=int, default=200_000, help="Stub tokens-per-minute limit")
+    parser.add_argument("--serve", action="store_true", help="Only serve the stub until interrupted")
+    parser.add_argument("--port", type=int, default=0, help="Port to serve on (random by default)")
+    args = parser.parse_args()
+
+    stub = RateLimitedStub(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, port=args.port).start()
+    print(f"🧪 Rate-limited stub at {stub.base_url} ({args.rpm} RPM, {args.tpm} TPM)")
+    try:
+        if args.serve:
+            threading.Event().wait()
+        unscheduled = asyncio.run(_burst(stub, args.calls, None))
+        print(f"   Uncoordinated: {json.dumps(unscheduled)}")
+        scheduler = ModelCallScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, burst_seconds=0.5)
+        scheduled = asyncio.run(_burst(stub, args.calls, scheduler))
+        print(f"   Scheduled:     {json.dumps(scheduled)}")
+        print(f"📊 Scheduler: {json.dumps(scheduler.report())}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
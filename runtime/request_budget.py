@@ -0,0 +1,255 @@
+"""
+Request Budgets for the Benefit Orchestrator System.
+Stops a request that exceeds its token, estimated cost, turn or wall-clock budget and queues it for manual review.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional, Sequence
+
+from autogen_agentchat.base import TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+
+
+BUDGET_SOURCE = "RequestBudget"
+BUDGET_EXCEEDED = "Budget exceeded"
+
+# The team's message-count backstop (MaxMessageTermination, or a turn budget under the
+# turn checkpointer) is a budget stop too
+BUDGET_STOP_PATTERN = re.compile(rf"{BUDGET_EXCEEDED} \([a-z_]+\)[^,]*|Maximum number of messages \d+ reached[^,]*")
+
+# gpt-4o-mini list prices in USD per million tokens
+PROMPT_PRICE_PER_MILLION = 0.15
+COMPLETION_PRICE_PER_MILLION = 0.60
+
+
+class _BudgetTermination(TerminationCondition):
+    """A termination condition whose spend accumulates over a whole request.
+
+    The group chat resets its termination condition at every stop, including
+    the turn checkpointer's pause after each turn, so ``reset()`` keeps the
+    spend; a new task message (the ``user`` request ID) starts a new request.
+    """
+
+    kind = "budget"
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.spent = 0.0
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    def _begin(self):
+        self.spent = 0.0
+
+    def _add(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]):
+        raise NotImplementedError
+
+    def _format(self, value: float) -> str:
+        return f"{value:g}"
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            return None
+        if any(isinstance(message, BaseChatMessage) and message.source == "user" for message in messages):
+            self._begin()
+        self._add(messages)
+        if self.spent < self.limit:
+            return None
+        self._terminated = True
+        return StopMessage(content=f"{BUDGET_EXCEEDED} ({self.kind}): {self._format(self.spent)} of "
+                                   f"{self._format(self.limit)}", source=BUDGET_SOURCE)
+
+    async def reset(self) -> None:
+        self._terminated = False
+
+
+class TokenBudgetTermination(_BudgetTermination):
+    """Stops the request once its model calls have used ``max_tokens`` prompt and completion tokens."""
+
+    kind = "tokens"
+
+    def _add(self, messages):
+        for message in messages:
+            usage = message.models_usage
+            if usage is not None:
+                self.spent += usage.prompt_tokens + usage.completion_tokens
+
+
+class CostBudgetTermination(_BudgetTermination):
+    """Stops the request once the estimated price of its model calls reaches ``max_cost_usd``."""
+
+    kind = "cost_usd"
+
+    def __init__(self, max_cost_usd: float, prompt_price_per_million: float = PROMPT_PRICE_PER_MILLION,
+                 completion_price_per_million: float = COMPLETION_PRICE_PER_MILLION):
+        super().__init__(max_cost_usd)
+        self.prompt_price = prompt_price_per_million / 1_000_000
+        self.completion_price = completion_price_per_million / 1_000_000
+
+    def _add(self, messages):
+        for message in messages:
+            usage = message.models_usage
+            if usage is not None:
+                self.spent += usage.prompt_tokens * self.prompt_price + usage.completion_tokens * self.completion_price
+
+    def _format(self, value: float) -> str:
+        return f"{value:.4f}"
+
+
+class TurnBudgetTermination(_BudgetTermination):
+    """Stops the request after ``max_turns`` agent messages."""
+
+    kind = "turns"
+
+    def _add(self, messages):
+        self.spent += sum(1 for message in messages
+                          if isinstance(message, BaseChatMessage) and message.source != "user")
+
+
+class WallClockBudgetTermination(_BudgetTermination):
+    """Stops the request at the first message after ``max_seconds`` have passed since its task.
+
+    Only message boundaries are checked; per-call deadlines are the tail
+    latency controls' job.
+    """
+
+    kind = "seconds"
+
+    def __init__(self, max_seconds: float):
+        super().__init__(max_seconds)
+        self._started: Optional[float] = None
+
+    def _begin(self):
+        self._started = time.monotonic()
+
+    def _add(self, messages):
+        if self._started is None:
+            self._started = time.monotonic()
+        self.spent = time.monotonic() - self._started
+
+    def _format(self, value: float) -> str:
+        return f"{value:.1f}"
+
+
+class RequestBudget(NamedTuple):
+    """Per-request ceilings; None leaves a dimension unlimited."""
+    max_tokens: Optional[int] = None
+    max_cost_usd: Optional[float] = None
+    max_turns: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+    def termination(self) -> Optional[TerminationCondition]:
+        """The configured budgets ORed into one termination condition, or None if there are none."""
+        conditions = []
+        if self.max_tokens is not None:
+            conditions.append(TokenBudgetTermination(self.max_tokens))
+        if self.max_cost_usd is not None:
+            conditions.append(CostBudgetTermination(self.max_cost_usd))
+        if self.max_turns is not None:
+            conditions.append(TurnBudgetTermination(self.max_turns))
+        if self.max_seconds is not None:
+            conditions.append(WallClockBudgetTermination(self.max_seconds))
+        if not conditions:
+            return None
+        termination = conditions[0]
+        for condition in conditions[1:]:
+            termination = termination | condition
+        return termination
+
+
+def budget_stop_reason(stop_reason: Optional[str]) -> Optional[str]:
+    """The budget that stopped a request, from its stop reason, or None if it stopped for another reason."""
+    match = BUDGET_STOP_PATTERN.search(stop_reason or "")
+    return match.group(0) if match else None
+
+
+class ManualReviewQueue:
+    """Directory of requests stopped by their budget, one JSON file per request.
+
+    Each file holds the stop reason, the transcript so far and the team state,
+    which ``team.load_state`` accepts, so a reviewer can inspect the request or
+    resume it on a team.
+    """
+
+    def __init__(self, directory: str = "manual_review"):
+        self.directory = directory
+
+    def path(self, request_id: str) -> str:
+        safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in request_id)
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    async def save(self, team, request_id: str, messages: Sequence[Any], reason: str) -> str:
+        """Write a stopped request's partial state atomically and return its path."""
+        entry = {
+            "request_id": request_id,
+            "reason": reason,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            "messages": [message.dump() for message in messages],
+            "state": await team.save_state(),
+        }
+        path = self.path(request_id)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=str)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return path
+
+
+def main():
+    """Run requests through a team whose model never finishes the workflow, with and without a budget."""
+    parser = argparse.ArgumentParser(description="Show budget-aware termination on runaway conversations.")
+    parser.add_argument("request_ids", nargs="*", default=["REQ-001", "REQ-002"], help="Request IDs to run")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Token budget per request")
+    parser.add_argument("--max-cost", type=float, default=None, help="Estimated cost budget per request (USD)")
+    parser.add_argument("--max-turns", type=int, default=30, help="Agent turn budget per request")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Wall-clock budget per request")
+    parser.add_argument("--manual-review-dir", default=os.path.join(tempfile.gettempdir(), "manual_review"),
+                        help="Directory for the stopped requests' partial state")
+    args = parser.parse_args()
+
+    from runtime.rate_limit_stub import RateLimitedStub
+    from runtime.team_runner import auto_approve_input, run_request
+
+    # Every completion answers "OK": no agent is ever selected by name and nobody says TERMINATE
+    stub = RateLimitedStub(requests_per_minute=600_000, tokens_per_minute=10 ** 9, latency_seconds=0.0).start()
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    os.environ["OPENAI_API_KEY"] = "stub"
+    from create_benefit_orchestrator import create_benefit_orchestrator_team
+
+    budget = RequestBudget(args.max_tokens, args.max_cost, args.max_turns, args.max_seconds)
+    manual_review = ManualReviewQueue(args.manual_review_dir)
+
+    async def _run(label: str, request_budget: Optional[RequestBudget]):
+        for request_id in args.request_ids:
+            team = create_benefit_orchestrator_team(user_input_func=auto_approve_input, budget=request_budget)
+            outcome = await run_request(team, request_id, manual_review=manual_review)
+            print(f"   {label:<10} {request_id}: {outcome['status']}, {outcome.get('message_count')} messages, "
+                  f"{outcome.get('prompt_tokens', 0) + outcome.get('completion_tokens', 0):,} tokens, "
+                  f"{outcome['duration_seconds']:.1f}s ({outcome.get('budget_exceeded') or outcome.get('stop_reason')})")
+
+    try:
+        print(f"📊 Runaway conversations against a stub model, budget {budget._asdict()}")
+        asyncio.run(_run("backstop", None))
+        asyncio.run(_run("budget", budget))
+        print(f"✅ Partial state of stopped requests in {args.manual_review_dir}")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""
+Request Queue Worker for the Benefit Orchestrator System.
+Consumes request IDs from a local queue and runs them through benefit teams with checkpointed progress.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+from typing import Dict, Any, Callable, List, NamedTuple, Optional, Set
+
+from runtime.team_runner import auto_approve_input, run_request
+
+
+class QueueItem(NamedTuple):
+    """A unit of work read from a queue source."""
+    position: Any
+    request_id: Optional[str]
+    error: Optional[str] = None
+
+
+def parse_queue_entry(text: str):
+    """Parse a queued request ID from a JSON object, JSON string or bare text.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: ``(request_id, error)``
+    """
+    text = text.strip()
+    if not text:
+        return None, "Empty queue entry"
+    try:
+        entry = json.loads(text)
+    except json.JSONDecodeError:
+        return text, None
+    if isinstance(entry, str):
+        return entry, None
+    if isinstance(entry, dict):
+        request_id = entry.get("request_id") or entry.get("requestId")
+        if request_id:
+            return str(request_id), None
+    return None, f"Queue entry has no request ID: {text[:100]}"
+
+
+class JsonlTailSource:
+    """Tails a JSONL file of request IDs, one entry per line.
+
+    Positions are byte offsets of each line. The checkpointed offset is a low
+    watermark: every line before it has a result, so a restart resumes there
+    and skips lines past it whose results were already logged.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = 0
+        self._watermark = 0
+        self._outstanding: Dict[int, List] = {}  # start offset -> [end offset, done], in dispatch order
+        self._completed: Set[int] = set()
+
+    def restore(self, state: Dict[str, Any], completed: Set[Any]):
+        self._offset = self._watermark = int(state.get("offset", 0))
+        self._completed = {position for position in completed if isinstance(position, int)}
+
+    def next_item(self) -> Optional[QueueItem]:
+        while True:
+            if not os.path.exists(self.path):
+                return None
+            with open(self.path, "rb") as handle:
+                handle.seek(self._offset)
+                line = handle.readline()
+            # Nothing new, or a producer is still writing the line
+            if not line or not line.endswith(b"\n"):
+                return None
+
+            start, end = self._offset, self._offset + len(line)
+            self._offset = end
+            self._outstanding[start] = [end, False]
+            if start in self._completed:
+                # Result already logged before the last checkpoint was written
+                self._completed.discard(start)
+                self.ack(QueueItem(start, None))
+                continue
+            if not line.strip():
+                self.ack(QueueItem(start, None))
+                continue
+
+            request_id, error = parse_queue_entry(line.decode("utf-8", errors="replace"))
+            return QueueItem(start, request_id, error)
+
+    def ack(self, item: QueueItem):
+        self._outstanding[item.position][1] = True
+        # Advance the watermark over the contiguous completed prefix
+        while self._outstanding:
+            start = next(iter(self._outstanding))
+            end, done = self._outstanding[start]
+            if not done:
+                break
+            self._watermark = end
+            del self._outstanding[start]
+
+    def state(self) -> Dict[str, Any]:
+        return {"offset": self._watermark}
+
+
+class SpoolDirectorySource:
+    """Consumes request files dropped into a spool directory, oldest name first.
+
+    Each file holds one request ID. Finished files are moved to ``done/``, so
+    the directory itself records progress; files whose results were logged
+    before a crash are moved on restart instead of being processed again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.done_directory = os.path.join(directory, "done")
+        os.makedirs(self.done_directory, exist_ok=True)
+        self._in_flight: Set[str] = set()
+        self._pending: List[str] = []
+
+    def restore(self, state: Dict[str, Any], completed: Set[Any]):
+        for name in completed:
+            if isinstance(name, str) and os.path.exists(os.path.join(self.directory, name)):
+                os.replace(os.path.join(self.directory, name), os.path.join(self.done_directory, name))
+
+    def next_item(self) -> Optional[QueueItem]:
+        if not self._pending:
+            self._pending = sorted(
+                (name for name in os.listdir(self.directory)
+                 if not name.startswith(".") and name not in self._in_flight
+                 and os.path.isfile(os.path.join(self.directory, name))),
+                reverse=True)
+        while self._pending:
+            name = self._pending.pop()
+            path = os.path.join(self.directory, name)
+            if name in self._in_flight or not os.path.exists(path):
+                continue
+            self._in_flight.add(name)
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                request_id, error = parse_queue_entry(handle.read())
+            return QueueItem(name, request_id, error)
+        return None
+
+    def ack(self, item: QueueItem):
+        os.replace(os.path.join(self.directory, item.position), os.path.join(self.done_directory, item.position))
+        self._in_flight.discard(item.position)
+
+    def state(self) -> Dict[str, Any]:
+        return {}
+
+
+class RequestQueueWorker:
+    """Long-running worker that feeds queued requests through benefit teams.
+
+    At most ``max_in_flight`` requests run at once; the queue is only read when
+    a slot is free, so a fast producer never grows the worker's memory. Each
+    outcome is appended (and fsynced) to the results log before the source is
+    acknowledged and the checkpoint rewritten, and on restart the results
+    logged after the last checkpoint are replayed, so requests are neither
+    lost nor processed twice.
+    """
+
+    def __init__(self, source, results_log: str, checkpoint_file: str,
+                 team_factory: Callable[[], Any], max_in_flight: int = 4,
+                 poll_interval: float = 0.5, exit_when_idle: bool = False,
+                 checkpointer=None, results_store=None, prescreen: bool = False, team_pool=None,
+                 profiler=None, metrics=None, retention=None, memory=None, decision_cache=None,
+                 manual_review=None):
+        self.source = source
+        self.results_log = results_log
+        self.checkpoint_file = checkpoint_file
+        self.team_factory = team_factory
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.exit_when_idle = exit_when_idle
+        self.checkpointer = checkpointer
+        self.results_store = results_store
+        self.prescreen = prescreen
+        self.team_pool = team_pool
+        self.profiler = profiler
+        self.metrics = metrics
+        self.retention = retention
+        self.memory = memory
+        self.decision_cache = decision_cache
+        self.manual_review = manual_review
+        self.counts = {"completed": 0, "error": 0}
+
+    def _restore(self):
+        state, results_log_size = {}, 0
+        if os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            state = checkpoint.get("source_state", {})
+            results_log_size = checkpoint.get("results_log_size", 0)
+
+        # Results appended after the last checkpoint belong to items not yet acknowledged
+        unacknowledged = []
+        if os.path.exists(self.results_log):
+            with open(self.results_log, "rb") as f:
+                f.seek(results_log_size)
+                for line in f:
+                    if line.endswith(b"\n"):
+                        unacknowledged.append(json.loads(line))
+        # The crash may have come before their results store rows were written; re-appending is a no-op if not
+        if self.results_store is not None and unacknowledged:
+            self.results_store.append_many(unacknowledged)
+        self.source.restore(state, {outcome.get("queue_position") for outcome in unacknowledged})
+
+    def _write_checkpoint(self):
+        checkpoint = {
+            "source_state": self.source.state(),
+            "results_log_size": os.path.getsize(self.results_log) if os.path.exists(self.results_log) else 0,
+        }
+        temp_file = self.checkpoint_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.checkpoint_file)
+
+    def _commit(self, item: QueueItem, outcome: Dict[str, Any]):
+        outcome["queue_position"] = item.position
+        with open(self.results_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(outcome, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self.results_store is not None:
+            self.results_store.append(outcome)
+        self.source.ack(item)
+        self._write_checkpoint()
+        self.counts[outcome["status"]] = self.counts.get(outcome["status"], 0) + 1
+
+    async def _run_item(self, item: QueueItem) -> Dict[str, Any]:
+        scope = self.profiler.request(item.request_id) if self.profiler else contextlib.nullcontext()
+        accounting = self.memory.request() if self.memory else contextlib.nullcontext({})
+        if self.metrics is not None:
+            self.metrics.request_started()
+        try:
+            with scope, accounting as memory_usage:
+                if self.team_pool is not None:
+                    async with self.team_pool.checkout() as team:
+                        outcome = await run_request(team, item.request_id, checkpointer=self.checkpointer,
+                                                    prescreen=self.prescreen, retention=self.retention,
+                                                    manual_review=self.manual_review)
+                else:
+                    outcome = await run_request(self.team_factory(), item.request_id,
+                                                checkpointer=self.checkpointer, prescreen=self.prescreen,
+                                                retention=self.retention, manual_review=self.manual_review)
+            outcome.update(memory_usage)
+        except Exception as e:
+            # Failures outside the team run (building or checking out the team) are logged like a failed run,
+            # so the item is still acknowledged and the in-flight gauge settles
+            outcome = {"request_id": item.request_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+        if self.metrics is not None:
+            self.metrics.request_finished(outcome)
+        if self.decision_cache is not None:
+            self.decision_cache.request_finished(outcome)
+        return outcome
+
+    async def _process(self, item: QueueItem, slots: asyncio.Semaphore):
+        try:
+            if item.error:
+                outcome = {"request_id": item.request_id, "status": "error", "error": item.error}
+            else:
+                outcome = await self._run_item(item)
+            self._commit(item, outcome)
+        finally:
+            slots.release()
+
+    async def run(self, stop_event: Optional[asyncio.Event] = None) -> Dict[str, int]:
+        """Process queued requests until ``stop_event`` is set (or the queue drains with ``exit_when_idle``).
+
+        In-flight requests are always finished before returning.
+
+        Returns:
+            Dict[str, int]: Number of outcomes logged per status
+        """
+        stop_event = stop_event or asyncio.Event()
+        self._restore()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        in_flight: Set[asyncio.Task] = set()
+
+        while not stop_event.is_set():
+            await slots.acquire()
+            item = self.source.next_item()
+            if item is None:
+                slots.release()
+                if self.exit_when_idle and not in_flight:
+                    break
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._process(item, slots))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        if self.profiler is not None:
+            self.profiler.write_reports()
+        return self.counts
+
+
+def main():
+    """Run the request queue worker from the command line."""
+    parser = argparse.ArgumentParser(description="Process queued benefit requests through the benefit team.")
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--queue-file", help="JSONL file of request IDs to tail")
+    source_group.add_argument("--spool-dir", help="Directory of request files to consume")
+    parser.add_argument("--results", default="worker_results.jsonl", help="Append-only results log")
+    parser.add_argument("--checkpoint", default="worker_checkpoint.json", help="Checkpoint file")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Maximum concurrent requests")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between queue polls")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is drained")
+    parser.add_argument("--prescreen", action="store_true",
+                        help="Decline unverified customers and missing required documents without model calls")
+    parser.add_argument("--results-db", default=None,
+                        help="SQLite results store for structured per-request outcome rows")
+    parser.add_argument("--turn-checkpoints", default=None,
+                        help="Directory for per-turn team checkpoints (resume interrupted requests)")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="Requests-per-minute budget shared by all model calls (enables the scheduler)")
+    parser.add_argument("--tpm", type=int, default=200_000, help="Tokens-per-minute budget for the scheduler")
+    parser.add_argument("--call-timeout", type=float, default=None,
+                        help="Seconds before a model call is abandoned and retried (enables tail-latency controls)")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate model call once a call outlives the agent's p95 latency")
+    parser.add_argument("--profile-dir", default=None,
+                        help="Write per-request CPU profiles of agent turns and tool calls, plus hotspot reports")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics on this port at /metrics")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Rewrite this file with Prometheus metrics every 15 seconds")
+    parser.add_argument("--transcripts", choices=("drop", "keep", "spill"), default="drop",
+                        help="Completed transcripts: release them, keep the last --keep-transcripts in memory, "
+                             "or keep those and spill older ones to --spill-dir")
+    parser.add_argument("--keep-transcripts", type=int, default=100, help="Transcripts held in memory")
+    parser.add_argument("--spill-dir", default="spilled_transcripts", help="Directory for spilled transcripts")
+    parser.add_argument("--intern-transcripts", action="store_true",
+                        help="Keep live conversations' model contexts in a shared, interned transcript store")
+    parser.add_argument("--memory-accounting", action="store_true",
+                        help="Record per-request tracemalloc memory figures in the results log")
+    parser.add_argument("--schedule", choices=("deadline", "fifo"), default=None,
+                        help="Run the most urgent queued request first by slack to its requested effective date "
+                             "(deadline), or keep arrival order (fifo); both report deadline-miss rates")
+    parser.add_argument("--lookahead", type=int, default=1000,
+                        help="Queued requests read ahead for deadline scheduling")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Answer Orchestrator, verification and execution calls deterministically where the "
+                             "workflow allows, escalating to the agent's model when the answer fails validation")
+    parser.add_argument("--cascade-model", default=None,
+                        help="Cheaper model tried between the deterministic tier and the agent's model")
+    parser.add_argument("--decision-cache", default=None,
+                        help="SQLite database of confirmed Eligibility decisions, reused for requests with the "
+                             "same fact pattern instead of calling the model")
+    parser.add_argument("--decision-cache-ttl-hours", type=float, default=168,
+                        help="Age after which a cached decision is no longer reused")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Token budget per request")
+    parser.add_argument("--max-cost", type=float, default=None,
+                        help="Estimated model cost budget per request, in USD at gpt-4o-mini prices")
+    parser.add_argument("--max-turns", type=int, default=None, help="Agent turn budget per request")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Wall-clock budget per request")
+    parser.add_argument("--manual-review-dir", default="manual_review",
+                        help="Directory for the partial state of requests stopped by their budget")
+    parser.add_argument("--warm-pool", action="store_true",
+                        help="Reuse pre-built teams (one per in-flight slot), reset between requests")
+    args = parser.parse_args()
+
+    from create_benefit_orchestrator import create_benefit_orchestrator_team
+    from runtime.memory import MemoryAccountant, TranscriptRetention
+
+    checkpointer = None
+    if args.turn_checkpoints:
+        from runtime.turn_checkpoint import TurnCheckpointer
+        checkpointer = TurnCheckpointer(args.turn_checkpoints)
+
+    scheduler = None
+    if args.rpm:
+        from runtime.model_scheduler import ModelCallScheduler
+        scheduler = ModelCallScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+
+    tail_latency = None
+    if args.call_timeout or args.hedge:
+        from runtime.tail_latency import TailLatencyControls, TurnPolicy
+        policy = TurnPolicy(hedge=args.hedge)
+        if args.call_timeout:
+            policy = policy._replace(call_timeout=args.call_timeout,
+                                     call_deadline=args.call_timeout * (policy.max_retries + 1))
+        tail_latency = TailLatencyControls(default=policy)
+
+    results_store = None
+    if args.results_db:
+        from runtime.results_store import ResultsStore
+        results_store = ResultsStore(args.results_db)
+
+    profiler = None
+    if args.profile_dir:
+        from runtime.profiling import RequestProfiler
+        profiler = RequestProfiler(args.profile_dir)
+
+    metrics, exporters = None, []
+    if args.metrics_port is not None or args.metrics_file:
+        from runtime.metrics import MetricsFileExporter, MetricsServer, TeamMetrics
+        metrics = TeamMetrics()
+        if args.metrics_port is not None:
+            exporters.append(MetricsServer(metrics.registry, port=args.metrics_port).start())
+        if args.metrics_file:
+            exporters.append(MetricsFileExporter(metrics.registry, args.metrics_file).start())
+
+    transcript_store = None
+    if args.intern_transcripts:
+        from runtime.transcript_store import TranscriptStore
+        transcript_store = TranscriptStore()
+
+    cascade = None
+    if args.cascade or args.cascade_model:
+        from runtime.model_cascade import ModelCascade
+        cascade = ModelCascade(cheap_model=args.cascade_model)
+
+    decision_cache = None
+    if args.decision_cache:
+        from runtime.decision_cache import DecisionCache
+        decision_cache = DecisionCache(args.decision_cache, ttl_seconds=args.decision_cache_ttl_hours * 3600)
+
+    from runtime.request_budget import ManualReviewQueue, RequestBudget
+    budget = RequestBudget(args.max_tokens, args.max_cost, args.max_turns, args.max_seconds)
+
+    def team_factory():
+        return create_benefit_orchestrator_team(user_input_func=auto_approve_input, checkpointer=checkpointer,
+                                                scheduler=scheduler, tail_latency=tail_latency, profiler=profiler,
+                                                metrics=metrics, transcript_store=transcript_store, cascade=cascade,
+                                                decision_cache=decision_cache, budget=budget)
+
+    team_pool = None
+    if args.warm_pool:
+        from runtime.team_pool import TeamPool
+        team_pool = TeamPool(team_factory, size=args.max_in_flight)
+
+    source = JsonlTailSource(args.queue_file) if args.queue_file else SpoolDirectorySource(args.spool_dir)
+    if args.schedule:
+        from runtime.deadline_scheduler import DeadlineScheduledSource, DeadlineScheduler
+        source = DeadlineScheduledSource(source, lookahead=args.lookahead,
+                                         scheduler=DeadlineScheduler(policy=args.schedule))
+    worker = RequestQueueWorker(
+        source, args.results, args.checkpoint,
+        team_factory=team_factory,
+        max_in_flight=args.max_in_flight,
+        poll_interval=args.poll_interval,
+        exit_when_idle=args.exit_when_idle,
+        checkpointer=checkpointer,
+        results_store=results_store,
+        prescreen=args.prescreen,
+        team_pool=team_pool,
+        profiler=profiler,
+        metrics=metrics,
+        retention=TranscriptRetention(args.transcripts, keep=args.keep_transcripts,
+                                      spill_dir=args.spill_dir if args.transcripts == "spill" else None),
+        memory=MemoryAccountant() if args.memory_accounting else None,
+        decision_cache=decision_cache,
+        manual_review=ManualReviewQueue(args.manual_review_dir),
+    )
+
+    async def _run():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except NotImplementedError:
+                pass
+        if team_pool is not None:
+            await team_pool.warm()
+        return await worker.run(stop_event)
+
+    try:
+        counts = asyncio.run(_run())
+    finally:
+        for exporter in exporters:
+            exporter.stop()
+    print(f"✅ Worker stopped: {counts.get('completed', 0)} completed, {counts.get('manual_review', 0)} "
+          f"for manual review, {counts.get('error', 0)} errors")
+    if args.schedule:
+        print(f"📈 Deadlines ({args.schedule}): {json.dumps(source.report(), indent=2)}")
+    if cascade is not None:
+        print(f"📈 Model cascade: {json.dumps(cascade.report(), indent=2)}")
+    if decision_cache is not None:
+        print(f"📈 Decision cache: {json.dumps(decision_cache.report(), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Results Store for the Benefit Orchestrator System.
+Append-only SQLite store of per-request decisions, judge scores and execution outcomes for reporting.
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional
+
+
+# Column order of the request_outcomes table (after the autoincrement id)
+COLUMNS = [
+    "request_id",
+    "completed_at",
+    "status",
+    "decision",
+    "benefit_type",
+    "judge_score",
+    "workflow_compliance",
+    "judge_recommendation",
+    "execution_type",
+    "execution_status",
+    "prompt_tokens",
+    "completion_tokens",
+    "latency_seconds",
+    "message_count",
+    "stop_reason",
+    "queue_position",
+]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS request_outcomes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        request_id TEXT NOT NULL,
+        completed_at TEXT NOT NULL,
+        status TEXT NOT NULL,
+        decision TEXT,
+        benefit_type TEXT,
+        judge_score INTEGER,
+        workflow_compliance TEXT,
+        judge_recommendation TEXT,
+        execution_type TEXT,
+        execution_status TEXT,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        latency_seconds REAL,
+        message_count INTEGER,
+        stop_reason TEXT,
+        queue_position INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_outcomes_completed_at ON request_outcomes(completed_at);
+    CREATE INDEX IF NOT EXISTS idx_outcomes_decision ON request_outcomes(benefit_type, decision, judge_score);
+    CREATE INDEX IF NOT EXISTS idx_outcomes_latency ON request_outcomes(latency_seconds);
+"""
+
+# A worker's outcome is identified by its queue position, so replaying its results log never duplicates rows;
+# created after the column migration below
+UNIQUE_OUTCOME_INDEX = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_outcomes_queue_position ON request_outcomes(request_id, queue_position);
+"""
+
+
+def outcome_to_row(outcome: Dict[str, Any]) -> tuple:
+    """Map a ``run_request`` outcome (or worker results-log entry) to a table row."""
+    values = dict(outcome)
+    values.setdefault("latency_seconds", outcome.get("duration_seconds"))
+    values.setdefault("completed_at", datetime.now(timezone.utc).isoformat())
+    values.setdefault("status", "completed")
+    return tuple(values.get(column) for column in COLUMNS)
+
+
+class ResultsStore:
+    """Append-only store of structured request outcomes.
+
+    Rows are only ever inserted, never updated, so bulk loads are plain
+    batched inserts and reports run as indexed aggregate queries instead of
+    re-parsing transcripts. Inserting an outcome already stored for the same
+    request ID and queue position is a no-op.
+    """
+
+    def __init__(self, path: str = "results.db"):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(request_outcomes)")}
+        if "queue_position" not in columns:
+            with self._connection:
+                self._connection.execute("ALTER TABLE request_outcomes ADD COLUMN queue_position INTEGER")
+        self._connection.executescript(UNIQUE_OUTCOME_INDEX)
+
+    def append(self, outcome: Dict[str, Any]):
+        """Append the outcome of one completed request."""
+        self.append_many([outcome])
+
+    def append_many(self, outcomes: Iterable[Dict[str, Any]], batch_size: int = 10000) -> int:
+        """Bulk-append outcomes in batched transactions.
+
+        Returns:
+            int: Number of outcomes processed, including any already stored
+        """
+        insert = f"INSERT OR IGNORE INTO request_outcomes ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        written = 0
+        batch: List[tuple] = []
+        for outcome in outcomes:
+            batch.append(outcome_to_row(outcome))
+            if len(batch) >= batch_size:
+                with self._connection:
+                    self._connection.executemany(insert, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            with self._connection:
+                self._connection.executemany(insert, batch)
+            written += len(batch)
+        return written
+
+    def import_results_log(self, path: str) -> int:
+        """Load a request worker results log (JSONL) into the store."""
+        with open(path, encoding="utf-8") as f:
+            return self.append_many(json.loads(line) for line in f if line.strip())
+
+    def _where(self, since: Optional[str]):
+        return ("WHERE completed_at >= ?", (since,)) if since else ("", ())
+
+    def _latency_percentile(self, fraction: float, since: Optional[str]) -> Optional[float]:
+        where, params = self._where(since)
+        clause = f"{where} AND" if where else "WHERE"
+        count = self._connection.execute(
+            f"SELECT COUNT(*) FROM request_outcomes {clause} latency_seconds IS NOT NULL", params).fetchone()[0]
+        if not count:
+            return None
+        row = self._connection.execute(
+            f"SELECT latency_seconds FROM request_outcomes {clause} latency_seconds IS NOT NULL "
+            f"ORDER BY latency_seconds LIMIT 1 OFFSET ?", params + (min(count - 1, int(count * fraction)),)).fetchone()
+        return row[0]
+
+    def summary(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregate throughput and quality metrics, optionally since an ISO timestamp."""
+        where, params = self._where(since)
+        totals = self._connection.execute(f"""
+            SELECT COUNT(*), MIN(completed_at), MAX(completed_at), AVG(judge_score),
+                   SUM(prompt_tokens), SUM(completion_tokens), AVG(latency_seconds),
+                   SUM(execution_status = 'success'), SUM(status = 'error')
+            FROM request_outcomes {where}""", params).fetchone()
+
+        by_benefit = {}
+        for benefit_type, decision, count, avg_score in self._connection.execute(f"""
+                SELECT benefit_type, decision, COUNT(*), AVG(judge_score)
+                FROM request_outcomes {where} GROUP BY benefit_type, decision""", params):
+            entry = by_benefit.setdefault(benefit_type or "Unknown", {"total": 0, "decisions": {}})
+            entry["total"] += count
+            entry["decisions"][decision or "NONE"] = {"count": count, "avg_judge_score": avg_score}
+
+        compliance = dict(self._connection.execute(f"""
+            SELECT COALESCE(workflow_compliance, 'UNKNOWN'), COUNT(*)
+            FROM request_outcomes {where} GROUP BY workflow_compliance""", params).fetchall())
+
+        hourly = self._connection.execute(f"""
+            SELECT substr(completed_at, 1, 13) AS hour, COUNT(*)
+            FROM request_outcomes {where} GROUP BY hour ORDER BY hour""", params).fetchall()
+
+        total = totals[0]
+        return {
+            "total_requests": total,
+            "first_completed_at": totals[1],
+            "last_completed_at": totals[2],
+            "avg_judge_score": totals[3],
+            "prompt_tokens": totals[4] or 0,
+            "completion_tokens": totals[5] or 0,
+            "avg_latency_seconds": totals[6],
+            "p50_latency_seconds": self._latency_percentile(0.50, since),
+            "p95_latency_seconds": self._latency_percentile(0.95, since),
+            "execution_success_rate": (totals[7] or 0) / total if total else None,
+            "errors": totals[8] or 0,
+            "by_benefit_type": by_benefit,
+            "workflow_compliance": compliance,
+            "requests_per_hour": {hour: count for hour, count in hourly},
+        }
+
+    def close(self):
+        self._connection.close()
+
+
+def main():
+    """Print a throughput and quality report from a results store."""
+    parser = argparse.ArgumentParser(description="Report on processed benefit requests.")
+    parser.add_argument("database", nargs="?", default="results.db", help="Results store database")
+    parser.add_argument("--import-log", default=None, help="Worker results log (JSONL) to append first")
+    parser.add_argument("--since", default=None, help="Only include requests completed at or after this ISO time")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.database)
+    if args.import_log:
+        print(f"✅ Imported {store.import_results_log(args.import_log):,} outcomes from {args.import_log}")
+    print(json.dumps(store.summary(args.since), indent=2))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
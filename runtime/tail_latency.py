@@ -0,0 +1,341 @@
+"""
+Tail-Latency Controls for the Benefit Orchestrator System.
+Adds per-agent call deadlines, jittered retries of transient errors and p95-based hedged model calls.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+from typing import (Dict, Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, NamedTuple, Optional,
+                    Sequence, Tuple, TypeVar, Union)
+
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, ModelInfo, RequestUsage
+
+from runtime.model_scheduler import disable_sdk_retries, is_transient
+
+
+# Key used for the SelectorGroupChat's speaker-selection calls
+SELECTOR_KEY = "selector"
+
+T = TypeVar("T")
+
+
+class TurnPolicy(NamedTuple):
+    """Latency budget for one agent's model calls.
+
+    ``call_timeout`` bounds a single model call, ``call_deadline`` bounds the
+    call including its retries, and ``hedge`` sends a duplicate call once the
+    first has run longer than the agent's recent p95 latency. A streamed call
+    is retried and hedged only until its first chunk arrives; after that, a
+    retry would repeat output the caller has already seen.
+    """
+    call_timeout: float = 60.0
+    call_deadline: float = 150.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_cap: float = 8.0
+    hedge: bool = False
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """Raised when an agent's model call and its retries exceed the call deadline."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per agent."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = collections.defaultdict(lambda: collections.deque(maxlen=window))
+
+    def record(self, key: str, seconds: float):
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """Latency percentile for an agent, or None until enough calls were observed."""
+        samples = sorted(self._samples[key])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+
+class ResilientChatCompletionClient(ChatCompletionClient):
+    """Chat completion client that enforces a ``TurnPolicy`` around every call.
+
+    Wraps the scheduled client when a ``ModelCallScheduler`` is in use, so
+    retries and hedges are admitted through the shared rate-limit budget.
+    """
+
+    def __init__(self, inner: ChatCompletionClient, key: str, policy: TurnPolicy, tracker: LatencyTracker,
+                 stats: Dict[str, collections.Counter]):
+        self.inner = inner
+        self.key = key
+        self.policy = policy
+        self.tracker = tracker
+        self.stats = stats[key]
+        # Retries are owned here; the SDK's would hide transient errors and ignore the deadline
+        disable_sdk_retries(inner)
+
+    async def _timed_call(self, messages: Sequence[LLMMessage], kwargs: Dict[str, Any]) -> CreateResult:
+        started = time.perf_counter()
+        result = await self.inner.create(messages, **kwargs)
+        self.tracker.record(self.key, time.perf_counter() - started)
+        return result
+
+    async def _open_stream(self, messages: Sequence[LLMMessage],
+                           kwargs: Dict[str, Any]) -> Tuple[AsyncIterator, Union[str, CreateResult], float]:
+        """Start a streamed call and wait for its first chunk."""
+        started = time.monotonic()
+        stream = self.inner.create_stream(messages, **kwargs).__aiter__()
+        try:
+            return stream, await stream.__anext__(), started
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    async def _hedged(self, call: Callable[[], Awaitable[T]],
+                      discard: Optional[Callable[[T], Awaitable[None]]] = None) -> T:
+        """Run the call, adding one duplicate once it outlives the agent's p95; the first success wins.
+
+        ``discard`` releases the result of a duplicate that also succeeded.
+        """
+        primary = asyncio.ensure_future(call())
+        hedge_delay = self.tracker.percentile(self.key, 95) if self.policy.hedge else None
+        if hedge_delay is None:
+            return await primary
+
+        tasks = [primary]
+        winner = None
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self.stats["hedged"] += 1
+                tasks.append(asyncio.ensure_future(call()))
+                pending = set(tasks)
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if task is not primary:
+                            self.stats["hedge_won"] += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif (discard is not None and task is not winner and not task.cancelled()
+                      and task.exception() is None):
+                    await discard(task.result())
+
+    async def _with_retries(self, call: Callable[[], Awaitable[T]], deadline: float) -> T:
+        """Run the call under the call timeout, retrying transient errors with jittered backoff until the deadline."""
+        for attempt in range(self.policy.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return await asyncio.wait_for(call(), min(self.policy.call_timeout, remaining))
+            except Exception as error:
+                if isinstance(error, asyncio.TimeoutError):
+                    self.stats["timeouts"] += 1
+                if not is_transient(error) or attempt == self.policy.max_retries:
+                    raise
+                # Full jitter keeps concurrent teams from retrying in lockstep
+                backoff = random.uniform(0, min(self.policy.backoff_cap, self.policy.backoff_base * 2 ** attempt))
+                if time.monotonic() + backoff >= deadline:
+                    break
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff)
+        self.stats["deadline_exceeded"] += 1
+        raise CallDeadlineExceeded(f"{self.key} exceeded its {self.policy.call_deadline:.0f}s call deadline")
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        self.stats["calls"] += 1
+        deadline = time.monotonic() + self.policy.call_deadline
+        return await self._with_retries(lambda: self._hedged(lambda: self._timed_call(messages, kwargs)), deadline)
+
+    async def create_stream(self, messages: Sequence[LLMMessage],
+                            **kwargs) -> AsyncGenerator[Union[str, CreateResult], None]:
+        self.stats["calls"] += 1
+        deadline = time.monotonic() + self.policy.call_deadline
+
+        async def discard(opened):
+            await opened[0].aclose()
+
+        stream, chunk, started = await self._with_retries(
+            lambda: self._hedged(lambda: self._open_stream(messages, kwargs), discard), deadline)
+        # The rest of the stream stays within the call timeout of the attempt that won
+        ends_at = min(started + self.policy.call_timeout, deadline)
+        try:
+            while True:
+                yield chunk
+                if isinstance(chunk, CreateResult):
+                    self.tracker.record(self.key, time.monotonic() - started)
+                    return
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), ends_at - time.monotonic())
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    self.stats["deadline_exceeded"] += 1
+                    raise CallDeadlineExceeded(f"{self.key} stream outlived its call timeout") from None
+        finally:
+            await stream.aclose()
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.inner.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.count_tokens(messages, **kwargs)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return self.inner.remaining_tokens(messages, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self.inner.model_info
+
+
+class TailLatencyControls:
+    """Per-agent turn policies shared by every team in the process.
+
+    Args:
+        policies (Optional[Dict[str, TurnPolicy]]): Policies by agent name (or ``SELECTOR_KEY``)
+        default (TurnPolicy): Policy for agents without an entry
+        tracker (Optional[LatencyTracker]): Latency history that drives hedge delays
+    """
+
+    def __init__(self, policies: Optional[Dict[str, TurnPolicy]] = None, default: TurnPolicy = TurnPolicy(),
+                 tracker: Optional[LatencyTracker] = None):
+        self.policies = policies or {}
+        self.default = default
+        self.tracker = tracker or LatencyTracker()
+        self.stats: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+
+    def wrap_client(self, client: ChatCompletionClient, key: str) -> ChatCompletionClient:
+        return ResilientChatCompletionClient(client, key, self.policies.get(key, self.default), self.tracker,
+                                             self.stats)
+
+    def apply_to_agent(self, agent: Any):
+        """Enforce the agent's policy on its model client."""
+        model_client = getattr(agent, "_model_client", None)
+        if model_client is None or isinstance(model_client, ResilientChatCompletionClient):
+            return
+        agent._model_client = self.wrap_client(model_client, agent.name)
+
+    def report(self) -> Dict[str, Any]:
+        """Per-agent counters and latency percentiles."""
+        return {
+            key: dict(counts, p50=self.tracker.percentile(key, 50), p95=self.tracker.percentile(key, 95),
+                      p99=self.tracker.percentile(key, 99))
+            for key, counts in self.stats.items()
+        }
+
+
+class _SimulatedLatencyClient(ChatCompletionClient):
+    """Model stand-in whose latency is usually short but occasionally an outlier."""
+
+    def __init__(self, median: float, outlier_rate: float, outlier_seconds: float):
+        from autogen_ext.models.replay import ReplayChatCompletionClient
+        self._replay = ReplayChatCompletionClient(["OK"])
+        self.median = median
+        self.outlier_rate = outlier_rate
+        self.outlier_seconds = outlier_seconds
+
+    async def create(self, messages: Sequence[LLMMessage], **kwargs) -> CreateResult:
+        if random.random() < self.outlier_rate:
+            await asyncio.sleep(self.outlier_seconds)
+        else:
+            await asyncio.sleep(self.median * random.lognormvariate(0, 0.3))
+        return CreateResult(finish_reason="stop", content="OK", usage=RequestUsage(prompt_tokens=0,
+                            completion_tokens=0), cached=False)
+
+    async def create_stream(self, messages: Sequence[LLMMessage], **kwargs):
+        yield await self.create(messages)
+
+    async def close(self) -> None:
+        pass
+
+    def actual_usage(self) -> RequestUsage:
+        return RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    total_usage = actual_usage
+
+    def count_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return 0
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], **kwargs) -> int:
+        return 0
+
+    @property
+    def capabilities(self):
+        return self._replay.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._replay.model_info
+
+
+async def _simulate(calls: int, policy: TurnPolicy, median: float, outlier_rate: float,
+                    outlier_seconds: float) -> Dict[str, Any]:
+    """Run sequential calls through the controls and report the latency distribution callers saw."""
+    from autogen_core.models import UserMessage
+
+    controls = TailLatencyControls(default=policy)
+    client = controls.wrap_client(_SimulatedLatencyClient(median, outlier_rate, outlier_seconds), "simulated")
+    observed = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await client.create([UserMessage(content="ping", source="user")])
+        observed.append(time.perf_counter() - started)
+    observed.sort()
+    return {
+        "p50": round(observed[len(observed) // 2], 3),
+        "p95": round(observed[int(len(observed) * 0.95)], 3),
+        "p99": round(observed[int(len(observed) * 0.99)], 3),
+        "max": round(observed[-1], 3),
+        **{key: value for key, value in controls.stats["simulated"].items() if key != "calls"},
+    }
+
+
+def main():
+    """Compare caller-observed latency with and without hedging on a simulated outlier-prone model."""
+    parser = argparse.ArgumentParser(description="Simulate tail-latency controls on outlier model calls.")
+    parser.add_argument("--calls", type=int, default=300, help="Calls per run")
+    parser.add_argument("--median", type=float, default=0.02, help="Median call latency in seconds")
+    parser.add_argument("--outlier-rate", type=float, default=0.03, help="Fraction of calls that stall")
+    parser.add_argument("--outlier-seconds", type=float, default=1.0, help="Latency of a stalled call")
+    args = parser.parse_args()
+
+    simulation = dict(median=args.median, outlier_rate=args.outlier_rate, outlier_seconds=args.outlier_seconds)
+    baseline = asyncio.run(_simulate(args.calls, TurnPolicy(max_retries=0), **simulation))
+    print(f"   No controls: {json.dumps(baseline)}")
+    timeout = args.median * 20
+    retried = asyncio.run(_simulate(args.calls, TurnPolicy(call_timeout=timeout, backoff_base=args.median),
+                                    **simulation))
+    print(f"   Deadline + retries ({timeout:.2f}s): {json.dumps(retried)}")
+    hedged = asyncio.run(_simulate(args.calls, TurnPolicy(hedge=True), **simulation))
+    print(f"   Hedged at p95: {json.dumps(hedged)}")
+
+
+if __name__ == "__main__":
+    main()
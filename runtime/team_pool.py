@@ -0,0 +1,169 @@
+"""
+Team Pool for the Benefit Orchestrator System.
+Keeps pre-built benefit teams warm and hands them out, reset, to concurrent requests.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import tracemalloc
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+
+class TeamPool:
+    """A fixed-size pool of reusable benefit teams.
+
+    Teams are built by ``team_factory`` up front (``warm``) or on first checkout,
+    and at most ``size`` exist at once, so the pool should be sized to the
+    worker's parallelism. A returned team is reset before the next checkout; a
+    team whose reset fails is dropped, and its replacement is built by the next
+    checkout, as is the replacement of a build that failed.
+    """
+
+    def __init__(self, team_factory: Callable[[], Any], size: int = 4, quiet: bool = True):
+        self.team_factory = team_factory
+        self.size = size
+        self.quiet = quiet
+        self._idle: Optional[asyncio.Queue] = None
+        self._built = 0
+        self.stats = {"built": 0, "checkouts": 0, "resets": 0, "discarded": 0, "build_seconds": 0.0,
+                      "reset_seconds": 0.0, "wait_seconds": 0.0}
+
+    def _queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        return self._idle
+
+    def _build(self):
+        started = time.perf_counter()
+        if self.quiet:
+            # The factory narrates team creation on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                team = self.team_factory()
+        else:
+            team = self.team_factory()
+        self.stats["built"] += 1
+        self.stats["build_seconds"] += time.perf_counter() - started
+        return team
+
+    async def warm(self):
+        """Build teams until the pool holds ``size`` of them."""
+        while self._built < self.size:
+            self._queue().put_nowait(self._build_slot())
+
+    def _free_slot(self):
+        # None in the idle queue stands for a team still to build, so a waiting checkout wakes up and builds it
+        self._built -= 1
+        self._queue().put_nowait(None)
+
+    def _build_slot(self):
+        self._built += 1
+        try:
+            return self._build()
+        except BaseException:
+            self._free_slot()
+            raise
+
+    @contextlib.asynccontextmanager
+    async def checkout(self) -> AsyncIterator[Any]:
+        """Borrow a team for one request; it is reset and returned to the pool afterwards."""
+        idle = self._queue()
+        started = time.perf_counter()
+        if idle.empty() and self._built < self.size:
+            team = self._build_slot()
+        else:
+            team = await idle.get()
+            if team is None:
+                team = self._build_slot()
+        self.stats["wait_seconds"] += time.perf_counter() - started
+        self.stats["checkouts"] += 1
+        try:
+            yield team
+        finally:
+            await self._return(team)
+
+    async def _return(self, team):
+        started = time.perf_counter()
+        try:
+            await team.reset()
+        except Exception:
+            self.stats["discarded"] += 1
+            self._free_slot()
+        else:
+            self.stats["resets"] += 1
+            self._queue().put_nowait(team)
+        self.stats["reset_seconds"] += time.perf_counter() - started
+
+    def report(self) -> Dict[str, Any]:
+        checkouts = self.stats["checkouts"]
+        return {
+            "size": self.size,
+            **{key: value for key, value in self.stats.items() if not key.endswith("_seconds")},
+            "mean_build_ms": round(self.stats["build_seconds"] / self.stats["built"] * 1000, 2)
+            if self.stats["built"] else None,
+            "mean_reset_ms": round(self.stats["reset_seconds"] / self.stats["resets"] * 1000, 2)
+            if self.stats["resets"] else None,
+            "mean_wait_ms": round(self.stats["wait_seconds"] / checkouts * 1000, 2) if checkouts else None,
+        }
+
+
+async def _benchmark(requests: int, size: int) -> Dict[str, Any]:
+    """Per-request setup cost (time and allocated memory) with and without the pool."""
+    from create_benefit_orchestrator import create_benefit_orchestrator_team
+    from runtime.team_runner import auto_approve_input
+
+    def factory():
+        return create_benefit_orchestrator_team(user_input_func=auto_approve_input)
+
+    tracemalloc.start()
+    teams = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Keep the last `size` teams alive, as concurrent requests would
+            teams = (teams + [factory()])[-size:]
+    fresh_seconds = time.perf_counter() - started
+    fresh_peak = tracemalloc.get_traced_memory()[1]
+    teams = []
+    tracemalloc.reset_peak()
+
+    pool = TeamPool(factory, size=size)
+    await pool.warm()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for _ in range(requests):
+        async with pool.checkout():
+            pass
+    pooled_seconds = time.perf_counter() - started
+    pooled_growth = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "fresh_ms_per_request": round(fresh_seconds / requests * 1000, 2),
+        "pooled_ms_per_request": round(pooled_seconds / requests * 1000, 3),
+        "fresh_peak_mb": round(fresh_peak / 1024 / 1024, 1),
+        "pooled_peak_growth_mb": round(pooled_growth / 1024 / 1024, 2),
+        "pool": pool.report(),
+    }
+
+
+def main():
+    """Benchmark per-request team setup with and without the warm pool."""
+    parser = argparse.ArgumentParser(description="Benchmark team setup cost with and without a warm pool.")
+    parser.add_argument("--requests", type=int, default=50, help="Number of simulated requests")
+    parser.add_argument("--size", type=int, default=4, help="Pool size (the worker's parallelism)")
+    args = parser.parse_args()
+
+    report = asyncio.run(_benchmark(args.requests, args.size))
+    print(f"📊 Team setup per request: fresh {report['fresh_ms_per_request']} ms, "
+          f"pooled {report['pooled_ms_per_request']} ms (reset only)")
+    print(f"   Peak traced memory: fresh {report['fresh_peak_mb']} MB, "
+          f"pooled +{report['pooled_peak_growth_mb']} MB after warm-up")
+    print(f"   Pool: {report['pool']}")
+
+
+if __name__ == "__main__":
+    main()
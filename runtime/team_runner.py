@@ -0,0 +1,159 @@
+"""
+Team Runner for the Benefit Orchestrator System.
+Runs a single benefit request through a team without a human at the console.
+"""
+
+import asyncio
+import json
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Sequence
+
+from autogen_agentchat.base import TaskResult
+
+from runtime.request_budget import budget_stop_reason
+
+
+# Reply given by the unattended operations reviewer at the User_Proxy_agent step
+AUTO_APPROVE_REPLY = "I agree with the decision. Proceed with execution."
+
+DECISION_PATTERN = re.compile(r"\*\*Decision:\*\*\s*(APPROVED|DECLINED|PENDING)")
+BENEFIT_TYPE_PATTERN = re.compile(r"\*\*Benefit Type:\*\*\s*([^\n*]+)")
+
+
+def auto_approve_input(prompt: str) -> str:
+    """User Proxy input function that confirms the automated decision."""
+    return AUTO_APPROVE_REPLY
+
+
+def message_text(message) -> str:
+    """Best-effort text of a chat message or event."""
+    content = getattr(message, "content", "")
+    if isinstance(content, str):
+        return content
+    return str(content)
+
+
+def extract_decision(messages: Sequence) -> Optional[str]:
+    """Return the last eligibility decision (APPROVED/DECLINED/PENDING) found in a transcript."""
+    decision = None
+    for message in messages:
+        if getattr(message, "source", None) != "Eligibility_Decision_agent":
+            continue
+        match = DECISION_PATTERN.search(message_text(message))
+        if match:
+            decision = match.group(1)
+    return decision
+
+
+def _last_json_from(messages: Sequence, source: str) -> Optional[Dict[str, Any]]:
+    """Parse the last structured (JSON) reply an agent produced, if any."""
+    for message in reversed(messages):
+        if getattr(message, "source", None) != source:
+            continue
+        try:
+            parsed = json.loads(message_text(message))
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+
+def summarize_transcript(messages: Sequence) -> Dict[str, Any]:
+    """Extract the final structured outputs of a request from its transcript.
+
+    Covers the Eligibility decision text, the Judge's ``quality_assessment``,
+    the Benefit_Execution ``execution_response`` and model token totals.
+    """
+    benefit_type = None
+    for message in messages:
+        if getattr(message, "source", None) == "Eligibility_Decision_agent":
+            match = BENEFIT_TYPE_PATTERN.search(message_text(message))
+            if match:
+                benefit_type = match.group(1).strip()
+
+    judge = _last_json_from(messages, "Judge_agent") or {}
+    execution = _last_json_from(messages, "Benefit_Execution_agent") or {}
+
+    prompt_tokens = completion_tokens = 0
+    for message in messages:
+        usage = getattr(message, "models_usage", None)
+        if usage is not None:
+            prompt_tokens += usage.prompt_tokens
+            completion_tokens += usage.completion_tokens
+
+    return {
+        "decision": extract_decision(messages),
+        "benefit_type": benefit_type,
+        "judge_score": judge.get("quality_score"),
+        "workflow_compliance": judge.get("workflow_compliance"),
+        "judge_recommendation": judge.get("recommendation"),
+        "execution_type": execution.get("execution_type"),
+        "execution_status": execution.get("status"),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+    }
+
+
+async def run_request(team, request_id: str, cancellation_token=None, checkpointer=None,
+                      prescreen: bool = False, retention=None, manual_review=None) -> Dict[str, Any]:
+    """Run one benefit request through a team and summarize the outcome.
+
+    Args:
+        team: A benefit orchestrator team (fresh or reset)
+        request_id (str): The request ID given to the Orchestrator as the task
+        cancellation_token: Optional AutoGen cancellation token
+        checkpointer: Optional ``TurnCheckpointer`` the team was built with; the
+            request then resumes from its last checkpointed turn
+        prescreen (bool): Decline unverified customers and requests missing required
+            documents deterministically, without running the team
+        retention: Optional ``runtime.memory.TranscriptRetention`` that receives the
+            completed transcript; otherwise it is released with the result
+        manual_review: Optional ``runtime.request_budget.ManualReviewQueue`` that receives the
+            partial state of a request stopped by its budget
+
+    Returns:
+        Dict[str, Any]: Outcome summary; ``status`` is "completed", "manual_review" (stopped
+        by a budget or the message cap before finishing) or "error"
+    """
+    started = time.perf_counter()
+    outcome = {
+        "request_id": request_id,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        screen = None
+        if prescreen:
+            from runtime.prescreen import prescreen_request, prescreen_transcript
+            screen = await asyncio.to_thread(prescreen_request, request_id)
+        if screen is not None and screen["outcome"].startswith("declined"):
+            result = TaskResult(messages=prescreen_transcript(screen), stop_reason=f"Pre-screen: {screen['outcome']}")
+            outcome["prescreened"] = True
+        elif checkpointer is not None:
+            result = await checkpointer.run(team, request_id)
+        else:
+            result = await team.run(task=request_id, cancellation_token=cancellation_token)
+    except Exception as e:
+        outcome.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    else:
+        messages = list(result.messages)
+        outcome.update({
+            "status": "completed",
+            "stop_reason": result.stop_reason,
+            "message_count": len(messages),
+            "last_speaker": getattr(messages[-1], "source", None) if messages else None,
+            **summarize_transcript(messages),
+        })
+        budget_exceeded = budget_stop_reason(result.stop_reason)
+        if budget_exceeded is not None and "TERMINATE" not in result.stop_reason:
+            outcome.update({"status": "manual_review", "budget_exceeded": budget_exceeded})
+            if manual_review is not None:
+                outcome["manual_review_path"] = await manual_review.save(team, request_id, messages,
+                                                                         budget_exceeded)
+        if retention is not None:
+            retention.retain(outcome["request_id"], messages)
+    outcome["duration_seconds"] = round(time.perf_counter() - started, 3)
+    outcome["completed_at"] = datetime.now(timezone.utc).isoformat()
+    return outcome
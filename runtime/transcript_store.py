@@ -0,0 +1,395 @@
+"""
+Transcript Store for the Benefit Orchestrator System.
+Interned, compact storage of conversation messages, shared across sessions and rehydrated on demand.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import tracemalloc
+import uuid
+import weakref
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import (AssistantMessage, FunctionExecutionResultMessage, LLMMessage, SystemMessage,
+                                 UserMessage)
+from autogen_agentchat.messages import MessageFactory
+
+
+# Strings shorter than this stay inline in the message skeleton
+MIN_INTERN_BYTES = 256
+
+# Stored payloads at least this large are zlib-compressed
+COMPRESS_BYTES = 1024
+
+# Marker keys; NUL cannot appear in the JSON the tools and agents produce unescaped
+_STRING_MARKER = "\u0000s"
+_NODE_MARKER = "\u0000n"
+
+# json.dumps settings tried when re-serializing a parsed JSON string must reproduce it exactly
+_JSON_FORMATS = (
+    {"separators": (",", ":"), "ensure_ascii": False},
+    {"separators": (",", ":")},
+    {},
+    {"indent": 2},
+    {"ensure_ascii": False},
+    {"indent": 2, "ensure_ascii": False},
+)
+
+_LLM_MESSAGE_TYPES = {cls.__name__: cls for cls in (SystemMessage, UserMessage, AssistantMessage,
+                                                    FunctionExecutionResultMessage)}
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Payload:
+    __slots__ = ("key", "data", "compressed", "refcount", "children")
+
+    def __init__(self, key: str, data: bytes, compressed: bool, children: Tuple[str, ...]):
+        self.key = key
+        self.data = data
+        self.compressed = compressed
+        self.refcount = 0
+        self.children = children
+
+
+class TranscriptStore:
+    """Content-addressed message storage shared by every session in the process.
+
+    Each message is kept as a JSON skeleton in which long strings are
+    replaced by references to payloads stored once per distinct content; the
+    skeleton is itself such a payload, so a session holds one shared reference
+    per message and a message broadcast to every agent is stored once. JSON
+    strings whose formatting can be reproduced exactly (the tools' output and
+    the structured agents' replies) are split further into JSON subtrees, so the
+    request record inside ``get_request_details`` and the copy the Orchestrator
+    echoes in ``request_details`` are stored once. Payloads are reference
+    counted and freed when the last session referring to them is released.
+    """
+
+    def __init__(self, min_intern_bytes: int = MIN_INTERN_BYTES, compress_bytes: int = COMPRESS_BYTES,
+                 rehydrate_cache: int = 64):
+        self.min_intern_bytes = min_intern_bytes
+        self.compress_bytes = compress_bytes
+        self._payloads: Dict[str, _Payload] = {}
+        self._sessions: Dict[str, List[str]] = defaultdict(list)
+        self._session_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"messages": 0, "logical_bytes": 0,
+                                                                             "stored_bytes": 0})
+        # Rehydrated strings by marker; content-addressed, so entries never go stale
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_size = rehydrate_cache
+        self._message_factory = MessageFactory()
+
+    # Payloads
+
+    def _store(self, text: str, children: Tuple[str, ...], session_stats: Dict[str, int]) -> str:
+        raw = text.encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        payload = self._payloads.get(digest)
+        if payload is None:
+            compressed = len(raw) >= self.compress_bytes
+            data = zlib.compress(raw, 6) if compressed else raw
+            if compressed and len(data) >= len(raw):
+                data, compressed = raw, False
+            payload = self._payloads[digest] = _Payload(digest, data, compressed, children)
+            # Children were referenced while building this node; the node now holds those references
+            session_stats["stored_bytes"] += len(data)
+        else:
+            for child in children:
+                self._release(child)
+        payload.refcount += 1
+        # The dict's own key object, so sessions referring to a payload share one string
+        return payload.key
+
+    def _release(self, digest: str):
+        payload = self._payloads[digest]
+        payload.refcount -= 1
+        if payload.refcount == 0:
+            del self._payloads[digest]
+            for child in payload.children:
+                self._release(child)
+
+    def _load(self, digest: str) -> str:
+        payload = self._payloads[digest]
+        raw = zlib.decompress(payload.data) if payload.compressed else payload.data
+        return raw.decode("utf-8")
+
+    def _intern_json(self, value: Any, session_stats: Dict[str, int]) -> Tuple[Any, Tuple[str, ...]]:
+        """Replace large JSON subtrees with node references; returns the value and the references it holds."""
+        if isinstance(value, dict):
+            items = [(key, self._intern_json(child, session_stats)) for key, child in value.items()]
+            replaced = {key: child for key, (child, _) in items}
+            children = tuple(digest for _, (_, refs) in items for digest in refs)
+        elif isinstance(value, list):
+            items = [self._intern_json(child, session_stats) for child in value]
+            replaced = [child for child, _ in items]
+            children = tuple(digest for _, refs in items for digest in refs)
+        else:
+            return value, ()
+        text = _compact(replaced)
+        if len(text) < self.min_intern_bytes:
+            return replaced, children
+        digest = self._store(text, children, session_stats)
+        return {_NODE_MARKER: digest}, (digest,)
+
+    def _resolve_json(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if _NODE_MARKER in value and len(value) == 1:
+                return self._resolve_json(json.loads(self._load(value[_NODE_MARKER])))
+            return {key: self._resolve_json(child) for key, child in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_json(child) for child in value]
+        return value
+
+    def _intern_string(self, text: str, session_stats: Dict[str, int]) -> Tuple[Any, Tuple[str, ...]]:
+        if len(text) < self.min_intern_bytes:
+            return text, ()
+        stripped = text.lstrip()
+        if stripped[:1] in ("{", "["):
+            try:
+                parsed = json.loads(text)
+            except json.JSONDecodeError:
+                parsed = None
+            if parsed is not None:
+                for format_id, options in enumerate(_JSON_FORMATS):
+                    if json.dumps(parsed, **options) == text:
+                        node, refs = self._intern_json(parsed, session_stats)
+                        if not refs:
+                            break
+                        return {_STRING_MARKER: ["j", format_id, node]}, refs
+        digest = self._store(text, (), session_stats)
+        return {_STRING_MARKER: ["s", digest]}, (digest,)
+
+    def _resolve_string(self, marker: List[Any]) -> str:
+        key = json.dumps(marker, separators=(",", ":"))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        if marker[0] == "s":
+            text = self._load(marker[1])
+        else:
+            text = json.dumps(self._resolve_json(marker[2]), **_JSON_FORMATS[marker[1]])
+        self._cache[key] = text
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def _intern_tree(self, value: Any, session_stats: Dict[str, int], refs: List[str]) -> Any:
+        if isinstance(value, str):
+            replaced, held = self._intern_string(value, session_stats)
+            refs.extend(held)
+            return replaced
+        if isinstance(value, dict):
+            return {key: self._intern_tree(child, session_stats, refs) for key, child in value.items()}
+        if isinstance(value, list):
+            return [self._intern_tree(child, session_stats, refs) for child in value]
+        return value
+
+    def _resolve_tree(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if _STRING_MARKER in value and len(value) == 1:
+                return self._resolve_string(value[_STRING_MARKER])
+            return {key: self._resolve_tree(child) for key, child in value.items()}
+        if isinstance(value, list):
+            return [self._resolve_tree(child) for child in value]
+        return value
+
+    # Messages
+
+    def put(self, session_id: str, message: Any) -> int:
+        """Store a chat message, agent event or ``LLMMessage`` for a session; returns its index in the session."""
+        if isinstance(message, (SystemMessage, UserMessage, AssistantMessage, FunctionExecutionResultMessage)):
+            dumped = {"llm": message.model_dump(mode="json")}
+        else:
+            dumped = {"chat": message.dump()}
+        stats = self._session_stats[session_id]
+        refs: List[str] = []
+        skeleton = _compact(self._intern_tree(dumped, stats, refs))
+        stats["messages"] += 1
+        stats["logical_bytes"] += len(_compact(dumped).encode("utf-8"))
+        self._sessions[session_id].append(self._store(skeleton, tuple(refs), stats))
+        return len(self._sessions[session_id]) - 1
+
+    def get(self, session_id: str, index: int) -> Any:
+        """Rehydrate one stored message."""
+        dumped = self._resolve_tree(json.loads(self._load(self._sessions[session_id][index])))
+        if "llm" in dumped:
+            data = dumped["llm"]
+            return _LLM_MESSAGE_TYPES[data["type"]].model_validate(data)
+        return self._message_factory.create(dumped["chat"])
+
+    def messages(self, session_id: str) -> List[Any]:
+        """Rehydrate every message of a session, in order."""
+        return [self.get(session_id, index) for index in range(len(self._sessions.get(session_id, ())))]
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def release(self, session_id: str):
+        """Drop a session's messages; payloads no other session refers to are freed."""
+        for digest in self._sessions.pop(session_id, ()):
+            self._release(digest)
+        self._session_stats.pop(session_id, None)
+
+    # Reporting
+
+    def session_report(self, session_id: str) -> Dict[str, Any]:
+        """Bytes the session's messages would take as compact JSON against the bytes it added to the store."""
+        stats = dict(self._session_stats.get(session_id, {"messages": 0, "logical_bytes": 0, "stored_bytes": 0}))
+        stats["saved_bytes"] = stats["logical_bytes"] - stats["stored_bytes"]
+        stats["saved_pct"] = round(100 * stats["saved_bytes"] / stats["logical_bytes"], 1) if stats["logical_bytes"] \
+            else None
+        return stats
+
+    def report(self) -> Dict[str, Any]:
+        logical = sum(stats["logical_bytes"] for stats in self._session_stats.values())
+        stored = sum(len(payload.data) for payload in self._payloads.values())
+        return {
+            "sessions": len(self._sessions),
+            "messages": sum(len(entries) for entries in self._sessions.values()),
+            "payloads": len(self._payloads),
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "saved_pct": round(100 * (logical - stored) / logical, 1) if logical else None,
+        }
+
+    def apply_to_agent(self, agent, session_id: Optional[str] = None) -> str:
+        """Back the agent's model context with the store; returns the session ID used."""
+        session_id = session_id or uuid.uuid4().hex
+        if not isinstance(agent._model_context, InternedChatCompletionContext):
+            agent._model_context = InternedChatCompletionContext(agent._model_context, self, session_id)
+        return session_id
+
+
+class InternedChatCompletionContext(ChatCompletionContext):
+    """Model context that keeps its messages in a ``TranscriptStore`` and rehydrates them per model call.
+
+    The wrapped context's windowing (``HeadAndTailChatCompletionContext`` and so
+    on) still decides which messages the model sees. Each agent gets its own
+    session within the store, so identical payloads are shared across agents
+    and conversations; the session is released on ``clear`` (team reset) or
+    when the context is garbage collected.
+    """
+
+    def __init__(self, inner: ChatCompletionContext, store: TranscriptStore, team_session: str):
+        super().__init__()
+        self._inner = inner
+        self._store = store
+        self._session_id = f"{team_session}:{uuid.uuid4().hex[:8]}"
+        for message in inner._messages:
+            store.put(self._session_id, message)
+        inner._messages = []
+        # A team that is dropped rather than reset still gives its payloads back
+        weakref.finalize(self, store.release, self._session_id)
+
+    async def add_message(self, message: LLMMessage) -> None:
+        self._store.put(self._session_id, message)
+
+    async def get_messages(self) -> List[LLMMessage]:
+        self._inner._messages = self._store.messages(self._session_id)
+        try:
+            return await self._inner.get_messages()
+        finally:
+            self._inner._messages = []
+
+    async def clear(self) -> None:
+        self._store.release(self._session_id)
+
+    async def save_state(self):
+        self._inner._messages = self._store.messages(self._session_id)
+        try:
+            return await self._inner.save_state()
+        finally:
+            self._inner._messages = []
+
+    async def load_state(self, state) -> None:
+        await self._inner.load_state(state)
+        self._store.release(self._session_id)
+        for message in self._inner._messages:
+            self._store.put(self._session_id, message)
+        self._inner._messages = []
+
+
+def _session_contexts(request_id: str, routing_turns: int) -> Optional[Dict[str, List[LLMMessage]]]:
+    """The model-context messages a conversation accumulates across its agents, without model calls.
+
+    Every group message reaches every agent's context; the Orchestrator echoes
+    the request on each routing turn, as structured output does.
+    """
+    from runtime.deterministic_stages import build_prefix
+    prefix = build_prefix(request_id)
+    if prefix is None:
+        return None
+    agents = ["Orchestrator_agent", "Customer_Verification_agent", "Document_Processing_agent",
+              "Eligibility_Decision_agent", "Judge_agent", "Benefit_Execution_agent"]
+    shared = [UserMessage(content=message.content, source=message.source) for message in prefix["messages"]]
+    routes = ["Customer_Verification_agent", "Document_Processing_agent", "Eligibility_Decision_agent",
+              "Judge_agent", "User_Proxy_agent", "Benefit_Execution_agent"]
+    for turn in range(routing_turns):
+        # A fresh string per turn, as each is a separate model response
+        echo = json.dumps({"next_agent": routes[turn % len(routes)], "reasoning": f"Workflow step {turn + 1}",
+                           "request_details": prefix["request"]}, separators=(",", ":"))
+        shared.append(UserMessage(content=echo, source="Orchestrator_agent"))
+    return {agent: list(shared) for agent in agents}
+
+
+def main():
+    """Compare the memory of live sessions held as message objects and in the transcript store."""
+    parser = argparse.ArgumentParser(description="Measure interned transcript storage against plain messages.")
+    parser.add_argument("--population", default=None, help="Synthetic population SQLite database")
+    parser.add_argument("--sessions", type=int, default=500, help="Concurrent sessions to hold")
+    parser.add_argument("--routing-turns", type=int, default=6, help="Orchestrator routing turns per session")
+    args = parser.parse_args()
+
+    request_ids = [f"REQ-{i:03d}" for i in range(1, 6)]
+    if args.population:
+        from simulation.synthetic_population import read_population
+        os.environ["SCRA_POPULATION_DB"] = os.path.abspath(args.population)
+        request_ids = [record["requestId"] for record in
+                       itertools.islice(read_population(args.population, "request"), args.sessions)]
+    request_ids = list(itertools.islice(itertools.cycle(request_ids), args.sessions))
+
+    # Warm the tool and population caches first, so only the sessions' messages are measured
+    for request_id in dict.fromkeys(request_ids):
+        _session_contexts(request_id, args.routing_turns)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    plain = [contexts for contexts in (_session_contexts(request_id, args.routing_turns)
+                                       for request_id in request_ids) if contexts]
+    plain_bytes = tracemalloc.get_traced_memory()[0] - baseline
+
+    store = TranscriptStore()
+    before = tracemalloc.get_traced_memory()[0]
+    for index, contexts in enumerate(plain):
+        for agent, messages in contexts.items():
+            for message in messages:
+                store.put(f"session-{index}:{agent}", message)
+    # What the store adds while the message objects are still alive is what it holds on its own
+    store_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    first = plain[0]
+    plain.clear()
+
+    identical = all(store.messages(f"session-0:{agent}") == messages for agent, messages in first.items())
+    conversation = [store.session_report(f"session-0:{agent}") for agent in first]
+    logical = sum(stats["logical_bytes"] for stats in conversation)
+    stored = sum(stats["stored_bytes"] for stats in conversation)
+    report = store.report()
+    print(f"📊 {len(request_ids)} sessions, {report['messages']} messages in agent model contexts "
+          f"(rehydrated messages identical: {identical})")
+    print(f"   Message objects: {plain_bytes / 1024 / 1024:.1f} MB traced")
+    print(f"   Transcript store: {store_bytes / 1024 / 1024:.1f} MB traced "
+          f"({report['payloads']} distinct payloads, {report['saved_pct']}% of the JSON bytes saved)")
+    print(f"   First session: {logical / 1024:.1f} KiB of messages stored as {stored / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Turn Checkpointing for the Benefit Orchestrator System.
+Persists team state after every agent turn so crashed or timed-out requests resume from their last completed turn.
+"""
+
+import copy
+import json
+import os
+from typing import Dict, Any, List, Optional, Sequence
+
+from autogen_agentchat.base import TaskResult, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, MessageFactory, StopMessage
+
+
+TURN_BOUNDARY_SOURCE = "TurnCheckpoint"
+TURN_BOUNDARY_REASON = "Turn checkpoint"
+
+
+class TurnBoundaryTermination(TerminationCondition):
+    """Stops the team after every agent turn so its state can be saved while it is idle.
+
+    ``SelectorGroupChat.save_state`` is only consistent when the team is not
+    running; pausing at each turn boundary and calling ``run()`` again resumes
+    the conversation exactly where it stopped.
+    """
+
+    def __init__(self) -> None:
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            return None
+        for message in messages:
+            if isinstance(message, BaseChatMessage) and message.source != "user":
+                self._terminated = True
+                return StopMessage(content=TURN_BOUNDARY_REASON, source=TURN_BOUNDARY_SOURCE)
+        return None
+
+    async def reset(self) -> None:
+        self._terminated = False
+
+
+def _diff_state(old: Any, new: Any, path: List[Any], operations: List[Dict[str, Any]]):
+    """Collect the operations that turn ``old`` into ``new``.
+
+    Lists that only grew (message threads and model contexts) are recorded as
+    appends of the new items, so each turn stores just what it added.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() - new.keys():
+            operations.append({"op": "delete", "path": path + [key]})
+        for key, value in new.items():
+            if key not in old:
+                operations.append({"op": "set", "path": path + [key], "value": value})
+            elif old[key] != value:
+                _diff_state(old[key], value, path + [key], operations)
+    elif isinstance(old, list) and isinstance(new, list) and len(new) >= len(old) and new[:len(old)] == old:
+        operations.append({"op": "append", "path": path, "values": new[len(old):]})
+    else:
+        operations.append({"op": "set", "path": path, "value": new})
+
+
+def _apply_operations(state: Any, operations: List[Dict[str, Any]]) -> Any:
+    """Replay diff operations produced by ``_diff_state`` onto a state tree."""
+    for operation in operations:
+        path = operation["path"]
+        if not path:
+            if operation["op"] == "append":
+                state.extend(operation["values"])
+            else:
+                state = operation["value"]
+            continue
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+        if operation["op"] == "delete":
+            del parent[path[-1]]
+        elif operation["op"] == "append":
+            parent[path[-1]].extend(operation["values"])
+        else:
+            parent[path[-1]] = operation["value"]
+    return state
+
+
+class TurnCheckpointer:
+    """Opt-in per-turn checkpointer backed by one append-only journal per request.
+
+    Each journal line records one turn: the chat messages it produced and the
+    changes to the team state since the previous turn. Build the team with
+    ``termination_condition | checkpointer.turn_boundary()`` (see
+    ``create_benefit_orchestrator_team(checkpointer=...)``) and run requests
+    through :meth:`run`; after a crash, :meth:`run` on a fresh team resumes
+    from the last completed turn without repeating earlier model calls.
+    """
+
+    def __init__(self, directory: str = "turn_checkpoints"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._message_factory = MessageFactory()
+
+    @staticmethod
+    def turn_boundary() -> TurnBoundaryTermination:
+        """Termination condition to OR into the team's termination condition."""
+        return TurnBoundaryTermination()
+
+    def journal_path(self, request_id: str) -> str:
+        safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in request_id)
+        return os.path.join(self.directory, f"{safe_id}.jsonl")
+
+    def load(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Rebuild the latest checkpoint of a request from its journal.
+
+        Returns:
+            Optional[Dict[str, Any]]: ``turn``, ``state``, ``messages`` (dumped) and
+            ``finished``/``stop_reason``, or None if the request has no journal
+        """
+        path = self.journal_path(request_id)
+        if not os.path.exists(path):
+            return None
+        checkpoint = {"turn": 0, "state": {}, "messages": [], "finished": False, "stop_reason": None}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                # A torn final line means the crash happened mid-write; the previous turn stands
+                if not line.endswith("\n"):
+                    break
+                record = json.loads(line)
+                checkpoint["state"] = _apply_operations(checkpoint["state"], record["state_operations"])
+                checkpoint["messages"].extend(record["messages"])
+                checkpoint.update(turn=record["turn"], finished=record["finished"],
+                                  stop_reason=record["stop_reason"])
+        return checkpoint
+
+    def _append(self, request_id: str, record: Dict[str, Any]):
+        with open(self.journal_path(request_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def discard(self, request_id: str):
+        """Delete the journal of a request, e.g. to force a clean rerun."""
+        path = self.journal_path(request_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    async def run(self, team, request_id: str, task: Optional[str] = None,
+                  max_turns: Optional[int] = None) -> TaskResult:
+        """Run a request turn by turn, checkpointing after each turn and resuming if a journal exists.
+
+        Args:
+            team: A fresh benefit team built with this checkpointer's turn boundary
+            request_id (str): The request ID (also the default task)
+            task (Optional[str]): Task text for a fresh start (defaults to the request ID)
+            max_turns (Optional[int]): Safety cap on turns run by this call
+
+        Returns:
+            TaskResult: All messages of the request, including those of resumed turns
+        """
+        checkpoint = self.load(request_id)
+        if checkpoint and checkpoint["finished"]:
+            return TaskResult(messages=self._load_messages(checkpoint["messages"]),
+                              stop_reason=checkpoint["stop_reason"])
+
+        if checkpoint and checkpoint["turn"] > 0:
+            await team.load_state(checkpoint["state"])
+            saved_state = checkpoint["state"]
+            messages = self._load_messages(checkpoint["messages"])
+            turn = checkpoint["turn"]
+            next_task = None
+        else:
+            saved_state = {}
+            messages = []
+            turn = 0
+            next_task = task or request_id
+
+        turns_run = 0
+        while True:
+            result = await team.run(task=next_task)
+            next_task = None
+            turn += 1
+            turns_run += 1
+            finished = result.stop_reason != TURN_BOUNDARY_REASON
+
+            state = json.loads(json.dumps(await team.save_state(), default=str))
+            operations: List[Dict[str, Any]] = []
+            _diff_state(saved_state, state, [], operations)
+            saved_state = copy.deepcopy(state)
+
+            self._append(request_id, {
+                "turn": turn,
+                "messages": [message.dump() for message in result.messages],
+                "state_operations": operations,
+                "finished": finished,
+                "stop_reason": result.stop_reason,
+            })
+            messages.extend(result.messages)
+
+            if finished or (max_turns is not None and turns_run >= max_turns):
+                return TaskResult(messages=messages, stop_reason=result.stop_reason)
+
+    def _load_messages(self, dumped: List[Dict[str, Any]]) -> List[Any]:
+        return [self._message_factory.create(message) for message in dumped]
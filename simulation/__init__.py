@@ -0,0 +1,2 @@
+# Agent Simulator - Simulation utilities
+# This package contains synthetic data generation and offline analysis tools
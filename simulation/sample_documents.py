@@ -0,0 +1,175 @@
+"""
+Sample Document Files for the Benefit Orchestrator System.
+Writes text PDFs for the documents attached to requests so the real ingestion path can be exercised.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import zlib
+from datetime import date, timedelta
+from typing import Dict, Any, Iterable, List, Tuple
+
+
+RANKS = ["Specialist (E-4)", "Sergeant (E-5)", "Staff Sergeant (E-6)", "Lieutenant (O-2)", "Captain (O-3)"]
+BANKS = ["USAA Bank", "Navy Federal Credit Union", "Armed Forces Bank", "PenFed Credit Union"]
+
+
+def _address(requestor: Dict[str, Any]) -> str:
+    address = requestor.get("address") or {}
+    return ", ".join(str(address.get(part, "")) for part in ("street", "city", "state", "zip"))
+
+
+def _transactions(rng: random.Random, start: date, lines: int) -> Tuple[List[str], List[str]]:
+    """Statement transaction lines, with a few overdraft fees among them."""
+    rows, fee_dates = [], []
+    for index in range(lines):
+        day = (start + timedelta(days=index * 30 // max(1, lines))).isoformat()
+        if rng.random() < 0.03:
+            rows.append(f"{day}  OVERDRAFT FEE  -35.00")
+            fee_dates.append(day)
+        else:
+            amount = rng.uniform(-400, 900)
+            rows.append(f"{day}  {rng.choice(['POS PURCHASE', 'ACH DEPOSIT', 'ATM WITHDRAWAL', 'TRANSFER'])}  "
+                        f"{amount:.2f}")
+    return rows, fee_dates
+
+
+def document_lines(document: Dict[str, Any], request: Dict[str, Any], statement_lines: int = 60) -> List[str]:
+    """Printed lines of a sample document, as ``Label: value`` pairs plus any transaction rows."""
+    rng = random.Random(document["documentId"])
+    requestor = request["requestor"]
+    effective = request["requestDetails"]["requestedEffectiveDate"]
+    name, branch = requestor["fullName"], requestor["branch"]
+    document_type = document["documentType"]
+    lines = [document_type.upper(), f"Document ID: {document['documentId']}"]
+
+    if document_type == "Orders Document":
+        lines += [f"Orders Number: ORD-{rng.randint(2024, 2025)}-{rng.randint(100, 999)}",
+                  f"Service Member: {name}", f"Rank: {rng.choice(RANKS)}", f"Branch: {branch}",
+                  "Orders Type: Permanent Change of Station (PCS)", "Deployment Type: PCS",
+                  f"Effective Date: {effective}", f"Report Date: {effective}", "From Location: Fort Liberty, NC",
+                  "To Location: Joint Base Lewis-McChord, WA", f"Duration Days: {rng.choice([90, 180, 365])}",
+                  "Authorized By: Department of Defense"]
+    elif document_type == "Proof of Military Service":
+        lines += [f"Service Member: {name}", "Service Verification: Yes",
+                  f"Active Duty Status: {requestor['militaryStatus']}", f"Branch: {branch}",
+                  f"Rank: {rng.choice(RANKS)}", f"Service Start Date: {requestor['serviceStartDate']}",
+                  f"Service End Date: {requestor.get('serviceEndDate') or 'None'}",
+                  f"Military Occupation: {rng.choice(['Infantry', 'Logistics', 'Signal', 'Aviation'])}",
+                  "Combat Service: No", "Service Connected Disabilities: None"]
+    elif document_type == "Leave and Earnings Statement":
+        base = rng.randint(2800, 5200)
+        lines += [f"Name: {name}", f"Rank: {rng.choice(RANKS)}", f"Branch: {branch}",
+                  "Pay Period: 2024-12-01 to 2024-12-31", f"Base Pay: ${base:,.2f}", "Allowances: $1,200.00",
+                  "Deductions: $800.00", f"Net Pay: ${base + 400:,.2f}", "Deployment Allowance: $250.00",
+                  "Hazard Pay: $0.00", "Combat Pay: $0.00", f"Total Compensation: ${base + 650:,.2f}"]
+    elif document_type == "Proof of Residence":
+        lines += [f"Address: {_address(requestor)}", "Address Verified: Yes", "Lease Start Date: 2024-01-01",
+                  f"Monthly Rent: ${rng.randint(1200, 3200):,.2f}", "Landlord Contact: Property Management Company",
+                  "Residency Duration Months: 12", "Military Housing: No", "PCS Affected: Yes"]
+    elif document_type == "Loan Statement":
+        lines += ["Loan Type: Auto Loan", f"Account Number: AUTO-{rng.randint(10000, 99999)}",
+                  "Original Balance: $25,000.00", f"Current Balance: ${rng.randint(5000, 24000):,.2f}",
+                  "Monthly Payment: $450.00", "Interest Rate: 6.5%", "Loan Origination Date: 2023-01-15",
+                  "Lender: Military Auto Loans Inc.", "Payment History: Current"]
+    elif document_type == "Financial Hardship Documentation":
+        lines += ["Hardship Type: Service-related financial burden", "Monthly Income: $3,900.00",
+                  "Monthly Expenses: $4,200.00", "Deficit Amount: $300.00", "Hardship Duration Months: 6",
+                  "Service Connection: Yes", "Documentation Provided: Bank statements, Expense records",
+                  "Verification Status: Verified"]
+    elif document_type == "Mortgage Documents":
+        lines += ["Mortgage Type: Conventional", f"Account Number: MORT-{rng.randint(10000, 99999)}",
+                  "Original Loan Amount: $300,000.00", f"Current Balance: ${rng.randint(150000, 290000):,.2f}",
+                  "Monthly Payment: $1,800.00", "Interest Rate: 7.25%", "Loan Origination Date: 2019-06-01",
+                  "Lender: Veterans United", f"Property Address: {_address(requestor)}"]
+    elif document_type == "Bank Statements":
+        rows, _ = _transactions(rng, date(2024, 12, 1), statement_lines)
+        lines += [f"Bank: {rng.choice(BANKS)}", "Account Type: Checking",
+                  f"Account Number: ****{rng.randint(1000, 9999)}", "Statement Period: 2024-12-01 to 2024-12-31",
+                  "Opening Balance: $2,500.00", "Closing Balance: $1,800.00", "TRANSACTIONS"] + rows
+    elif document_type == "Credit Statements":
+        rows, _ = _transactions(rng, date(2024, 12, 1), statement_lines)
+        lines += ["Credit Card Type: Visa", f"Account Number: ****{rng.randint(1000, 9999)}",
+                  f"Current Balance: ${rng.randint(500, 9000):,.2f}", "Credit Limit: $10,000.00",
+                  f"APR: {rng.choice([18.99, 21.49, 24.99])}%", "Account Opening Date: 2021-03-15",
+                  f"Issuer: {rng.choice(['Chase Bank', 'Capital One', 'Citi'])}", "Payment History: Good",
+                  "TRANSACTIONS"] + rows
+    elif document_type == "Account History":
+        lines += ["Account Type: Credit Card", f"Account Number: ****{rng.randint(1000, 9999)}",
+                  "Opening Date: 2021-03-15", "Pre Service Balance: $2,000.00", "Pre Service APR: 18.99%",
+                  "Current Balance: $5,000.00", "Current APR: 18.99%", "Payment History: Good"]
+    return lines
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def render_pdf(lines: List[str], lines_per_page: int = 60) -> bytes:
+    """Render lines as a minimal multi-page PDF with FlateDecode text streams."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        text = "BT /F1 10 Tf 12 TL 50 770 Td " + " ".join(f"{_pdf_string(line)} Tj T*" for line in page) + " ET"
+        stream = zlib.compress(text.encode("latin-1", errors="replace"))
+        objects.append((f"<< /Length {len(stream)} /Filter /FlateDecode >>", stream))
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(output))
+        if isinstance(obj, tuple):
+            output += f"{number} 0 obj\n{obj[0]}\nstream\n".encode() + obj[1] + b"\nendstream\nendobj\n"
+        else:
+            output += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(output)
+
+
+def write_sample_documents(requests: Iterable[Dict[str, Any]], root: str, statement_lines: int = 60) -> int:
+    """Write a PDF for every document of every request under ``root`` (mirroring ``filePath``)."""
+    written = 0
+    for request in requests:
+        for document in request.get("documents", []):
+            path = os.path.join(root, document["filePath"].lstrip("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(render_pdf(document_lines(document, request, statement_lines)))
+            written += 1
+    return written
+
+
+def main():
+    """Write sample document PDFs for the embedded requests or a synthetic population."""
+    parser = argparse.ArgumentParser(description="Write sample document PDFs for benefit requests.")
+    parser.add_argument("--output", default="sample_documents", help="Document root (use as SCRA_DOCUMENT_ROOT)")
+    parser.add_argument("--population", default=None, help="Synthetic population (JSONL directory or SQLite)")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of population requests")
+    parser.add_argument("--statement-lines", type=int, default=60,
+                        help="Transaction lines per bank and credit statement")
+    args = parser.parse_args()
+
+    if args.population:
+        from simulation.synthetic_population import read_population
+        requests = itertools.islice(read_population(args.population, "request"), args.limit)
+    else:
+        from agents.orchestrator_agent import get_request_details
+        requests = [json.loads(get_request_details(f"REQ-{i:03d}"))["request"] for i in range(1, 6)]
+
+    written = write_sample_documents(requests, args.output, args.statement_lines)
+    print(f"✅ Wrote {written} sample documents under {args.output}")
+
+
+if __name__ == "__main__":
+    main()
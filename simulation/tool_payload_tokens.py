@@ -0,0 +1,106 @@
+"""
+Tool Payload Token Report for the Benefit Orchestrator System.
+Measures the token cost of each tool result in the standard and compact (SCRA_TOOL_OUTPUT=compact) output modes.
+"""
+
+import argparse
+import json
+import os
+from typing import Callable, Dict, List, Tuple
+
+from agents.customer_verification_agent import customer_search
+from agents.document_processing_agent import get_document
+from agents.orchestrator_agent import get_request_details
+from runtime.deterministic_stages import requestor_address
+
+
+def token_counter(model: str = "gpt-4o-mini") -> Callable[[str], int]:
+    """Token counter for a model, falling back to a 4-characters-per-token estimate.
+
+    The estimate is used when tiktoken is not installed or its encoding files
+    cannot be downloaded.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        print("⚠️  tiktoken unavailable; estimating 4 characters per token")
+        return lambda text: (len(text) + 3) // 4
+    return lambda text: len(encoding.encode(text))
+
+
+def _tool_calls(request_id: str) -> List[Tuple[str, Callable[[], str]]]:
+    """The tool calls a full workflow makes for one request."""
+    request = json.loads(get_request_details(request_id))["request"]
+    requestor = request["requestor"]
+    calls = [
+        ("get_request_details", lambda: get_request_details(request_id)),
+        ("customer_search", lambda: customer_search(ssn=requestor["ssnLast4"], name=requestor["fullName"],
+                                                    address=requestor_address(requestor))),
+    ]
+    for document in request["documents"]:
+        calls.append((f"get_document {document['documentId']}",
+                      lambda document_id=document["documentId"]: get_document(request_id, document_id)))
+    return calls
+
+
+def measure(request_ids: List[str], count_tokens: Callable[[str], int]) -> List[Dict[str, object]]:
+    """Call each tool in both output modes and count the tokens of every payload."""
+    previous_mode = os.environ.get("SCRA_TOOL_OUTPUT")
+    rows = []
+    try:
+        for request_id in request_ids:
+            for tool, call in _tool_calls(request_id):
+                os.environ["SCRA_TOOL_OUTPUT"] = "standard"
+                standard = call()
+                os.environ["SCRA_TOOL_OUTPUT"] = "compact"
+                compact = call()
+                rows.append({
+                    "request_id": request_id,
+                    "tool": tool,
+                    "standard_tokens": count_tokens(standard),
+                    "compact_tokens": count_tokens(compact),
+                })
+    finally:
+        if previous_mode is None:
+            os.environ.pop("SCRA_TOOL_OUTPUT", None)
+        else:
+            os.environ["SCRA_TOOL_OUTPUT"] = previous_mode
+    return rows
+
+
+def main():
+    """Print the before/after token count of each tool payload."""
+    parser = argparse.ArgumentParser(description="Compare tool payload tokens in standard and compact output modes.")
+    parser.add_argument("request_ids", nargs="*", help="Request IDs (defaults to REQ-001 to REQ-005)")
+    parser.add_argument("--model", default="gpt-4o-mini", help="Model whose tokenizer is used")
+    args = parser.parse_args()
+
+    request_ids = args.request_ids or [f"REQ-{i:03d}" for i in range(1, 6)]
+    rows = measure(request_ids, token_counter(args.model))
+
+    print(f"{'Request':<9} {'Tool':<30} {'Standard':>9} {'Compact':>8} {'Saved':>7}")
+    for row in rows:
+        saved = 1 - row["compact_tokens"] / row["standard_tokens"]
+        print(f"{row['request_id']:<9} {row['tool']:<30} {row['standard_tokens']:>9} "
+              f"{row['compact_tokens']:>8} {saved:>6.1%}")
+
+    print("\n📊 Totals by tool:")
+    totals: Dict[str, List[int]] = {}
+    for row in rows:
+        tool = row["tool"].split()[0]
+        totals.setdefault(tool, [0, 0])
+        totals[tool][0] += row["standard_tokens"]
+        totals[tool][1] += row["compact_tokens"]
+    for tool, (standard, compact) in totals.items():
+        print(f"   {tool:<22} {standard:>7} → {compact:>6} tokens ({1 - compact / standard:.1%} saved)")
+    standard = sum(t[0] for t in totals.values())
+    compact = sum(t[1] for t in totals.values())
+    print(f"   {'all tools':<22} {standard:>7} → {compact:>6} tokens ({1 - compact / standard:.1%} saved)")
+
+
+if __name__ == "__main__":
+    main()